@@ -0,0 +1,267 @@
+import asyncio
+import platform
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+import db.connection as connection
+
+BENCH_PASSWORD = "BenchUser123"
+
+# urutan = urutan eksekusi; edit/delete memakai data dari langkah sebelumnya
+SCENARIOS = [
+    "login",
+    "main_page",
+    "feed",
+    "article_view",
+    "comment_thread",
+    "comment_add",
+    "comment_edit",
+    "comment_delete",
+    "rating_add",
+    "rating_edit",
+    "report_article",
+    "report_user",
+    "user_list",
+]
+
+
+def use_in_memory_mongo():
+    """
+    Point db.connection at mongomock-motor (optional dependency, not in
+    requirements.txt). Must run before the lifespan opens the client.
+    $lookup pipelines and $topN are not supported there.
+    """
+    try:
+        import mongomock.gridfs
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise RuntimeError("--in-memory needs mongomock-motor: pip install mongomock-motor")
+
+    mongomock.gridfs.enable_gridfs_integration()
+
+    # pymongo 4.11+ mengirim sort= ke add_update; mongomock belum mengenalnya
+    from mongomock.collection import BulkOperationBuilder
+    add_update = BulkOperationBuilder.add_update
+    if "sort" not in add_update.__code__.co_varnames:
+        BulkOperationBuilder.add_update = lambda self, *a, sort=None, **k: add_update(self, *a, **k)
+
+    connection.configure(AsyncMongoMockClient())
+
+
+def percentile(sorted_timings, q: float):
+    if not sorted_timings:
+        return None
+    return sorted_timings[min(len(sorted_timings) - 1, int(len(sorted_timings) * q))]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, cwd=Path(__file__).resolve().parent
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+async def prepare(seed_dir: Path, bench_users: int):
+    """Load the dataset with the seed importer, then upsert bench users (known password)."""
+    from db.seed import import_seed
+    from core.security import hash_password
+
+    await import_seed(seed_dir)
+
+    database = connection.db
+    password_hash = hash_password(BENCH_PASSWORD)
+    now = datetime.utcnow()
+    for i in range(bench_users + 1):
+        # user terakhir = admin untuk user_list
+        email = "bench.admin@example.com" if i == bench_users else f"bench.user{i}@example.com"
+        await database.user.update_one(
+            {"email": email},
+            {"$set": {"username": email.split("@")[0], "fullname": "Bench User", "password": password_hash,
+                      "role": "admin" if i == bench_users else "user", "token_version": 0,
+                      "report_count": 0, "created_at": now, "updated_at": now}},
+            upsert=True
+        )
+    return [f"bench.user{i}@example.com" for i in range(bench_users)], "bench.admin@example.com"
+
+
+async def measure(client, requests: list, concurrency: int, count_queries: bool):
+    """
+    Send (path, body, headers) requests with `concurrency` workers.
+    Queries per request = app Mongo commands during the run / requests.
+    """
+    timings = []
+    outcomes = {}
+    queue = list(reversed(requests))
+    before = connection.command_metrics.stats()
+
+    async def worker():
+        while queue:
+            path, body, headers = queue.pop()
+            start = time.perf_counter()
+            r = await client.post(path, json=body, headers=headers)
+            timings.append((time.perf_counter() - start) * 1000)
+            try:
+                outcome = r.json().get("confirmation") or str(r.status_code)
+            except ValueError:
+                outcome = str(r.status_code)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    after = connection.command_metrics.stats()
+
+    n = len(requests)
+    timings.sort()
+    return {
+        "requests": n,
+        "seconds": elapsed,
+        "throughput_rps": n / elapsed if elapsed else None,
+        "mean_ms": sum(timings) / n if n else None,
+        "p50_ms": percentile(timings, 0.50),
+        "p95_ms": percentile(timings, 0.95),
+        "p99_ms": percentile(timings, 0.99),
+        "max_ms": timings[-1] if timings else None,
+        "queries_per_request": (after["commands"] - before["commands"]) / n if n and count_queries else None,
+        "db_ms_per_request": (after["duration_ms_total"] - before["duration_ms_total"]) / n if n and count_queries else None,
+        "outcomes": outcomes,
+    }
+
+
+async def run_suite(seed_dir: Path, iterations: int, concurrency: int, bench_users: int,
+                    in_memory: bool = False, only: list = None, echo=print):
+    """
+    Drive main.app in-process (httpx.ASGITransport, lifespan entered here)
+    through every scenario. Returns the result document saved as JSON.
+    """
+    import httpx
+    from main import app as api
+
+    results = {}
+    scenarios = [s for s in SCENARIOS if not only or s in only]
+
+    async with api.router.lifespan_context(api):
+        users, admin = await prepare(seed_dir, bench_users)
+        database = connection.db
+
+        articles = [str(a["_id"]) for a in await database.article.find({"is_deleted": False}, {"_id": 1}).to_list(None)]
+        others = [u["email"] for u in await database.user.find(
+            {"email": {"$not": {"$regex": "^bench\\."}}}, {"email": 1}
+        ).limit(200).to_list(None)]
+        if not articles:
+            raise RuntimeError(f"no articles in {seed_dir}")
+
+        transport = httpx.ASGITransport(app=api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            tokens = {}
+            for email in users + [admin]:
+                r = await client.post("/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+                tokens[email] = {"Authorization": f"Bearer {r.json()['token']}"}
+            user_ids = {u["email"]: str(u["_id"]) for u in await database.user.find(
+                {"email": {"$in": users}}, {"email": 1}
+            ).to_list(None)}
+            by_id = {v: k for k, v in user_ids.items()}
+
+            def user(i):
+                return users[i % len(users)]
+
+            def article(i):
+                return articles[i % len(articles)]
+
+            async def build(name):
+                n = iterations
+                if name == "login":
+                    return [("/auth/login", {"email": user(i), "password": BENCH_PASSWORD}, {}) for i in range(n)]
+                if name == "main_page":
+                    return [("/article/main_page", {"image_format": "url"}, tokens[user(i)]) for i in range(n)]
+                if name == "feed":
+                    return [("/article/feed", {}, tokens[user(i)]) for i in range(n)]
+                if name == "article_view":
+                    return [("/article/view", {"article_id": article(i), "image_format": "url"}, tokens[user(i)])
+                            for i in range(n)]
+                if name == "comment_thread":
+                    return [("/comment/thread", {"article_id": article(i)}, tokens[user(i)]) for i in range(n)]
+                if name == "comment_add":
+                    return [("/comment/add", {"article_id": article(i), "comment_content": f"bench comment {i}",
+                                              "image_format": "url"}, tokens[user(i)]) for i in range(n)]
+                if name in ("comment_edit", "comment_delete"):
+                    comments = await database.comment.find(
+                        {"owner_id": {"$in": list(user_ids.values())}}, {"article_id": 1, "owner_id": 1}
+                    ).to_list(n)
+                    if name == "comment_edit":
+                        return [("/comment/edit/update", {"article_id": c["article_id"], "comment_id": str(c["_id"]),
+                                                          "comment_content": "bench comment (edited)", "image_format": "url"},
+                                 tokens[by_id[c["owner_id"]]]) for c in comments]
+                    return [("/comment/delete", {"comment_id": str(c["_id"]), "image_format": "url"},
+                             tokens[by_id[c["owner_id"]]]) for c in comments]
+                if name == "rating_add":
+                    # satu rating per (user, artikel): index unik rating_article_owner
+                    pairs = min(n, len(users) * len(articles))
+                    return [("/rating/add", {"article_id": articles[(i // len(users)) % len(articles)],
+                                             "rating_value": 1 + i % 5, "image_format": "url"}, tokens[user(i)])
+                            for i in range(pairs)]
+                if name == "rating_edit":
+                    ratings = await database.rating.find(
+                        {"owner_id": {"$in": list(user_ids.values())}}, {"article_id": 1, "owner_id": 1, "rating_value": 1}
+                    ).to_list(n)
+                    return [("/rating/edit/update", {"article_id": r["article_id"], "rating_id": str(r["_id"]),
+                                                     "rating_value": 1 + r["rating_value"] % 5, "image_format": "url"},
+                             tokens[by_id[r["owner_id"]]]) for r in ratings]
+                if name == "report_article":
+                    return [("/report_article/add", {"article_id": article(i), "description": "bench report"},
+                             tokens[user(i)]) for i in range(n)]
+                if name == "report_user":
+                    targets = others or users
+                    return [("/report_user/report_user", {"reported_user_email": targets[i % len(targets)],
+                                                          "description": "bench report"}, tokens[user(i)])
+                            for i in range(n)]
+                if name == "user_list":
+                    return [("/user/get_all", {}, tokens[admin]) for _ in range(n)]
+                raise ValueError(name)
+
+            for name in scenarios:
+                requests = await build(name)
+                if not requests:
+                    echo(f"{name:<15} skipped (no data)")
+                    continue
+                stats = await measure(client, requests, concurrency, count_queries=not in_memory)
+                results[name] = stats
+                qpr = stats["queries_per_request"]
+                echo(f"{name:<15} n={stats['requests']:<5} {stats['throughput_rps']:8.1f} req/s "
+                     f"p50={stats['p50_ms']:8.2f}ms p95={stats['p95_ms']:8.2f}ms p99={stats['p99_ms']:8.2f}ms "
+                     f"queries/req={'n/a' if qpr is None else f'{qpr:.1f}'} outcomes={stats['outcomes']}")
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "mongo": "in-memory" if in_memory else connection.MONGO_URI.rsplit("@", 1)[-1],
+            "mongo_db": connection.MONGO_DB,
+            "dataset": str(seed_dir),
+            "iterations": iterations,
+            "concurrency": concurrency,
+            "bench_users": bench_users,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+
+
+def compare(current: dict, baseline: dict, echo=print):
+    """p50 / p95 / p99 / queries per request against a previous result file."""
+    echo(f"vs {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for name, stats in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        parts = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "queries_per_request"):
+            if stats.get(key) is None or not old.get(key):
+                continue
+            change = (stats[key] - old[key]) / old[key] * 100
+            parts.append(f"{key}={old[key]:.2f}→{stats[key]:.2f} ({change:+.0f}%)")
+        echo(f"{name:<15} " + " ".join(parts))
@@ -0,0 +1,417 @@
+import asyncio
+import random
+import time
+import typer
+from datetime import datetime
+from pathlib import Path
+from bson import json_util
+from db.connection import db, MONGO_DB
+
+app = typer.Typer(help="RetoGen backend maintenance commands")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def percentile(sorted_timings, q: float):
+    return sorted_timings[min(len(sorted_timings) - 1, int(len(sorted_timings) * q))]
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return percentile(timings, 0.5), percentile(timings, 0.95)
+
+
+@app.command("compare-detail")
+def compare_detail(runs: int = typer.Option(5, help="Repetitions per article and mode")):
+    """Compare article-detail latency: multi-query path vs aggregation path."""
+    from services.article_detail_service import ArticleDetailService
+    from services.article_service import ArticleService
+
+    async def main():
+        articles = await db.article.find({"is_deleted": False}, {"_id": 1}).to_list(None)
+        article_ids = [str(a["_id"]) for a in articles]
+
+        for mode in ("multi", "aggregate"):
+            timings = []
+            for _ in range(runs):
+                for article_id in article_ids:
+                    start = time.perf_counter()
+                    if mode == "aggregate":
+                        await ArticleDetailService.get_article_detail_aggregated(article_id)
+                    else:
+                        article = await ArticleService.fetch_article(article_id)
+                        await ArticleDetailService.get_article_detail(article_id, article)
+                    timings.append((time.perf_counter() - start) * 1000)
+
+            if not timings:
+                typer.echo("no articles found")
+                return
+            p50, p95 = percentiles(timings)
+            typer.echo(f"{mode:<10} n={len(timings):<6} mean={sum(timings) / len(timings):8.2f}ms "
+                       f"p50={p50:8.2f}ms p95={p95:8.2f}ms")
+
+    run(main())
+
+
+@app.command("migrate-images")
+def migrate_images():
+    """Move inline article_image blobs out of db.article into GridFS."""
+    from services.image_storage_service import ImageStorageService
+
+    counts = run(ImageStorageService.migrate_inline_images())
+    typer.echo(f"migrated={counts['migrated']} emptied={counts['emptied']} failed={counts['failed']}")
+
+
+@app.command("backfill-thumbnails")
+def backfill_thumbnails(force: bool = typer.Option(False, help="Regenerate even if thumbnails exist")):
+    """Generate card / hero derivatives for existing articles."""
+    from services.thumbnail_service import ThumbnailService
+
+    try:
+        counts = run(ThumbnailService.backfill(force))
+    finally:
+        ThumbnailService.shutdown()
+    typer.echo(f"generated={counts['generated']} failed={counts['failed']}")
+
+
+@app.command("import-seed")
+def import_seed_command(
+    seed_dir: Path = typer.Argument(Path(__file__).resolve().parent.parent / "db", help="Directory with Retogen.*.json"),
+    drop: bool = typer.Option(True, "--drop/--no-drop", help="Drop each collection before loading"),
+    batch_size: int = typer.Option(1000, help="Documents per bulk_write"),
+    derive: bool = typer.Option(True, "--derive/--no-derive", help="Backfill ancestors / counters / rating aggregates after loading"),
+):
+    """Stream the Extended JSON seed files into Mongo, then build indexes."""
+    from db.seed import import_seed
+
+    result = run(import_seed(seed_dir, drop, batch_size, derive))
+
+    total_docs = 0
+    total_bytes = 0
+    for f in result["files"]:
+        total_docs += f["inserted"]
+        total_bytes += f["bytes"]
+        rate = f["inserted"] / f["seconds"] if f["seconds"] else 0
+        typer.echo(f"{f['file']:<32} → {f['collection']:<15} inserted={f['inserted']:<7} errors={f['errors']:<4} "
+                   f"{f['seconds']:6.2f}s {rate:10.0f} docs/s")
+
+    load = result["load_seconds"]
+    typer.echo(f"load: {total_docs} docs, {total_bytes / 1e6:.1f} MB in {load:.2f}s "
+               f"({total_docs / load if load else 0:.0f} docs/s, {total_bytes / 1e6 / load if load else 0:.1f} MB/s)")
+    typer.echo(f"indexes: ok={result['indexes']['ok']} failed={len(result['indexes']['failed'])} in {result['index_seconds']:.2f}s")
+    if result["derived"] is not None:
+        typer.echo(f"derived: {result['derived']}")
+    typer.echo(f"total: {result['seconds']:.2f}s")
+
+    if result["indexes"]["failed"] or any(f["errors"] for f in result["files"]):
+        raise typer.Exit(1)
+
+
+@app.command("generate-dataset")
+def generate_dataset(
+    articles: int = typer.Option(100_000, help="Articles to generate"),
+    comments: int = typer.Option(10_000_000, help="Comments (long-tailed per article, nested replies)"),
+    ratings: int = typer.Option(1_000_000, help="Ratings (at most one per user and article)"),
+    users: int = typer.Option(10_000, help="Users"),
+    seed: int = typer.Option(42, help="Random seed; same seed → same dataset"),
+    out: str = typer.Option("mongo", help="mongo (bulk insert into MONGO_DB) or ndjson"),
+    out_dir: Path = typer.Option(Path("synthetic"), help="Directory for --out ndjson"),
+    seed_dir: Path = typer.Option(Path(__file__).resolve().parent.parent / "db", help="Directory with the Retogen.*.json templates"),
+):
+    """
+    Generate a large deterministic dataset from the seed documents.
+    NDJSON output can be loaded later with import-seed.
+    """
+    from db.synthetic import generate, MongoSink, NdjsonSink
+    from db.indexes import ensure_indexes
+
+    if out not in ("mongo", "ndjson"):
+        typer.echo("--out must be mongo or ndjson")
+        raise typer.Exit(1)
+    if out == "mongo" and MONGO_DB == "Retogen":
+        typer.echo("refusing to write synthetic data into Retogen; set MONGO_DB=Retogen_bench")
+        raise typer.Exit(1)
+
+    async def main():
+        sink = MongoSink(db) if out == "mongo" else NdjsonSink(out_dir)
+        start = time.perf_counter()
+        counts = await generate(sink, seed_dir, articles, comments, ratings, users, seed=seed)
+        elapsed = time.perf_counter() - start
+        for collection, n in sorted(counts.items()):
+            typer.echo(f"{collection:<15} {n}")
+        total = sum(counts.values())
+        typer.echo(f"generated {total} docs in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} docs/s)")
+        if out == "mongo":
+            indexes = await ensure_indexes()
+            typer.echo(f"indexes: ok={indexes['ok']} failed={len(indexes['failed'])}")
+
+    run(main())
+
+
+@app.command("backfill-counters")
+def backfill_counters():
+    """Recompute article comment_count used by the most_commented listing."""
+    from services.article_service import ArticleService
+
+    updated = run(ArticleService.backfill_listing_counters())
+    typer.echo(f"updated={updated}")
+
+
+@app.command("backfill-comment-ancestors")
+def backfill_comment_ancestors():
+    """Store the ancestors path on comments created before it existed."""
+    from services.comment_service import CommentService
+
+    counts = run(CommentService.backfill_ancestors())
+    typer.echo(f"updated={counts['updated']} orphans={counts['orphans']}")
+
+
+@app.command("reconcile-ratings")
+def reconcile_ratings():
+    """Rebuild rating_count / rating_sum / rating_histogram / rating_avg from db.rating."""
+    from services.rating_service import RatingService
+
+    fixed = run(RatingService.reconcile_aggregates())
+    typer.echo(f"fixed={fixed}")
+
+
+SEARCH_BENCH_QUERIES = [
+    "laptop",
+    "battery life",
+    "gaming performance",
+    "\"build quality\"",
+    "keyboard -gaming",
+    "thunderbolt display",
+    "xyzzy",
+]
+
+
+@app.command("bench-search")
+def bench_search(
+    articles: int = typer.Option(100_000, help="Article count to scale the seed data up to"),
+    seed_dir: Path = typer.Option(Path(__file__).resolve().parent.parent / "db", help="Directory with Retogen.article.json"),
+    runs: int = typer.Option(20, help="Repetitions per query"),
+):
+    """
+    Benchmark /article/search against the seed articles scaled up to N documents.
+    Writes to the database named by MONGO_DB, which must not be the app database.
+    """
+    from db.indexes import ensure_indexes
+    from services.article_service import ArticleService
+    from utils.search_snippet import query_terms, highlight_snippet
+
+    if MONGO_DB == "Retogen":
+        typer.echo("refusing to write benchmark data into Retogen; set MONGO_DB=Retogen_bench")
+        raise typer.Exit(1)
+
+    templates = json_util.loads((seed_dir / "Retogen.article.json").read_text())
+
+    async def populate():
+        existing = await db.article.count_documents({})
+        rng = random.Random(existing)
+        batch = []
+        for i in range(existing, articles):
+            base = templates[i % len(templates)]
+            other = templates[rng.randrange(len(templates))]
+            # campur kalimat dua template → isi tidak identik per dokumen
+            sentences = base["article_content"].split(". ") + other["article_content"].split(". ")
+            rng.shuffle(sentences)
+            doc = {k: v for k, v in base.items() if k != "_id"}
+            doc["article_title"] = f"{base['article_title']} #{i}"
+            doc["article_content"] = ". ".join(sentences[:len(sentences) // 2])[:65536]
+            doc["is_deleted"] = False
+            batch.append(doc)
+            if len(batch) == 1000:
+                await db.article.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await db.article.insert_many(batch, ordered=False)
+        return articles - existing
+
+    async def main():
+        start = time.perf_counter()
+        inserted = await populate()
+        await ensure_indexes()
+        typer.echo(f"dataset: inserted={max(inserted, 0)} total={await db.article.count_documents({})} "
+                   f"({time.perf_counter() - start:.1f}s incl. index build)")
+
+        for query in SEARCH_BENCH_QUERIES:
+            terms = query_terms(query)
+            for page in (1, 5):
+                timings = []
+                hits = 0
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    found = await ArticleService.search(query, page, 20)
+                    if found is None:
+                        typer.echo(f"{query!r}: search failed")
+                        return
+                    for a in found[0]:
+                        highlight_snippet(a.get("article_content", ""), terms)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    hits = len(found[0])
+                p50, p95 = percentiles(timings)
+                typer.echo(f"{query:<22} page={page} hits={hits:<3} p50={p50:8.2f}ms p95={p95:8.2f}ms")
+
+    run(main())
+
+
+@app.command("bench-login-storm")
+def bench_login_storm(
+    logins: int = typer.Option(200, help="Login requests in the storm"),
+    concurrency: int = typer.Option(32, help="Concurrent login clients"),
+    probe_interval_ms: float = typer.Option(5, help="Delay between GET / probes"),
+):
+    """
+    p50/p95/p99 of GET / while a login storm runs, with bcrypt inline on the
+    event loop versus in the bounded hasher pool. Drives the app in-process
+    through httpx.ASGITransport; needs MONGO_DB pointing at a scratch database.
+    """
+    import httpx
+    import services.auth_service as auth_module
+    from core.password_hasher import PasswordHasher, BCRYPT_WORKERS, BCRYPT_MAX_PENDING
+    from core.security import hash_password
+    from main import app as api
+
+    if MONGO_DB == "Retogen":
+        typer.echo("refusing to write benchmark data into Retogen; set MONGO_DB=Retogen_bench")
+        raise typer.Exit(1)
+
+    email, password = "bench.login@example.com", "BenchLogin123"
+
+    async def probe(client, stop, timings):
+        while not stop.is_set():
+            start = time.perf_counter()
+            await client.get("/")
+            timings.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(probe_interval_ms / 1000)
+
+    async def storm(client):
+        queue = asyncio.Queue()
+        for _ in range(logins):
+            queue.put_nowait(None)
+        outcomes = {}
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                r = await client.post("/auth/login", json={"email": email, "password": password})
+                outcome = r.json().get("confirmation")
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return outcomes
+
+    async def measure(client, with_storm: bool):
+        stop = asyncio.Event()
+        timings = []
+        probe_task = asyncio.create_task(probe(client, stop, timings))
+        start = time.perf_counter()
+        outcomes = await storm(client) if with_storm else await asyncio.sleep(1)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe_task
+        return sorted(timings), outcomes, elapsed
+
+    async def main():
+        await db.user.update_one(
+            {"email": email},
+            {"$set": {"username": "benchlogin", "fullname": "Bench Login", "password": hash_password(password),
+                      "role": "user", "report_count": 0}},
+            upsert=True
+        )
+
+        transport = httpx.ASGITransport(app=api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for label, hasher in (
+                ("idle", None),
+                ("inline", PasswordHasher(0, BCRYPT_MAX_PENDING)),
+                ("pool", PasswordHasher(BCRYPT_WORKERS, BCRYPT_MAX_PENDING)),
+            ):
+                if hasher is not None:
+                    auth_module.password_hasher = hasher
+                timings, outcomes, elapsed = await measure(client, hasher is not None)
+                line = (f"{label:<7} probes={len(timings):<5} p50={percentile(timings, 0.5):8.2f}ms "
+                        f"p95={percentile(timings, 0.95):8.2f}ms p99={percentile(timings, 0.99):8.2f}ms")
+                if hasher is not None:
+                    line += f" logins/s={logins / elapsed:7.1f} outcomes={outcomes}"
+                    hasher.shutdown()
+                typer.echo(line)
+
+    run(main())
+
+
+@app.command("bench-e2e")
+def bench_e2e(
+    iterations: int = typer.Option(200, help="Requests per scenario"),
+    concurrency: int = typer.Option(8, help="Concurrent clients"),
+    bench_users: int = typer.Option(20, help="Bench users logged in before the run"),
+    seed_dir: Path = typer.Option(Path(__file__).resolve().parent.parent / "db", help="Dataset for import-seed (seed or generate-dataset output)"),
+    in_memory: bool = typer.Option(False, "--in-memory", help="mongomock-motor instead of a local mongod"),
+    only: list[str] = typer.Option(None, help="Run only these scenarios"),
+    out: Path = typer.Option(None, help="Result JSON (default bench-results/e2e-<commit>-<time>.json)"),
+    baseline: Path = typer.Option(None, help="Previous result JSON to compare against"),
+):
+    """
+    End-to-end benchmark of the real app (main.app, lifespan included) over
+    httpx.ASGITransport: throughput, p50/p95/p99 and Mongo queries per request
+    for every scenario. Reloads the dataset into MONGO_DB first.
+    """
+    import json
+    from benchmarks.e2e import run_suite, compare, use_in_memory_mongo
+
+    if MONGO_DB == "Retogen" and not in_memory:
+        typer.echo("refusing to write benchmark data into Retogen; set MONGO_DB=Retogen_bench")
+        raise typer.Exit(1)
+    if in_memory:
+        use_in_memory_mongo()
+
+    result = run(run_suite(seed_dir, iterations, concurrency, bench_users, in_memory, only, echo=typer.echo))
+
+    if out is None:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        out = Path("bench-results") / f"e2e-{result['meta']['commit'] or 'nocommit'}-{stamp}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+    typer.echo(f"saved {out}")
+
+    if baseline is not None:
+        compare(result, json.loads(baseline.read_text()), echo=typer.echo)
+
+
+@app.command("ensure-indexes")
+def ensure_indexes_command(
+    check: bool = typer.Option(False, "--check", help="Only report drift, create nothing"),
+    drop_extra: bool = typer.Option(False, "--drop-extra", help="Drop indexes that are not in the registry"),
+):
+    """Apply the index registry (db/indexes.py) and report drift from it."""
+    from db.indexes import ensure_indexes, index_drift, drop_extra_indexes
+
+    async def main():
+        if not check:
+            result = await ensure_indexes()
+            typer.echo(f"ensured={result['ok']} failed={len(result['failed'])}")
+            for collection, name, error in result["failed"]:
+                typer.echo(f"  failed {collection}.{name}: {error}")
+        drift = await index_drift()
+        if drop_extra and not check:
+            for name in await drop_extra_indexes(drift):
+                typer.echo(f"dropped  {name}")
+            drift = [d for d in drift if d["status"] != "extra"]
+        return drift
+
+    drift = run(main())
+    for d in drift:
+        line = f"{d['status']:<8} {d['collection']}.{d['name']}"
+        if d["status"] == "changed":
+            line += f"\n    declared={d['declared']}\n    actual={d['actual']}"
+        typer.echo(line)
+    if not drift:
+        typer.echo("no drift")
+    raise typer.Exit(1 if drift else 0)
+
+
+if __name__ == "__main__":
+    app()
@@ -2,6 +2,7 @@ from fastapi import Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
+from core.exceptions import ConfirmationError
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     errors = exc.errors()
@@ -21,4 +22,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content=jsonable_encoder({
             "detail": custom_errors
         }),
-    )
\ No newline at end of file
+    )
+
+async def confirmation_exception_handler(request: Request, exc: ConfirmationError):
+    # sama dengan response handler biasa: HTTP 200 + confirmation
+    return JSONResponse(content={"confirmation": exc.confirmation})
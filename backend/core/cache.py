@@ -0,0 +1,129 @@
+import os
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    In-process LRU cache with a per-entry TTL.
+    Not shared between workers; every operation is synchronous so it is
+    safe to use from the event loop without locking.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key):
+        if self._data.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._data)
+        self._data.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class VersionedCache:
+    """
+    TTLCache whose writers call bump(key). A read takes version() before it
+    starts building and may only store its result if no bump of that key
+    happened since, so a read racing a write never caches the stale result.
+
+    Versions are ticks of one counter. Only the last `maxsize` bumps are
+    remembered; older ones collapse into a floor tick, so the version map
+    is bounded and a forgotten key is treated as bumped at the floor
+    (a read older than that just skips the store).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+        self._max_versions = max(1, maxsize)
+        self._versions = OrderedDict()
+        self._tick = 0
+        self._floor = 0
+
+    def version(self, key):
+        return self._tick
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, version, value):
+        if version >= self._versions.get(key, self._floor):
+            self._cache.set(key, value)
+
+    def bump(self, key):
+        self._cache.pop(key)
+        self._tick += 1
+        self._versions[key] = self._tick
+        self._versions.move_to_end(key)
+        while len(self._versions) > self._max_versions:
+            _, tick = self._versions.popitem(last=False)
+            self._floor = max(self._floor, tick)
+
+    def clear(self):
+        self._cache.clear()
+        self._tick += 1
+        self._floor = self._tick
+        self._versions.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+# User documents by email: one lookup per user per TTL instead of per request.
+# Invalidated by role / report_count changes and user deletion.
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60")),
+)
+
+
+# Viewer-independent article detail: fields, base64 image, comments, ratings, reports
+article_detail_cache = VersionedCache(
+    maxsize=int(os.getenv("ARTICLE_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("ARTICLE_CACHE_TTL", "300")),
+)
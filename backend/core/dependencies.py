@@ -1,27 +1,83 @@
-from fastapi import Depends
-from fastapi.security import OAuth2PasswordBearer
-import jwt
-import os
-from jwt import ExpiredSignatureError, InvalidTokenError
-from core.exceptions import Unauthorized
+from fastapi import Depends, Request
+from core.exceptions import TokenInvalid, NotAdmin, BackendError
+from core.security import decode_token
+from services.auth_service import AuthService
 
-oauth = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-# Load environment variable atau default value
-JWT_SECRET = os.getenv("JWT_SECRET", "default_secret")
-JWT_ALGO = os.getenv("JWT_ALGO", "HS256")
+class RequestUsers:
+    """
+    Request-scoped user resolution: each email is looked up at most once per
+    request (memoized here) and usually not at all (AuthService user_cache).
+    """
+
+    def __init__(self):
+        self._users = {}
+
+    async def get(self, email: str):
+        if email not in self._users:
+            self._users[email] = await AuthService.get_user_by_email(email)
+        return self._users[email]
+
+
+def get_request_users():
+    return RequestUsers()
+
+
+async def extract_token(request: Request):
+    """
+    Token from the Authorization: Bearer header, then the `token` cookie set
+    at login, then a `token` field in a JSON body. Multipart bodies are
+    never read here (they are streamed by the upload routes).
+    """
+    auth = request.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        return auth[7:].strip() or None
+
+    cookie = request.cookies.get("token")
+    if cookie:
+        return cookie
+
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()
+        except Exception:
+            return None
+        if isinstance(body, dict) and isinstance(body.get("token"), str):
+            return body["token"]
+
+    return None
+
+
+async def get_current_user(request: Request, users: RequestUsers = Depends(get_request_users)):
+    """
+    Authenticated user document. Once the token's id and token_version match
+    the (cached) user document, its claims are kept on request.state as
+    verified and the role claim is what get_current_admin authorizes on;
+    make_admin bumps token_version, so tokens issued before a role change
+    stop working. Raises TokenInvalid / BackendError (→ {"confirmation": ...}).
+    """
+    token = await extract_token(request)
+    payload = decode_token(token) if token else None
+    if payload is None or "id" not in payload:
+        raise TokenInvalid()
 
-def get_current_user(token: str = Depends(oauth)):
     try:
-        payload = jwt.decode(
-            token,
-            JWT_SECRET,
-            algorithms=[JWT_ALGO]
-        )
-        return payload
-
-    except ExpiredSignatureError:
-        raise Unauthorized("Token has expired")
-
-    except InvalidTokenError:
-        raise Unauthorized("Invalid token")
+        user = await users.get(payload.get("email"))
+    except Exception as e:
+        print("GET CURRENT USER ERROR:", e)
+        raise BackendError()
+
+    if not user or str(user["_id"]) != payload["id"]:
+        raise TokenInvalid()
+    if user.get("token_version", 0) != payload.get("token_version"):
+        raise TokenInvalid()
+
+    request.state.token_claims = payload
+    return user
+
+
+async def get_current_admin(request: Request, user: dict = Depends(get_current_user)):
+    # role dari claim yang sudah terverifikasi (token_version cocok), bukan dari dokumen user
+    if request.state.token_claims.get("role") != "admin":
+        raise NotAdmin()
+    return user
@@ -8,3 +8,17 @@ def BadRequest(msg="Bad request"):
 
 def Unauthorized(msg="Unauthorized"):
     raise HTTPException(status_code=401, detail=msg)
+
+
+# Diterjemahkan ke {"confirmation": ...} oleh confirmation_exception_handler
+class ConfirmationError(Exception):
+    confirmation = "backend error"
+
+class TokenInvalid(ConfirmationError):
+    confirmation = "token invalid"
+
+class NotAdmin(ConfirmationError):
+    confirmation = "not admin"
+
+class BackendError(ConfirmationError):
+    confirmation = "backend error"
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import time
+from db.connection import db
+from core.exceptions import BackendError
+
+MONGO_HEALTH_INTERVAL = float(os.getenv("MONGO_HEALTH_INTERVAL", "5"))
+MONGO_HEALTH_TIMEOUT = float(os.getenv("MONGO_HEALTH_TIMEOUT", "2"))
+# ping gagal berturut-turut sebelum circuit dibuka
+MONGO_FAILURE_THRESHOLD = int(os.getenv("MONGO_FAILURE_THRESHOLD", "3"))
+
+
+class MongoHealthMonitor:
+    """
+    Background ping loop that tracks Mongo reachability and latency and
+    drives a circuit breaker: after `failure_threshold` consecutive failed
+    pings the circuit opens and requests fail fast with "backend error";
+    the first successful ping closes it again. While open, pings run at a
+    shorter interval so recovery is noticed quickly.
+    """
+
+    def __init__(self, interval: float, timeout: float, failure_threshold: int):
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.checks = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_latency_ms = None
+        self.last_ok_at = None
+        self.last_error = None
+        self.opened_at = None
+        self._task = None
+
+    async def check(self):
+        self.checks += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(db.command("ping"), self.timeout)
+        except Exception as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            if self.state == "closed" and self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.time()
+                print("MONGO CIRCUIT OPEN:", self.last_error)
+            return False
+
+        self.last_latency_ms = (time.perf_counter() - start) * 1000
+        self.last_ok_at = time.time()
+        self.consecutive_failures = 0
+        if self.state == "open":
+            print("MONGO CIRCUIT CLOSED after", round(time.time() - self.opened_at, 1), "s")
+            self.state = "closed"
+            self.opened_at = None
+        return True
+
+    async def _run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval if self.state == "closed" else min(self.interval, 1.0))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def available(self):
+        return self.state == "closed"
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "last_latency_ms": self.last_latency_ms,
+            "last_ok_at": self.last_ok_at,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+            "checks": self.checks,
+            "failures": self.failures,
+            "rejected_requests": self.rejected,
+        }
+
+
+mongo_health = MongoHealthMonitor(MONGO_HEALTH_INTERVAL, MONGO_HEALTH_TIMEOUT, MONGO_FAILURE_THRESHOLD)
+
+
+async def require_database():
+    """Router dependency: fail fast while the Mongo circuit is open."""
+    if not mongo_health.available:
+        mongo_health.rejected += 1
+        raise BackendError()
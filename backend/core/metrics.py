@@ -0,0 +1,249 @@
+import os
+import re
+import time
+from starlette.routing import Match
+
+# bucket histogram latency (detik) dan ukuran response (byte)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# "confirmation" selalu key pertama di response JSON → cukup lihat awal body
+_CONFIRMATION = re.compile(rb'^\s*\{\s*"confirmation"\s*:\s*"([^"\\]{0,64})"')
+METRICS_SNIFF_BYTES = int(os.getenv("METRICS_SNIFF_BYTES", "256"))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (Prometheus histogram)."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self, name, label_names):
+        lines = []
+        for labels, (counts, total, n) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(label_names + ('le',), labels + (bound,))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(label_names, labels)} {total}")
+            lines.append(f"{name}_count{_labels(label_names, labels)} {n}")
+        return lines
+
+
+class HttpMetrics:
+    """
+    Request metrics kept in process memory (per uvicorn worker). Every update
+    runs on the event loop, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.requests = {}
+        self.in_flight = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+        self.started_at = time.time()
+
+    def begin(self, method, route):
+        key = (method, route)
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+
+    def end(self, method, route, status, outcome, seconds, size):
+        key = (method, route)
+        self.in_flight[key] -= 1
+        counter = (method, route, str(status), outcome)
+        self.requests[counter] = self.requests.get(counter, 0) + 1
+        self.latency.observe(key, seconds)
+        self.response_size.observe(key, size)
+
+    def render(self):
+        lines = [
+            "# HELP retogen_http_requests_total HTTP requests by route, status and confirmation outcome.",
+            "# TYPE retogen_http_requests_total counter",
+        ]
+        for labels, n in sorted(self.requests.items()):
+            lines.append(f"retogen_http_requests_total{_labels(('method', 'route', 'status', 'confirmation'), labels)} {n}")
+
+        lines += [
+            "# HELP retogen_http_requests_in_flight HTTP requests currently being served.",
+            "# TYPE retogen_http_requests_in_flight gauge",
+        ]
+        for labels, n in sorted(self.in_flight.items()):
+            lines.append(f"retogen_http_requests_in_flight{_labels(('method', 'route'), labels)} {n}")
+
+        lines += [
+            "# HELP retogen_http_request_duration_seconds HTTP request latency.",
+            "# TYPE retogen_http_request_duration_seconds histogram",
+        ]
+        lines += self.latency.render("retogen_http_request_duration_seconds", ("method", "route"))
+
+        lines += [
+            "# HELP retogen_http_response_size_bytes HTTP response body size.",
+            "# TYPE retogen_http_response_size_bytes histogram",
+        ]
+        lines += self.response_size.render("retogen_http_response_size_bytes", ("method", "route"))
+        return lines
+
+
+http_metrics = HttpMetrics()
+
+
+def route_template(app, scope):
+    """Path template of the matching route ("/article/{article_id}/image"), bounded label set."""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (streaming responses pass through untouched):
+    in-flight gauge, latency and response size per route, and the
+    `confirmation` outcome read from the first body chunk.
+    """
+
+    def __init__(self, app, metrics: HttpMetrics = http_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope["app"], scope)
+        state = {"status": 500, "size": 0, "outcome": "none", "json": False, "first": True}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name == b"content-type" and value.startswith(b"application/json"):
+                        state["json"] = True
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                state["size"] += len(body)
+                if state["first"] and state["json"]:
+                    match = _CONFIRMATION.match(body[:METRICS_SNIFF_BYTES])
+                    if match:
+                        state["outcome"] = match.group(1).decode("utf-8", "replace")
+                state["first"] = False
+            await send(message)
+
+        self.metrics.begin(method, route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.end(method, route, state["status"], state["outcome"],
+                             time.perf_counter() - start, state["size"])
+
+
+def _family(name, kind, help_text, samples):
+    """One metric family: HELP / TYPE lines plus (labels, value) samples."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{labels} {value}")
+    return lines
+
+
+def _stats_families(prefix, stats: dict, help_text: str, counters=()):
+    """
+    Numeric stats as gauges; keys in `counters` only ever grow and are
+    exported as counters with a _total suffix.
+    """
+    lines = []
+    for key, value in sorted(stats.items()):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if key in counters:
+            name = f"{prefix}_{key}" if key.endswith("_total") else f"{prefix}_{key}_total"
+            lines += _family(name, "counter", help_text, [("", value)])
+        else:
+            lines += _family(f"{prefix}_{key}", "gauge", help_text, [("", value)])
+    return lines
+
+
+def render_metrics():
+    """Text exposition format (version 0.0.4) of HTTP, Mongo pool / commands, caches, hasher and health."""
+    from db.connection import pool_metrics, command_metrics
+    from core.cache import user_cache, article_detail_cache
+    from core.password_hasher import password_hasher
+    from core.health import mongo_health
+
+    lines = http_metrics.render()
+
+    pool = pool_metrics.stats()
+    buckets = pool.pop("wait_buckets_ms")
+    wait_total_ms = pool.pop("wait_ms_total")
+    lines += _stats_families("retogen_mongo_pool", pool, "Motor connection pool statistic.",
+                             counters=("checkouts", "checkout_failures", "pool_clears"))
+    lines += ["# HELP retogen_mongo_pool_checkout_wait_seconds Connection checkout wait time.",
+              "# TYPE retogen_mongo_pool_checkout_wait_seconds histogram"]
+    cumulative = 0
+    for bound, n in buckets.items():
+        cumulative += n
+        le = bound if bound == "+Inf" else int(bound) / 1000
+        lines.append(f"retogen_mongo_pool_checkout_wait_seconds_bucket{_labels(('le',), (le,))} {cumulative}")
+    lines.append(f"retogen_mongo_pool_checkout_wait_seconds_sum {wait_total_ms / 1000}")
+    lines.append(f"retogen_mongo_pool_checkout_wait_seconds_count {cumulative}")
+
+    commands = command_metrics.stats()
+    lines += _family("retogen_mongo_commands_total", "counter", "Mongo commands issued by the app.",
+                     [("", commands["commands"])])
+    lines += _family("retogen_mongo_command_failures_total", "counter", "Mongo commands that failed.",
+                     [("", commands["failures"])])
+    lines += _family("retogen_mongo_command_duration_seconds_total", "counter", "Time spent in Mongo commands.",
+                     [("", commands["duration_ms_total"] / 1000)])
+    lines += _family("retogen_mongo_commands_by_name_total", "counter", "Mongo commands by command name.",
+                     [(_labels(("command",), (name,)), n) for name, n in sorted(commands["by_name"].items())])
+
+    caches = {"user": user_cache.stats(), "article_detail": article_detail_cache.stats()}
+    cache_counters = ("hits", "misses", "evictions", "expirations", "invalidations")
+    for key in sorted(caches["user"]):
+        samples = [(_labels(("cache",), (cache_name,)), stats[key]) for cache_name, stats in caches.items()
+                   if isinstance(stats.get(key), (int, float))]
+        if key in cache_counters:
+            lines += _family(f"retogen_cache_{key}_total", "counter", "In-process cache statistic.", samples)
+        else:
+            lines += _family(f"retogen_cache_{key}", "gauge", "In-process cache statistic.", samples)
+
+    lines += _stats_families("retogen_password_hasher", password_hasher.stats(), "bcrypt hasher pool statistic.",
+                             counters=("completed", "rejected"))
+
+    health = mongo_health.stats()
+    lines += _stats_families("retogen_mongo_health", health, "Mongo health monitor statistic.",
+                             counters=("checks", "failures", "rejected_requests"))
+    lines += _family("retogen_mongo_circuit_open", "gauge", "1 while the Mongo circuit breaker is open.",
+                     [("", 1 if health["state"] == "open" else 0)])
+    lines += _family("retogen_process_start_time_seconds", "gauge", "Start time of the process (unix seconds).",
+                     [("", http_metrics.started_at)])
+
+    return "\n".join(lines) + "\n"
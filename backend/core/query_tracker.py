@@ -0,0 +1,146 @@
+import contextvars
+import os
+import threading
+import time
+from pymongo import monitoring
+
+# > N perintah dengan bentuk sama dalam satu request → dicurigai N+1
+MONGO_REPEAT_THRESHOLD = int(os.getenv("MONGO_REPEAT_THRESHOLD", "5"))
+
+# perintah handshake / monitoring tidak dihitung
+IGNORED_COMMANDS = {"ping", "hello", "ismaster", "isMaster", "buildInfo", "saslStart", "saslContinue", "endSessions"}
+
+# field berisi filter / pipeline per jenis perintah
+_SHAPE_FIELDS = {
+    "find": ("filter", "sort"),
+    "aggregate": ("pipeline",),
+    "count": ("query",),
+    "distinct": ("key", "query"),
+    "findAndModify": ("query",),
+}
+
+
+def _shape(value):
+    """Structure of a filter with every literal replaced by '?'."""
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k}:{_shape(v)}" for k, v in sorted(value.items())) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + (_shape(value[0]) if value else "") + "]"
+    return "?"
+
+
+def command_shape(command_name: str, command: dict):
+    """e.g. 'find comment {article_id:?}' — identical for queries that differ only in values."""
+    collection = command.get(command_name)
+    parts = [command_name, str(collection) if isinstance(collection, str) else ""]
+    for field in _SHAPE_FIELDS.get(command_name, ()):
+        if field == "pipeline" and isinstance(command.get(field), list):
+            parts.append("[" + ",".join(_shape(stage) for stage in command[field]) + "]")
+        elif field in command:
+            parts.append(_shape(command[field]))
+    if command_name in ("update", "delete") and command.get(command_name + "s"):
+        parts.append(_shape(command[command_name + "s"][0].get("q", {})))
+    return " ".join(p for p in parts if p)
+
+
+class RequestQueries:
+    """
+    Mongo commands of one HTTP request. Shared by every task of the request
+    (contextvar); commands finish on Motor's executor threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.started_at = time.perf_counter()
+        self.count = 0
+        self.failures = 0
+        self.duration_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest = None
+        self.shapes = {}
+
+    def started(self, request_id, shape):
+        with self._lock:
+            self._pending[request_id] = shape
+            self.count += 1
+            self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def finished(self, request_id, duration_micros, failed=False):
+        duration_ms = duration_micros / 1000
+        with self._lock:
+            shape = self._pending.pop(request_id, None)
+            self.duration_ms += duration_ms
+            if failed:
+                self.failures += 1
+            if duration_ms > self.slowest_ms:
+                self.slowest_ms = duration_ms
+                self.slowest = shape
+
+    def repeated(self, threshold: int = MONGO_REPEAT_THRESHOLD):
+        with self._lock:
+            return {shape: n for shape, n in self.shapes.items() if n > threshold}
+
+    def server_timing(self):
+        total_ms = (time.perf_counter() - self.started_at) * 1000
+        with self._lock:
+            entries = [
+                f'db;desc="{self.count} mongo commands";dur={self.duration_ms:.1f}',
+                f"app;dur={total_ms:.1f}",
+            ]
+            if self.slowest:
+                # tanda kutip tidak boleh muncul di dalam desc
+                entries.insert(1, f'db-slowest;desc="{self.slowest.replace(chr(34), "")[:80]}";dur={self.slowest_ms:.1f}')
+            return ", ".join(entries)
+
+
+current_queries = contextvars.ContextVar("current_queries", default=None)
+
+
+class RequestCommandListener(monitoring.CommandListener):
+    """
+    Attribute every Mongo command to the request that issued it. Motor copies
+    the caller's context into its executor, so the contextvar set by the
+    middleware is visible here; commands outside a request are ignored.
+    """
+
+    def started(self, event):
+        tracker = current_queries.get()
+        if tracker is None or event.command_name in IGNORED_COMMANDS:
+            return
+        tracker.started(event.request_id, command_shape(event.command_name, event.command))
+
+    def succeeded(self, event):
+        tracker = current_queries.get()
+        if tracker is None or event.command_name in IGNORED_COMMANDS:
+            return
+        tracker.finished(event.request_id, event.duration_micros)
+
+    def failed(self, event):
+        tracker = current_queries.get()
+        if tracker is None or event.command_name in IGNORED_COMMANDS:
+            return
+        tracker.finished(event.request_id, event.duration_micros, failed=True)
+
+
+request_command_listener = RequestCommandListener()
+
+
+async def track_queries(request, call_next):
+    """
+    HTTP middleware: per-request Mongo command count / DB time / slowest
+    command as Server-Timing, plus an N+1 warning for repeated query shapes.
+    """
+    tracker = RequestQueries()
+    token = current_queries.set(tracker)
+    try:
+        response = await call_next(request)
+    finally:
+        current_queries.reset(token)
+
+    response.headers["Server-Timing"] = tracker.server_timing()
+
+    for shape, n in tracker.repeated().items():
+        print("N+1 WARNING:", request.method, request.url.path, f"{n}x", shape)
+
+    return response
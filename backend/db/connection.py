@@ -1,7 +1,247 @@
+import asyncio
 import os
+import threading
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from core.query_tracker import request_command_listener, IGNORED_COMMANDS
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 
-client = AsyncIOMotorClient(MONGO_URI)
-db = client["Retogen"]
+# ganti MONGO_DB ke database scratch untuk benchmark
+MONGO_DB = os.getenv("MONGO_DB", "Retogen")
+
+# Pool per proses (per uvicorn worker): total koneksi ke Mongo = workers × MONGO_MAX_POOL_SIZE
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_MAX_IDLE_MS = int(os.getenv("MONGO_MAX_IDLE_MS", "300000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+# zstd / snappy butuh package tambahan; zlib selalu tersedia; kosong = tanpa kompresi
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zlib")
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+MONGO_READ_CONCERN = os.getenv("MONGO_READ_CONCERN", "local")
+MONGO_WRITE_CONCERN = os.getenv("MONGO_WRITE_CONCERN", "majority")
+MONGO_WARMUP_CONNECTIONS = int(os.getenv("MONGO_WARMUP_CONNECTIONS", str(MONGO_MIN_POOL_SIZE)))
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool utilization from pymongo pool events. Events arrive on
+    driver threads (Motor runs pymongo in an executor), hence the lock.
+    """
+
+    # batas bucket waktu tunggu checkout (ms)
+    WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 1000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.wait_buckets = [0] * (len(self.WAIT_BUCKETS_MS) + 1)
+        self.pool_clears = 0
+
+    def _observe_wait(self, duration):
+        wait_ms = (duration or 0) * 1000
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        for i, bound in enumerate(self.WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                self.wait_buckets[i] += 1
+                return
+        self.wait_buckets[-1] += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.closed += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+            self._observe_wait(event.duration)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+            self._observe_wait(event.duration)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def connection_check_out_started(self, event): pass
+    def connection_ready(self, event): pass
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+
+    def stats(self):
+        with self._lock:
+            observed = self.checkouts + self.checkout_failures
+            return {
+                "max_pool_size": MONGO_MAX_POOL_SIZE,
+                "min_pool_size": MONGO_MIN_POOL_SIZE,
+                "open_connections": self.created - self.closed,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "utilization": self.checked_out / MONGO_MAX_POOL_SIZE if MONGO_MAX_POOL_SIZE else 0,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_ms": self.wait_ms_total / observed if observed else 0,
+                "max_wait_ms": self.wait_ms_max,
+                "wait_ms_total": self.wait_ms_total,
+                "wait_buckets_ms": dict(zip([str(b) for b in self.WAIT_BUCKETS_MS] + ["+Inf"], self.wait_buckets)),
+                "pool_clears": self.pool_clears,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Mongo commands issued by the app. Handshake / monitoring commands
+    (ping from the health monitor, hello, auth) are not counted.
+    """
+
+    IGNORED = IGNORED_COMMANDS
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands = 0
+        self.failures = 0
+        self.duration_ms_total = 0.0
+        self.by_name = {}
+
+    def started(self, event):
+        if event.command_name in self.IGNORED:
+            return
+        with self._lock:
+            self.commands += 1
+            self.by_name[event.command_name] = self.by_name.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        if event.command_name in self.IGNORED:
+            return
+        with self._lock:
+            self.duration_ms_total += event.duration_micros / 1000
+
+    def failed(self, event):
+        if event.command_name in self.IGNORED:
+            return
+        with self._lock:
+            self.failures += 1
+            self.duration_ms_total += event.duration_micros / 1000
+
+    def stats(self):
+        with self._lock:
+            return {
+                "commands": self.commands,
+                "failures": self.failures,
+                "duration_ms_total": self.duration_ms_total,
+                "by_name": dict(self.by_name),
+            }
+
+
+command_metrics = CommandMetrics()
+
+
+def create_client(uri: str = MONGO_URI, **overrides):
+    """Motor client configured from the MONGO_* settings (overrides win)."""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "readPreference": MONGO_READ_PREFERENCE,
+        "readConcernLevel": MONGO_READ_CONCERN,
+        "w": int(MONGO_WRITE_CONCERN) if MONGO_WRITE_CONCERN.isdigit() else MONGO_WRITE_CONCERN,
+        "event_listeners": [pool_metrics, command_metrics, request_command_listener],
+    }
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    options.update(overrides)
+    return AsyncIOMotorClient(uri, **options)
+
+
+# dibuat saat pertama dipakai (lifespan / CLI), bukan saat import
+client = None
+_database = None
+
+
+def configure(new_client, database: str = None):
+    """Use `new_client` (tests, in-memory bench) instead of one built from the settings."""
+    global client, _database
+    client = new_client
+    _database = new_client[database or MONGO_DB]
+
+
+def get_client():
+    if client is None:
+        configure(create_client())
+    return client
+
+
+def get_db():
+    if _database is None:
+        get_client()
+    return _database
+
+
+class LazyDatabase:
+    """
+    `from db.connection import db` handle. Resolves to the configured
+    database on every access, so the client can be built (or swapped)
+    after the services have been imported.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+    def __getitem__(self, name):
+        return get_db()[name]
+
+
+db = LazyDatabase()
+
+
+async def warm_up():
+    """
+    Open MONGO_WARMUP_CONNECTIONS connections at boot (concurrent pings each
+    check out their own connection) so the first requests don't pay for
+    TCP/TLS/auth handshakes.
+    """
+    if MONGO_WARMUP_CONNECTIONS <= 0:
+        return
+    try:
+        await asyncio.gather(*(db.command("ping") for _ in range(MONGO_WARMUP_CONNECTIONS)))
+    except Exception as e:
+        print("MONGO WARM UP ERROR:", e)
+
+
+def close_client():
+    global client, _database
+    if client is not None:
+        client.close()
+    client = None
+    _database = None
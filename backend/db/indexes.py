@@ -0,0 +1,177 @@
+import asyncio
+import os
+from pymongo import ASCENDING, DESCENDING, TEXT
+from db.connection import db
+
+# Registry semua index aplikasi: (collection, keys, options). Setiap index wajib
+# punya "name" — drift dibandingkan per nama.
+INDEXES = [
+    # --- article ---
+    # feed: filter is_deleted, urut (created_at, _id) terbaru dulu
+    ("article", [("is_deleted", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+     {"name": "article_feed"}),
+    ("article", [("is_deleted", ASCENDING), ("rating_avg", DESCENDING), ("_id", DESCENDING)],
+     {"name": "article_feed_rating"}),
+    ("article", [("is_deleted", ASCENDING), ("comment_count", DESCENDING), ("_id", DESCENDING)],
+     {"name": "article_feed_comments"}),
+    # listing per tag: equality (is_deleted, article_tag) lalu sort key
+    ("article", [("is_deleted", ASCENDING), ("article_tag", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+     {"name": "article_tag_newest"}),
+    ("article", [("is_deleted", ASCENDING), ("article_tag", ASCENDING), ("rating_avg", DESCENDING), ("_id", DESCENDING)],
+     {"name": "article_tag_rating"}),
+    ("article", [("is_deleted", ASCENDING), ("article_tag", ASCENDING), ("comment_count", DESCENDING), ("_id", DESCENDING)],
+     {"name": "article_tag_comments"}),
+    # search: is_deleted sebagai prefix (equality) → hanya artikel aktif yang di-scan
+    ("article", [("is_deleted", ASCENDING), ("article_title", TEXT), ("article_preview", TEXT), ("article_content", TEXT)],
+     {"name": "article_text",
+      "weights": {"article_title": 10, "article_preview": 4, "article_content": 1},
+      "default_language": "english"}),
+
+    # --- comment ---
+    ("comment", [("article_id", ASCENDING), ("created_at", ASCENDING)],
+     {"name": "comment_article"}),
+    ("comment", [("article_id", ASCENDING), ("parent_comment_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+     {"name": "comment_thread"}),
+    ("comment", [("ancestors", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+     {"name": "comment_ancestors"}),
+    ("comment", [("owner_id", ASCENDING)],
+     {"name": "comment_owner"}),
+
+    # --- rating ---
+    # satu rating per user per artikel
+    ("rating", [("article_id", ASCENDING), ("owner_id", ASCENDING)],
+     {"name": "rating_article_owner", "unique": True}),
+    ("rating", [("owner_id", ASCENDING)],
+     {"name": "rating_owner"}),
+
+    # --- user ---
+    ("user", [("email", ASCENDING)],
+     {"name": "user_email", "unique": True}),
+
+    # --- reports ---
+    ("report_user", [("reported_user_id", ASCENDING)],
+     {"name": "report_user_reported"}),
+    ("report_article", [("article_id", ASCENDING)],
+     {"name": "report_article_article"}),
+]
+
+# laporan drift setelah build dibatasi waktu: Mongo down / lambat tidak menggantung task
+INDEX_CHECK_TIMEOUT = float(os.getenv("INDEX_CHECK_TIMEOUT", "3"))
+
+# option yang ikut dibandingkan saat cek drift
+COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "weights", "default_language")
+
+
+async def ensure_indexes():
+    """
+    Create declared indexes (idempotent: existing identical indexes are left
+    alone). Returns {"ok": n, "failed": [(collection, name, error)]}.
+    """
+    result = {"ok": 0, "failed": []}
+    for collection, keys, options in INDEXES:
+        try:
+            await db[collection].create_index(keys, **options)
+            result["ok"] += 1
+        except Exception as e:
+            print("ENSURE INDEX ERROR:", collection, options.get("name"), e)
+            result["failed"].append((collection, options.get("name"), str(e)))
+    return result
+
+
+def _declared_spec(keys, options):
+    """Normalize a declared index to the shape of index_information()."""
+    text_fields = [k for k, v in keys if v == TEXT]
+    if text_fields:
+        # text index disimpan sebagai _fts/_ftsx; field teks muncul di weights
+        key = [(k, v) for k, v in keys if v != TEXT] + [("_fts", "text"), ("_ftsx", 1)]
+        options = dict(options)
+        options.setdefault("weights", {k: 1 for k in text_fields})
+    else:
+        key = list(keys)
+    spec = {"key": key}
+    for option in COMPARED_OPTIONS:
+        if option in options:
+            spec[option] = options[option]
+    return spec
+
+
+def _actual_spec(info):
+    spec = {"key": [(k, v if isinstance(v, str) else int(v)) for k, v in info["key"]]}
+    for option in COMPARED_OPTIONS:
+        if option in info:
+            spec[option] = info[option]
+    if "default_language" in spec and "weights" not in spec:
+        spec.pop("default_language")
+    return spec
+
+
+async def index_drift():
+    """
+    Compare declared indexes with the ones that exist.
+    Returns a list of {"collection", "name", "status": missing|changed|extra, ...}.
+    """
+    declared = {}
+    for collection, keys, options in INDEXES:
+        declared.setdefault(collection, {})[options["name"]] = _declared_spec(keys, options)
+
+    drift = []
+    for collection, indexes in declared.items():
+        actual = await db[collection].index_information()
+        actual = {name: _actual_spec(info) for name, info in actual.items() if name != "_id_"}
+
+        for name, spec in indexes.items():
+            if name not in actual:
+                drift.append({"collection": collection, "name": name, "status": "missing", "declared": spec})
+            elif actual[name] != spec:
+                drift.append({"collection": collection, "name": name, "status": "changed",
+                              "declared": spec, "actual": actual[name]})
+
+        for name, spec in actual.items():
+            if name not in indexes:
+                drift.append({"collection": collection, "name": name, "status": "extra", "actual": spec})
+
+    return drift
+
+
+async def drop_extra_indexes(drift):
+    """Drop the indexes index_drift() reported as extra. Returns the dropped names."""
+    dropped = []
+    for d in drift:
+        if d["status"] == "extra":
+            await db[d["collection"]].drop_index(d["name"])
+            dropped.append(f"{d['collection']}.{d['name']}")
+    return dropped
+
+
+async def check_indexes(timeout: float = INDEX_CHECK_TIMEOUT):
+    """
+    Log drift from the registry. Gives up after `timeout` seconds so an
+    unreachable Mongo doesn't leave the report hanging.
+    """
+    try:
+        drift = await asyncio.wait_for(index_drift(), timeout)
+    except Exception as e:
+        print("INDEX DRIFT ERROR:", type(e).__name__, e)
+        return None
+    for d in drift:
+        print("INDEX DRIFT:", d["status"], f"{d['collection']}.{d['name']}")
+    if drift:
+        print("INDEX DRIFT: run `python cli.py ensure-indexes` to apply the registry")
+    return drift
+
+
+async def apply_indexes():
+    """
+    Startup hook, run as a background task so boot isn't blocked: apply
+    the registry (idempotent), then log the remaining drift.
+    """
+    try:
+        result = await ensure_indexes()
+        print("ENSURE INDEXES:", f"ok={result['ok']} failed={len(result['failed'])}")
+    except Exception as e:
+        print("ENSURE INDEXES ERROR:", e)
+    return await check_indexes()
+
+
+def start_index_build():
+    return asyncio.create_task(apply_indexes())
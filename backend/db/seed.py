@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from bson import json_util
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+from db.connection import db
+
+# nama file seed (Retogen.<name>.json) → collection yang dibaca backend
+SEED_COLLECTIONS = {
+    "article": "article",
+    "comment": "comment",
+    "rating": "rating",
+    "user": "user",
+    "article_report": "report_article",
+    "user_report": "report_user",
+}
+
+SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", "1000"))
+SEED_READ_CHUNK = 64 * 1024
+
+# Extended JSON ($oid / $date / $binary) → tipe BSON
+_decoder = json.JSONDecoder(object_hook=json_util.object_hook)
+
+
+def collection_for(path: Path):
+    name = path.name
+    if name.startswith("Retogen."):
+        name = name[len("Retogen."):]
+    for ext in (".json", ".ndjson"):
+        if name.endswith(ext):
+            name = name[:-len(ext)]
+    return SEED_COLLECTIONS.get(name, name)
+
+
+def iter_json_array(path: Path, chunk_size: int = SEED_READ_CHUNK):
+    """
+    Yield the documents of a JSON array file (mongoexport --jsonArray) or an
+    NDJSON file one at a time; only the current document and one read chunk
+    are kept in memory.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+        started = False
+
+        while True:
+            # lewati spasi, '[' pembuka dan ',' pemisah
+            while pos < len(buf) and (buf[pos].isspace() or buf[pos] == "," or (not started and buf[pos] == "[")):
+                started = started or buf[pos] == "["
+                pos += 1
+
+            if pos < len(buf) and buf[pos] == "]":
+                return
+
+            if pos < len(buf):
+                try:
+                    doc, end = _decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    doc = None
+                if doc is not None:
+                    yield doc
+                    pos = end
+                    continue
+
+            if eof:
+                if started:
+                    raise ValueError(f"{path.name}: unterminated JSON array")
+                return
+
+            # dokumen belum lengkap → buang yang sudah diproses, baca chunk berikutnya
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+
+async def import_file(path: Path, collection: str, drop: bool = True, batch_size: int = SEED_BATCH_SIZE):
+    """
+    Stream one seed file into `collection` with unordered bulk_write batches.
+    Duplicate keys (re-import without drop) are counted, not fatal.
+    """
+    stats = {"file": path.name, "collection": collection, "docs": 0, "inserted": 0, "errors": 0,
+             "bytes": path.stat().st_size, "seconds": 0.0}
+    start = time.perf_counter()
+
+    if drop:
+        await db[collection].drop()
+
+    async def flush(ops):
+        try:
+            result = await db[collection].bulk_write(ops, ordered=False)
+            stats["inserted"] += result.inserted_count
+        except BulkWriteError as e:
+            stats["inserted"] += e.details.get("nInserted", 0)
+            stats["errors"] += len(e.details.get("writeErrors", []))
+
+    ops = []
+    for doc in iter_json_array(path):
+        ops.append(InsertOne(doc))
+        stats["docs"] += 1
+        if len(ops) >= batch_size:
+            await flush(ops)
+            ops = []
+    if ops:
+        await flush(ops)
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+async def derive_fields():
+    """
+    Fields the seed files predate: comment ancestors paths, article
+    comment_count and rating aggregates.
+    """
+    from services.comment_service import CommentService
+    from services.article_service import ArticleService
+    from services.rating_service import RatingService
+
+    ancestors = await CommentService.backfill_ancestors()
+    counters = await ArticleService.backfill_listing_counters()
+    ratings = await RatingService.reconcile_aggregates()
+    return {"ancestors": ancestors["updated"], "comment_counts": counters, "ratings_fixed": ratings}
+
+
+async def import_seed(seed_dir: Path, drop: bool = True, batch_size: int = SEED_BATCH_SIZE, derive: bool = True):
+    """
+    Load every Retogen.*.json / *.ndjson in seed_dir, all collections concurrently,
+    then build the index registry (db/indexes.py) and derived fields.
+    """
+    from db.indexes import ensure_indexes
+
+    files = sorted(seed_dir.glob("Retogen.*.json")) + sorted(seed_dir.glob("Retogen.*.ndjson"))
+    start = time.perf_counter()
+
+    loaded = await asyncio.gather(*[
+        import_file(path, collection_for(path), drop, batch_size) for path in files
+    ])
+    load_seconds = time.perf_counter() - start
+
+    # index dibangun setelah data masuk: satu build per index, bukan per insert
+    index_start = time.perf_counter()
+    indexes = await ensure_indexes()
+    index_seconds = time.perf_counter() - index_start
+
+    derived = await derive_fields() if derive else None
+
+    return {
+        "files": loaded,
+        "load_seconds": load_seconds,
+        "index_seconds": index_seconds,
+        "indexes": indexes,
+        "derived": derived,
+        "seconds": time.perf_counter() - start,
+    }
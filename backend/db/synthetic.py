@@ -0,0 +1,240 @@
+import random
+import struct
+from datetime import datetime, timedelta
+from pathlib import Path
+from bson import ObjectId, json_util
+from bson.json_util import JSONOptions, JSONMode
+from db.seed import iter_json_array, collection_for
+
+# dataset mulai dari titik waktu tetap → output identik untuk seed yang sama
+EPOCH = datetime(2025, 1, 1)
+SPAN_SECONDS = 365 * 24 * 3600
+
+# byte pembeda di ObjectId per collection (timestamp 4 + kind 1 + counter 7)
+KIND = {"user": 1, "article": 2, "comment": 3, "rating": 4, "report_article": 5, "report_user": 6}
+
+# peluang komentar berupa reply, dan kedalaman thread maksimum
+REPLY_PROBABILITY = 0.45
+MAX_REPLY_DEPTH = 8
+
+_ndjson_options = JSONOptions(json_mode=JSONMode.RELAXED)
+
+
+def synthetic_oid(kind: str, n: int, when: datetime):
+    seconds = int((when - datetime(1970, 1, 1)).total_seconds())
+    return ObjectId(struct.pack(">IB", seconds, KIND[kind]) + n.to_bytes(7, "big"))
+
+
+def skewed_counts(rng: random.Random, total: int, buckets: int, cap: int = None):
+    """
+    Split `total` over `buckets` with a long tail (a few very busy articles,
+    many quiet ones). Exact sum unless `cap` forces some of it away.
+    """
+    if buckets == 0:
+        return []
+    weights = [rng.paretovariate(1.16) for _ in range(buckets)]
+    scale = total / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    for i in range(total - sum(counts)):
+        counts[i % buckets] += 1
+    if cap is not None:
+        counts = [min(c, cap) for c in counts]
+    return counts
+
+
+class MongoSink:
+    """Buffered insert_many(ordered=False) per collection."""
+
+    def __init__(self, db, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.counts = {}
+
+    async def add(self, collection: str, doc: dict):
+        buf = self.buffers.setdefault(collection, [])
+        buf.append(doc)
+        if len(buf) >= self.batch_size:
+            await self.flush(collection)
+
+    async def flush(self, collection: str):
+        buf = self.buffers.get(collection)
+        if buf:
+            await self.db[collection].insert_many(buf, ordered=False)
+            self.counts[collection] = self.counts.get(collection, 0) + len(buf)
+            self.buffers[collection] = []
+
+    async def close(self):
+        for collection in list(self.buffers):
+            await self.flush(collection)
+
+
+class NdjsonSink:
+    """One Retogen.<collection>.ndjson per collection (Extended JSON, relaxed)."""
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self.files = {}
+        self.counts = {}
+
+    async def add(self, collection: str, doc: dict):
+        f = self.files.get(collection)
+        if f is None:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            f = self.files[collection] = open(self.out_dir / f"Retogen.{collection}.ndjson", "w", encoding="utf-8")
+        f.write(json_util.dumps(doc, json_options=_ndjson_options))
+        f.write("\n")
+        self.counts[collection] = self.counts.get(collection, 0) + 1
+
+    async def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+def load_templates(seed_dir: Path):
+    templates = {}
+    for path in sorted(seed_dir.glob("Retogen.*.json")):
+        templates[collection_for(path)] = list(iter_json_array(path))
+    return templates
+
+
+async def generate(sink, seed_dir: Path, articles: int, comments: int, ratings: int, users: int,
+                   reports: int = None, seed: int = 42):
+    """
+    Deterministic dataset shaped like the seed files: string article_id /
+    owner_id / author_id in articles, comments and ratings, ObjectId in
+    reports. Comments carry ancestors (reply depth up to MAX_REPLY_DEPTH),
+    articles carry matching comment_count / rating aggregates / report_count.
+    Article images are left out. Ratings per article are capped at `users`
+    (unique article/owner index). Returns the per-collection counts.
+    """
+    rng = random.Random(seed)
+    templates = load_templates(seed_dir)
+    article_tpl = templates["article"]
+    user_tpl = templates["user"]
+    comment_texts = [c["comment_content"] for c in templates["comment"]]
+    report_texts = [r["description"] for r in templates.get("report_article", [])] or ["Spam"]
+    user_report_texts = [r["description"] for r in templates.get("report_user", [])] or ["Spam"]
+    if reports is None:
+        reports = articles // 50
+
+    # --- users ---
+    user_ids = []
+    user_report_n = 0
+    user_report_counts = skewed_counts(rng, reports // 2, users)
+    for i in range(users):
+        tpl = user_tpl[i % len(user_tpl)]
+        when = EPOCH + timedelta(seconds=rng.randrange(SPAN_SECONDS // 4))
+        oid = synthetic_oid("user", i, when)
+        user_ids.append(str(oid))
+        await sink.add("user", {
+            "_id": oid,
+            "username": f"{tpl['username']}_{i}",
+            "fullname": tpl["fullname"],
+            "email": f"user{i}@example.com",
+            "password": tpl["password"],
+            "role": "admin" if i < max(1, users // 1000) else "user",
+            "token_version": 0,
+            "created_at": when,
+            "updated_at": when,
+            "report_count": user_report_counts[i],
+        })
+        for _ in range(user_report_counts[i]):
+            reported_at = when + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+            await sink.add("report_user", {
+                "_id": synthetic_oid("report_user", user_report_n, reported_at),
+                "reported_user_id": oid,
+                "description": rng.choice(user_report_texts),
+                "created_at": reported_at,
+            })
+            user_report_n += 1
+
+    admins = user_ids[:max(1, users // 1000)]
+
+    # --- articles + comments + ratings + reports, artikel demi artikel ---
+    comment_counts = skewed_counts(rng, comments, articles)
+    rating_counts = skewed_counts(rng, ratings, articles, cap=users)
+    report_counts = skewed_counts(rng, reports - reports // 2, articles)
+    comment_n = 0
+    rating_n = 0
+    report_n = 0
+
+    for i in range(articles):
+        base = article_tpl[i % len(article_tpl)]
+        other = article_tpl[rng.randrange(len(article_tpl))]
+        created = EPOCH + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+        article_oid = synthetic_oid("article", i, created)
+        article_id = str(article_oid)
+
+        # thread: reply ke komentar yang lebih awal, condong ke yang terbaru
+        thread = []
+        when = created
+        for _ in range(comment_counts[i]):
+            when += timedelta(seconds=rng.randrange(1, 6 * 3600))
+            parent = None
+            if thread and rng.random() < REPLY_PROBABILITY:
+                parent = thread[-1 - min(int(rng.expovariate(0.5)), len(thread) - 1)]
+                if len(parent[1]) >= MAX_REPLY_DEPTH:
+                    parent = None
+            oid = synthetic_oid("comment", comment_n, when)
+            comment_n += 1
+            ancestors = parent[1] + [parent[0]] if parent else []
+            thread.append((str(oid), ancestors))
+            await sink.add("comment", {
+                "_id": oid,
+                "article_id": article_id,
+                "owner_id": user_ids[rng.randrange(users)],
+                "parent_comment_id": parent[0] if parent else None,
+                "ancestors": ancestors,
+                "comment_content": rng.choice(comment_texts),
+                "created_at": when,
+            })
+
+        histogram = {str(v): 0 for v in range(1, 6)}
+        rating_sum = 0
+        for owner in rng.sample(range(users), rating_counts[i]):
+            value = min(5, max(1, round(rng.gauss(3.8, 1.1))))
+            histogram[str(value)] += 1
+            rating_sum += value
+            rated_at = created + timedelta(seconds=rng.randrange(SPAN_SECONDS // 12))
+            await sink.add("rating", {
+                "_id": synthetic_oid("rating", rating_n, rated_at),
+                "article_id": article_id,
+                "owner_id": user_ids[owner],
+                "rating_value": value,
+                "created_at": rated_at,
+            })
+            rating_n += 1
+
+        for _ in range(report_counts[i]):
+            reported_at = created + timedelta(seconds=rng.randrange(SPAN_SECONDS // 12))
+            await sink.add("report_article", {
+                "_id": synthetic_oid("report_article", report_n, reported_at),
+                "article_id": article_oid,
+                "description": rng.choice(report_texts),
+                "created_at": reported_at,
+            })
+            report_n += 1
+
+        sentences = base["article_content"].split(". ") + other["article_content"].split(". ")
+        rng.shuffle(sentences)
+        await sink.add("article", {
+            "_id": article_oid,
+            "article_title": f"{base['article_title']} #{i}",
+            "article_preview": base["article_preview"],
+            "article_content": ". ".join(sentences[:len(sentences) // 2])[:65536],
+            "article_tag": base["article_tag"] if rng.random() < 0.5 else other["article_tag"],
+            "author_id": rng.choice(admins),
+            "report_count": report_counts[i],
+            "comment_count": comment_counts[i],
+            "rating_count": rating_counts[i],
+            "rating_sum": rating_sum,
+            "rating_histogram": histogram,
+            "rating_avg": rating_sum / rating_counts[i] if rating_counts[i] else 0,
+            "created_at": created,
+            "updated_at": created,
+            "is_deleted": rng.random() < 0.01,
+        })
+
+    await sink.close()
+    return dict(sink.counts)
@@ -1,12 +1,37 @@
+import asyncio
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from core.api_handlers import validation_exception_handler
-from routes import auth, article, comment, rating, report_article, report_user, user
+from core.api_handlers import validation_exception_handler, confirmation_exception_handler
+from core.exceptions import ConfirmationError
+from routes import auth, article, comment, rating, report_article, report_user, user, health, metrics
+from services.thumbnail_service import ThumbnailService
+from db.indexes import start_index_build
+from db.connection import warm_up, close_client
+from core.password_hasher import password_hasher
+from core.health import mongo_health, require_database
+from core.query_tracker import track_queries
+from core.metrics import MetricsMiddleware
 import uvicorn
 
-app = FastAPI(title="Updated Backend Template")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # startup: warm-up pool Mongo, build index + laporan drift di background, health monitor
+    await warm_up()
+    index_build = start_index_build()
+    mongo_health.start()
+    yield
+    # shutdown: stop build index (kalau belum selesai) dan monitor, process pool thumbnail, thread pool bcrypt, client Mongo
+    index_build.cancel()
+    await asyncio.gather(index_build, return_exceptions=True)
+    await mongo_health.stop()
+    ThumbnailService.shutdown()
+    password_hasher.shutdown()
+    close_client()
+
+app = FastAPI(title="Updated Backend Template", lifespan=lifespan)
 
 # Get allowed origins from environment variable or use defaults for local development
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
@@ -19,16 +44,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Mongo command per request → Server-Timing + peringatan N+1
+app.middleware("http")(track_queries)
+
+# paling luar: latency / ukuran / outcome per route untuk /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Pasang custom error handler
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
+app.add_exception_handler(ConfirmationError, confirmation_exception_handler)
+
+# Semua route yang memakai Mongo gagal cepat saat circuit terbuka
+db_required = [Depends(require_database)]
 
-app.include_router(article.router, prefix="/article", tags=["Article"])
-app.include_router(auth.router, prefix="/auth", tags=["Auth"])
-app.include_router(comment.router, prefix="/comment", tags=["Comment"])
-app.include_router(rating.router, prefix="/rating", tags=["Rating"])
-app.include_router(report_article.router, prefix="/report_article", tags=["Report Article"])
-app.include_router(report_user.router, prefix="/report_user", tags=["Report User"])
-app.include_router(user.router, prefix="/user", tags=["User"])
+app.include_router(article.router, prefix="/article", tags=["Article"], dependencies=db_required)
+app.include_router(auth.router, prefix="/auth", tags=["Auth"], dependencies=db_required)
+app.include_router(comment.router, prefix="/comment", tags=["Comment"], dependencies=db_required)
+app.include_router(rating.router, prefix="/rating", tags=["Rating"], dependencies=db_required)
+app.include_router(report_article.router, prefix="/report_article", tags=["Report Article"], dependencies=db_required)
+app.include_router(report_user.router, prefix="/report_user", tags=["Report User"], dependencies=db_required)
+app.include_router(user.router, prefix="/user", tags=["User"], dependencies=db_required)
+app.include_router(health.router, tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
 
 @app.get("/")
 def root():
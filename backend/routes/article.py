@@ -1,38 +1,103 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response, Depends
+from fastapi.responses import StreamingResponse
 from schemas.edit_article_get_schema import EditArticleGetRequest
 from schemas.edit_article_update_schema import EditArticleUpdateRequest
 from schemas.view_article_schema import ViewArticleRequest
-from schemas.verification_schema import VerificationRequest
-from services.rating_service import RatingService
-from services.comment_service import CommentService
+from services.article_detail_service import ArticleDetailService, ARTICLE_DETAIL_MODE
 from services.article_service import ArticleService
-from services.auth_service import AuthService
+from services.rating_service import RatingService
 from utils.base64_utils import base64_to_bytes, bytes_to_base64
+from utils.image_validator import detect_image_type, image_hash
+from utils.multipart_stream import parse_multipart, MultipartError, BodyTooLarge
+from services.thumbnail_service import ThumbnailService
+from services.image_storage_service import ImageStorageService, ImageUpload, ImageTooLarge, InvalidImage, MAX_IMAGE_BYTES
+from pydantic import ValidationError
 from schemas.delete_article_schema import DeleteArticleRequest
 from bson import ObjectId
+from utils.concurrency import gather_safe, gather_bounded
 from db.connection import db
+from core.cache import article_detail_cache
 from schemas.add_article_schema import AddArticle
 from schemas.main_page_schema import MainPageRequest
+from schemas.feed_schema import FeedRequest
+from schemas.search_schema import SearchRequest
+from utils.search_snippet import query_terms, highlight_snippet
+from utils.pagination import decode_cursor, clamp_page_size
+from core.dependencies import get_current_user, get_current_admin
+import os
 
 router = APIRouter()
 
+FEED_PAGE_SIZE = int(os.getenv("FEED_PAGE_SIZE", "20"))
+FEED_MAX_PAGE_SIZE = int(os.getenv("FEED_MAX_PAGE_SIZE", "100"))
+# search dipaginasi dengan skip → batasi kedalaman halaman
+SEARCH_MAX_PAGE = int(os.getenv("SEARCH_MAX_PAGE", "50"))
+
+# main_page base64: GridFS read bersamaan per request (bukan satu per artikel sekaligus)
+MAIN_PAGE_IMAGE_CONCURRENCY = int(os.getenv("MAIN_PAGE_IMAGE_CONCURRENCY", "8"))
+
+# batas body multipart: image + field teks (content maks 65536 karakter)
+MAX_UPLOAD_BYTES = MAX_IMAGE_BYTES + 512 * 1024
+
+def validate_article_fields(title, preview, content, tag):
+
+    if not (1 <= len(title or "") <= 256):
+        return {"confirmation": "Title must be 1-256 characters long."}
+
+    if not (1 <= len(preview or "") <= 128):
+        return {"confirmation": "Preview must be 1-128 characters long."}
+
+    if not (1 <= len(content or "") <= 65536):
+        return {"confirmation": "Content must be 1-65536 characters long."}
+
+    allowed_tags = ["office", "budget", "gaming", "flagship"]
+    if tag not in allowed_tags:
+        return {"confirmation": "Invalid article tag."}
+
+    return None
+
+
+async def receive_article_upload(request: Request, upload: ImageUpload):
+    """
+    Stream a multipart article form; the image goes straight to GridFS.
+    Returns (fields, None) or (None, error_response) with the upload aborted.
+    """
+    # tolak sebelum membaca body sama sekali; tanpa Content-Length (chunked) dihitung saat streaming
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        return None, {"confirmation": "image too large"}
+
+    try:
+        fields = await parse_multipart(request, upload, max_body_bytes=MAX_UPLOAD_BYTES)
+    except (ImageTooLarge, BodyTooLarge):
+        await upload.abort()
+        return None, {"confirmation": "image too large"}
+    except InvalidImage:
+        await upload.abort()
+        return None, {"confirmation": "invalid image format"}
+    except MultipartError as e:
+        print("ARTICLE UPLOAD FORM ERROR:", e)
+        await upload.abort()
+        return None, {"confirmation": "invalid form data"}
+    except Exception as e:
+        print("ARTICLE UPLOAD ERROR:", e)
+        await upload.abort()
+        return None, {"confirmation": "backend error"}
+
+    return fields, None
+
+
 @router.post("/edit/get")
-async def edit_get_article(req: EditArticleGetRequest):
+async def edit_get_article(req: EditArticleGetRequest, admin: dict = Depends(get_current_admin)):
 
     article = await ArticleService.fetch_article(req.article_id)
     if article is None:
         return {"confirmation": "backend error"}
 
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    if not await AuthService.is_admin(payload):
-        return {"confirmation": "not admin"}
-
     image_base64 = None
-    if article.get("article_image"):
-        image_base64 = bytes_to_base64(bytes(article["article_image"]))
+    image_bytes = await ImageStorageService.load_article_image(article)
+    if image_bytes:
+        image_base64 = bytes_to_base64(image_bytes)
 
     return {
         "confirmation": "successful",
@@ -46,29 +111,7 @@ async def edit_get_article(req: EditArticleGetRequest):
 
 
 @router.post("/edit/update")
-async def edit_update_article(req: EditArticleUpdateRequest):
-
-    # --- Fetch existing article ---
-    article = await ArticleService.fetch_article(req.article_id)
-    if article is None:
-        return {"confirmation": "backend error"}
-
-    # --- Validate title ---
-    if not (1 <= len(req.article_title) <= 256):
-        return {"confirmation": "Title must be 1-256 characters long."}
-
-    # --- Validate preview ---
-    if not (1 <= len(req.article_preview) <= 128):
-        return {"confirmation": "Preview must be 1-128 characters long."}
-
-    # --- Validate content ---
-    if not (1 <= len(req.article_content) <= 65536):
-        return {"confirmation": "Content must be 1-65536 characters long."}
-
-    # --- Validate tag ---
-    allowed_tags = ["office", "budget", "gaming", "flagship"]
-    if req.article_tag not in allowed_tags:
-        return {"confirmation": "Invalid article tag."}
+async def edit_update_article(req: EditArticleUpdateRequest, admin: dict = Depends(get_current_admin)):
 
     # --- Validate image ---
     try:
@@ -76,12 +119,55 @@ async def edit_update_article(req: EditArticleUpdateRequest):
     except Exception:
         return {"confirmation": "invalid image format"}
 
+    return await edit_article(req, image_bytes)
+
+
+@router.post("/edit/upload")
+async def edit_upload_article(request: Request, admin: dict = Depends(get_current_admin)):
+    """
+    multipart/form-data variant of /edit/update. Same text fields, the image
+    (optional) is the file field `article_image` and is streamed to GridFS.
+    Token via Authorization header or cookie.
+    """
+    upload = ImageUpload()
+    fields, error = await receive_article_upload(request, upload)
+    if error:
+        return error
+
+    try:
+        req = EditArticleUpdateRequest(**{k: v for k, v in fields.items() if k not in ("article_image", "token")})
+    except ValidationError:
+        await upload.abort()
+        return {"confirmation": "invalid form data"}
+
+    image_ref = upload.image_ref() if upload.received else None
+    response = await edit_article(req, None, image_ref)
+    if image_ref and not response["confirmation"].startswith("successful"):
+        await upload.abort()
+    return response
+
+
+async def edit_article(req: EditArticleUpdateRequest, image_bytes: bytes, image_ref: dict = None):
+
+    # --- Fetch existing article ---
+    article = await ArticleService.fetch_article(req.article_id)
+    if article is None:
+        return {"confirmation": "backend error"}
+
+    # --- Validate title, preview, content, tag ---
+    validate_error = validate_article_fields(req.article_title, req.article_preview, req.article_content, req.article_tag)
+    if validate_error:
+        return validate_error
+
     # --- Update article ---
-    result = await ArticleService.update_article(req, image_bytes)
+    result = await ArticleService.update_article(req, image_bytes, image_ref)
 
     if result == "invalid_image":
         return {"confirmation": "invalid image format"}
 
+    if result == "too_large":
+        return {"confirmation": "image too large"}
+
     if not result:
         return {"confirmation": "backend error"}
 
@@ -92,99 +178,30 @@ async def edit_update_article(req: EditArticleUpdateRequest):
 
 
 @router.post("/view")
-async def view_article(req: ViewArticleRequest):
+async def view_article(req: ViewArticleRequest, user: dict = Depends(get_current_user)):
 
-    # ===== Fetch Article =====
-    article = await ArticleService.fetch_article(req.article_id)
-    if article is None:
-        return {"confirmation": "backend error"}
-
-    # ===== Verify Token =====
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    user_email = payload.get("email")
-    user = await db.user.find_one({"email": user_email})
-    is_admin = await AuthService.is_admin(payload)
-    userclass = "admin" if is_admin else "user"
+    # ===== Cache hit: article masih ada, user sudah dari token =====
+    detail = ArticleDetailService.get_cached_detail(req.article_id)
+    if detail is not None:
+        return ArticleDetailService.build_response(user, detail, req.image_format)
 
-    # ===== Convert Image =====
-    image_base64 = None
-    if article.get("article_image"):
-        try:
-            image_base64 = bytes_to_base64(bytes(article["article_image"]))
-        except:
-            image_base64 = None
-
-    # fetch comments
-    comments_raw = await CommentService.get_comments(req.article_id)
-    if comments_raw is None:
-        return {"confirmation": "backend error"}
+    # ===== Fetch Article (jalur aggregate membaca article di query yang sama) =====
+    article = None
+    if ARTICLE_DETAIL_MODE != "aggregate":
+        article = await ArticleService.fetch_article(req.article_id)
+        if article is None:
+            return {"confirmation": "backend error"}
 
-    comments = []
-    for c in comments_raw:
-        try:
-            u = await db.user.find_one({"_id": ObjectId(c["owner_id"])})
-        except:
-            u = None
-
-        comments.append({
-            "comment_id": str(c["_id"]),
-            "parent_comment_id": c.get("parent_comment_id"),
-            "owner": u["username"] if u else "Unknown",
-            "user_email": u["email"],
-            "comment_content": c["comment_content"]
-        })
-
-    # ---- FETCH RATINGS ----
-    ratings_raw = await RatingService.get_ratings(req.article_id)
-    if ratings_raw is None:
+    # ===== FINAL RESPONSE Sesuai Setup =====
+    detail = await ArticleDetailService.fetch_detail(req.article_id, article, mode=ARTICLE_DETAIL_MODE)
+    if detail is None:
         return {"confirmation": "backend error"}
 
-    ratings = []
-    for r in ratings_raw:
-        try:
-            u = await db.user.find_one({"_id": ObjectId(r["owner_id"])})
-        except:
-            u = None
-
-        ratings.append({
-            "rating_id": str(r["_id"]),
-            "owner": u["username"] if u else "Unknown",
-            "user_email": u["email"],
-            "rating_value": r["rating_value"]
-        })
-
-    user_email = payload.get("email")
-    
-    reports_raw = await db.report_article.find({"article_id": ObjectId(req.article_id)}).to_list(None)
-    reports = []
-    for rep in reports_raw:
-        reports.append({
-            "report_id": str(rep["_id"]),
-            "description": rep["description"],
-            "created_at": rep.get("created_at")
-        })
-    
-    # ===== FINAL RESPONSE Sesuai Setup =====
-    return {
-        "confirmation": "successful",
-        "userclass": userclass,
-        "user_email": user_email,
-        "username": user["username"],
-        "article_title": article["article_title"],
-        "article_content": article["article_content"],
-        "article_tag": article["article_tag"],
-        "article_image": image_base64,
-        "comments": comments,
-        "ratings": ratings,
-        "reports": reports
-    }
+    return ArticleDetailService.build_response(user, detail, req.image_format)
 
 
 @router.post("/delete")
-async def delete_article(req: DeleteArticleRequest):
+async def delete_article(req: DeleteArticleRequest, admin: dict = Depends(get_current_admin)):
     from bson import ObjectId, errors
     try:
         article_oid = ObjectId(req.article_id)
@@ -195,58 +212,40 @@ async def delete_article(req: DeleteArticleRequest):
     if article is None:
         return {"confirmation": "backend error"}
 
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    if not await AuthService.is_admin(payload):
-        return {"confirmation": "not admin"}
-
-    try:
-        result = await db.article.update_one(
-            {"_id": article_oid},
-            {"$set": {"is_deleted": True}}
-        )
-    except:
-        return {"confirmation": "backend error"}
-
-    if result.modified_count == 0:
+    if not await ArticleService.soft_delete_article(article_oid):
         return {"confirmation": "backend error"}
 
     return {"confirmation": "successful: article deleted"}
     
     
 @router.post("/main_page")
-async def main_page(req: MainPageRequest):
-
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    user_email = payload.get("email")
-    user = await db.user.find_one({"email": user_email})
-
-    if not user:
-        return {"confirmation": "token invalid"}
+async def main_page(req: MainPageRequest, user: dict = Depends(get_current_user)):
 
     username = user.get("username", "")
 
+    # article_content tidak pernah dipakai di card; blob image hanya untuk mode base64
+    projection = {"article_content": 0}
+    if req.image_format == "url":
+        projection["article_image"] = 0
+
     try:
-        cursor = db.article.find({"is_deleted": False})
+        cursor = db.article.find({"is_deleted": False}, projection)
         articles = await cursor.to_list(length=None)
     except Exception as e:
         print("MAIN PAGE ERROR:", e)
         return {"confirmation": "backend error"}
 
+    images = [None] * len(articles)
+    if req.image_format == "base64":
+        images = await gather_bounded([load_card_image(a) for a in articles], MAIN_PAGE_IMAGE_CONCURRENCY)
+        if images is None:
+            return {"confirmation": "backend error"}
+
     list_article = []
-    for a in articles:
-        list_article.append({
-            "article_id": str(a["_id"]),
-            "article_title": a.get("article_title"),
-            "article_preview": a.get("article_preview"),
-            "article_tag": a.get("article_tag"),
-            "article_image": a.get("article_image").decode("latin1") if a.get("article_image") else None
-        })
+    for a, image_bytes in zip(articles, images):
+        card = article_card(a)
+        card["article_image"] = image_bytes.decode("latin1") if image_bytes else None
+        list_article.append(card)
 
     return {
         "confirmation": "fetch data successful",
@@ -255,65 +254,210 @@ async def main_page(req: MainPageRequest):
     }
 
 
-@router.post("/verification")
-async def verification(req : VerificationRequest):
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
+@router.post("/feed")
+async def feed(req: FeedRequest, user: dict = Depends(get_current_user)):
+    """
+    Paginated main page: card fields only, optionally filtered by tag and
+    sorted by newest / highest_rated / most_commented.
+    Pass next_cursor back as `cursor` (same tag and sort) to get the following page.
+    """
+    after = None
+    if req.cursor:
+        try:
+            after = decode_cursor(req.cursor)
+        except ValueError:
+            return {"confirmation": "invalid cursor"}
 
-    user_email = payload.get("email")
-    if user_email is None:
-        return {"confirmation": "token invalid"}
+    page_size = clamp_page_size(req.page_size, FEED_PAGE_SIZE, FEED_MAX_PAGE_SIZE)
 
-    user = await db.user.find_one({"email": user_email})
-    if not user:
+    page = await ArticleService.get_feed(after, page_size, req.tag, req.sort)
+    if page is None:
         return {"confirmation": "backend error"}
-    
-    if user.get("role") != "admin":
-        return {"confirmation": "not admin"}
-    
+
+    articles, next_cursor = page
     return {
-        "confirmation": "successful"
+        "confirmation": "fetch data successful",
+        "username": user.get("username", ""),
+        "list_article": [article_card(a) for a in articles],
+        "next_cursor": next_cursor
     }
 
 
-@router.post("/add")
-async def add_article(req: AddArticle):
+@router.post("/search")
+async def search_articles(req: SearchRequest, user: dict = Depends(get_current_user)):
+    """
+    Ranked full-text search. Each result is a card plus its relevance
+    score and an HTML snippet with matches wrapped in <mark>.
+    """
+    terms = query_terms(req.query)
+    if not terms:
+        return {"confirmation": "invalid query"}
 
-    # --- Token Verification ---
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
+    if req.page > SEARCH_MAX_PAGE:
+        return {"confirmation": "page out of range"}
 
-    user_email = payload.get("email")
-    if user_email is None:
-        return {"confirmation": "token invalid"}
+    page_size = clamp_page_size(req.page_size, FEED_PAGE_SIZE, FEED_MAX_PAGE_SIZE)
 
-    user = await db.user.find_one({"email": user_email})
-    if not user:
-        return {"confirmation": "token invalid"}
+    found = await ArticleService.search(req.query, req.page, page_size)
+    if found is None:
+        return {"confirmation": "backend error"}
 
-    if user.get("role") != "admin":
-        return {"confirmation": "not admin"}
+    articles, has_more = found
 
-    author_id = str(user["_id"])
+    list_article = []
+    for a in articles:
+        card = article_card(a)
+        card["score"] = a.get("score", 0)
+        # snippet dari content; fallback ke preview jika term hanya ada di title
+        card["snippet"] = highlight_snippet(a.get("article_content", ""), terms)
+        if "<mark>" not in card["snippet"]:
+            card["snippet"] = highlight_snippet(a.get("article_preview", ""), terms)
+        card["article_title_highlighted"] = highlight_snippet(a.get("article_title", ""), terms, width=256)
+        list_article.append(card)
 
-    # --- article_title ---
-    if not (1 <= len(req.article_title) <= 256):
-        return {"confirmation": "Title must be 1-256 characters long."}
+    return {
+        "confirmation": "search successful",
+        "username": user.get("username", ""),
+        "list_article": list_article,
+        "page": req.page,
+        "next_page": req.page + 1 if has_more and req.page < SEARCH_MAX_PAGE else None
+    }
 
-    # --- article_preview ---
-    if not (1 <= len(req.article_preview) <= 128):
-        return {"confirmation": "Preview must be 1-128 characters long."}
 
-    # --- article_content ---
-    if not (1 <= len(req.article_content) <= 65536):
-        return {"confirmation": "Content must be 1-65536 characters long."}
+def article_card(article: dict):
+    return {
+        "article_id": str(article["_id"]),
+        "article_title": article.get("article_title"),
+        "article_preview": article.get("article_preview"),
+        "article_tag": article.get("article_tag"),
+        "rating_summary": RatingService.summary(article),
+        "comment_count": article.get("comment_count", 0),
+        "article_image_url": card_image_url(article)
+    }
 
-    # --- article_tag ---
-    allowed_tags = ["office", "budget", "gaming", "flagship"]
-    if req.article_tag not in allowed_tags:
-        return {"confirmation": "Invalid article tag."}
+
+async def load_card_image(article: dict):
+    thumb = ThumbnailService.current_thumbnail(article, "card")
+    if thumb:
+        image_bytes = await ImageStorageService.read_bytes(thumb["id"])
+        if image_bytes:
+            return image_bytes
+    return await ImageStorageService.load_article_image(article)
+
+
+def card_image_url(article: dict):
+    # card di main page memakai thumbnail kecil bila sudah tersedia
+    thumb = ThumbnailService.current_thumbnail(article, "card")
+    if thumb:
+        return ArticleService.image_url(str(article["_id"]), thumb["hash"], "card")
+    return ArticleService.image_url(str(article["_id"]), article.get("article_image_hash"))
+
+
+@router.get("/{article_id}/image")
+async def article_image(article_id: str, request: Request, size: str = None):
+    if_none_match = request.headers.get("if-none-match")
+
+    if size:
+        article = await ArticleService.fetch_article_image(article_id, include_bytes=False)
+        if article is None:
+            return Response(status_code=404)
+
+        thumb = ThumbnailService.current_thumbnail(article, size)
+        if thumb:
+            if if_none_match and etag_matches(if_none_match, thumb["hash"]):
+                return Response(status_code=304, headers=image_cache_headers(thumb["hash"], request))
+            grid_out = await ImageStorageService.open_stream(thumb["id"])
+            if grid_out is not None:
+                headers = image_cache_headers(thumb["hash"], request)
+                headers["Content-Length"] = str(grid_out.length)
+                return StreamingResponse(iter_grid_out(grid_out), media_type=thumb["type"], headers=headers)
+        # belum ada derivative → fallback ke image asli
+
+    # Revalidation murah: cek hash dulu tanpa menarik blob image
+    if if_none_match:
+        meta = await ArticleService.fetch_article_image(article_id, include_bytes=False)
+        if meta is None:
+            return Response(status_code=404)
+        digest = meta.get("article_image_hash")
+        if digest and etag_matches(if_none_match, digest):
+            return Response(status_code=304, headers=image_cache_headers(digest, request))
+
+    article = await ArticleService.fetch_article_image(article_id)
+    if article is None:
+        return Response(status_code=404)
+
+    # GridFS: stream per chunk (255 KB), tanpa memuat seluruh image
+    if article.get("article_image_id"):
+        grid_out = await ImageStorageService.open_stream(article["article_image_id"])
+        if grid_out is None:
+            return Response(status_code=404)
+
+        digest = article.get("article_image_hash") or str(grid_out._id)
+        if if_none_match and etag_matches(if_none_match, digest):
+            return Response(status_code=304, headers=image_cache_headers(digest, request))
+
+        headers = image_cache_headers(digest, request)
+        headers["Content-Length"] = str(grid_out.length)
+        return StreamingResponse(
+            iter_grid_out(grid_out),
+            media_type=article.get("article_image_type") or "application/octet-stream",
+            headers=headers
+        )
+
+    if not article.get("article_image"):
+        return Response(status_code=404)
+
+    image_bytes = bytes(article["article_image"])
+    digest = article.get("article_image_hash") or image_hash(image_bytes)
+    if if_none_match and etag_matches(if_none_match, digest):
+        return Response(status_code=304, headers=image_cache_headers(digest, request))
+
+    media_type = article.get("article_image_type") or detect_image_type(image_bytes) or "application/octet-stream"
+    return Response(content=image_bytes, media_type=media_type, headers=image_cache_headers(digest, request))
+
+
+async def iter_grid_out(grid_out):
+    while True:
+        chunk = await grid_out.readchunk()
+        if not chunk:
+            break
+        yield chunk
+
+
+def etag_matches(if_none_match: str, digest: str):
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip().removeprefix("W/").strip('"') for t in if_none_match.split(",")]
+    return digest in tags
+
+
+def image_cache_headers(digest: str, request: Request):
+    # URL dengan ?v=<hash> tidak akan pernah berubah isinya → immutable
+    version = request.query_params.get("v")
+    if version and digest.startswith(version):
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        cache_control = "public, no-cache"
+    return {"ETag": f'"{digest}"', "Cache-Control": cache_control}
+
+
+@router.post("/verification")
+async def verification(admin: dict = Depends(get_current_admin)):
+    return {
+        "confirmation": "successful"
+    }
+
+
+@router.post("/cache_stats")
+async def cache_stats(admin: dict = Depends(get_current_admin)):
+    return {
+        "confirmation": "successful",
+        "article_detail_cache": article_detail_cache.stats()
+    }
+
+
+@router.post("/add")
+async def add_article(req: AddArticle, admin: dict = Depends(get_current_admin)):
 
     # --- image ---
     try:
@@ -321,18 +465,65 @@ async def add_article(req: AddArticle):
     except Exception:
         return {"confirmation": "Image format must be valid Base64."}
 
+    return await create_article(admin, req.article_title, req.article_preview,
+                                req.article_content, req.article_tag, image_bytes)
+
+
+@router.post("/add/upload")
+async def add_article_upload(request: Request, admin: dict = Depends(get_current_admin)):
+    """
+    multipart/form-data variant of /add: fields article_title, article_preview,
+    article_content, article_tag and file `article_image`. The token comes from
+    the Authorization header or cookie, so unauthenticated uploads are rejected
+    before the body is read.
+    """
+    upload = ImageUpload()
+    fields, error = await receive_article_upload(request, upload)
+    if error:
+        return error
+
+    image_ref = upload.image_ref() if upload.received else None
+    response = await create_article(
+        admin,
+        fields.get("article_title"),
+        fields.get("article_preview"),
+        fields.get("article_content"),
+        fields.get("article_tag"),
+        None,
+        image_ref
+    )
+    if image_ref and response["confirmation"] != "success: article added":
+        await upload.abort()
+    return response
+
+
+async def create_article(admin: dict, title, preview, content, tag, image_bytes, image_ref=None):
+
+    author_id = str(admin["_id"])
+
+    # --- article_title, article_preview, article_content, article_tag ---
+    validate_error = validate_article_fields(title, preview, content, tag)
+    if validate_error:
+        return validate_error
+
     # --- Save to DB ---
     article_id = await ArticleService.add_article(
-        req.article_title,
-        req.article_preview,
-        req.article_content,
-        req.article_tag,
+        title,
+        preview,
+        content,
+        tag,
         image_bytes,
-        author_id
+        author_id,
+        image_ref
     )
 
+    if article_id == "invalid_image":
+        return {"confirmation": "invalid image format"}
+
+    if article_id == "too_large":
+        return {"confirmation": "image too large"}
+
     if article_id is None:
         return {"confirmation": "backend error"}
 
     return {"confirmation": "success: article added"}
-
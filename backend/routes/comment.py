@@ -1,63 +1,58 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from schemas.add_comment_schema import AddCommentRequest
 from schemas.edit_comment_update_schema import EditCommentRequest
 from schemas.edit_comment_get_schema import EditCommentGetRequest
 from services.comment_service import CommentService
 from services.article_service import ArticleService
-from services.auth_service import AuthService
 from db.connection import db
 from bson import ObjectId
-from utils.base64_utils import bytes_to_base64
-from services.rating_service import RatingService
+from utils.concurrency import gather_safe, none_async
+from services.article_detail_service import ArticleDetailService
 from schemas.comment_delete_schema import DeleteCommentRequest
+from schemas.comment_thread_schema import CommentThreadRequest
+from schemas.comment_replies_schema import CommentRepliesRequest
+from core.dependencies import get_current_user
+from utils.pagination import decode_cursor, clamp_page_size
+import os
 
 router = APIRouter()
 
+COMMENT_PAGE_SIZE = int(os.getenv("COMMENT_PAGE_SIZE", "20"))
+COMMENT_MAX_PAGE_SIZE = int(os.getenv("COMMENT_MAX_PAGE_SIZE", "100"))
+REPLY_PREVIEW_SIZE = int(os.getenv("REPLY_PREVIEW_SIZE", "3"))
+REPLY_PAGE_SIZE = int(os.getenv("REPLY_PAGE_SIZE", "20"))
+
 @router.post("/add")
-async def add_comment(req: AddCommentRequest):
+async def add_comment(req: AddCommentRequest, user: dict = Depends(get_current_user)):
 
     # --- VALIDATE COMMENT CONTENT LENGTH ---
     if not (1 <= len(req.comment_content) <= 8192):
         return {"confirmation": "backend error"}
 
-    # --- VERIFY TOKEN ---
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    # --- GET USER ---
-    try:
-        user = await db.user.find_one({"email": payload.get("email")})
-    except:
+    # ========================================================
+    # 1) CEK ARTICLE & PARENT COMMENT (bersamaan)
+    # ========================================================
+    has_parent = req.parent_comment_id not in (None, "", "null")
+    results = await gather_safe(
+        ArticleService.fetch_article(req.article_id),
+        CommentService.get_comment(req.parent_comment_id) if has_parent else none_async(),
+    )
+    if results is None:
         return {"confirmation": "backend error"}
 
-    if not user:
-        return {"confirmation": "token invalid"}
+    article, parent = results
 
     owner_id = str(user["_id"])
 
-    # ========================================================
-    # 1) CEK ARTICLE EXISTS *SEBELUM APA PUN*
-    # ========================================================
-    article = await ArticleService.fetch_article(req.article_id)
     if article is None:
         return {"confirmation": "backend error"}
 
     # ========================================================
     # 2) VALIDASI PARENT COMMENT (Jika diisi)
     # ========================================================
-    if req.parent_comment_id not in (None, "", "null"):
-
-        try:
-            parent = await db.comment.find_one(
-                {"_id": ObjectId(req.parent_comment_id)}
-            )
-        except:
-            parent = None
-
-        if parent is None:
-            # ❗ Parent tidak ditemukan → JANGAN INSERT KOMENTAR
-            return {"confirmation": "backend error"}
+    if has_parent and parent is None:
+        # ❗ Parent tidak ditemukan → JANGAN INSERT KOMENTAR
+        return {"confirmation": "backend error"}
 
     # ========================================================
     # 3) INSERT COMMENT (hanya setelah semua valid)
@@ -66,7 +61,8 @@ async def add_comment(req: AddCommentRequest):
         article_id=req.article_id,
         parent_comment_id=req.parent_comment_id if req.parent_comment_id else None,
         owner_id=owner_id,
-        comment_content=req.comment_content
+        comment_content=req.comment_content,
+        parent=parent
     )
 
     if not new_comment_id:
@@ -74,107 +70,26 @@ async def add_comment(req: AddCommentRequest):
 
     # ========================================================
     # 4) LANJUT FETCH ULANG & KEMBALIKAN RESPONSE FULL
-    # (sama seperti sebelumnya)
     # ========================================================
+    return await ArticleDetailService.article_detail_response(req.article_id, article, user, req.image_format)
 
-    userclass = "admin" if user.get("role") == "admin" else "user"
 
-    # convert image
-    image_base64 = None
-    if article.get("article_image"):
-        try:
-            image_base64 = bytes_to_base64(bytes(article["article_image"]))
-        except:
-            image_base64 = None
-
-    # fetch comments
-    comments_raw = await CommentService.get_comments(req.article_id)
-    if comments_raw is None:
-        return {"confirmation": "backend error"}
-
-    comments = []
-    for c in comments_raw:
-        try:
-            u = await db.user.find_one({"_id": ObjectId(c["owner_id"])})
-        except:
-            u = None
-
-        comments.append({
-            "comment_id": str(c["_id"]),
-            "parent_comment_id": c.get("parent_comment_id"),
-            "owner": u["username"] if u else "Unknown",
-            "user_email": u["email"],
-            "comment_content": c["comment_content"]
-        })
+@router.post("/edit/update")
+async def edit_comment(req: EditCommentRequest, user: dict = Depends(get_current_user)):
 
-    # fetch ratings
-    ratings_raw = await RatingService.get_ratings(req.article_id)
-    if ratings_raw is None:
+    # ---- GET PARENT & ARTICLE (bersamaan) ----
+    results = await gather_safe(
+        CommentService.get_comment(req.parent_comment_id) if req.parent_comment_id else none_async(),
+        ArticleService.fetch_article(req.article_id),
+    )
+    if results is None:
         return {"confirmation": "backend error"}
 
-    ratings = []
-    for r in ratings_raw:
-        try:
-            u = await db.user.find_one({"_id": ObjectId(r["owner_id"])})
-        except:
-            u = None
-
-        ratings.append({
-            "rating_id": str(r["_id"]),
-            "owner": u["username"] if u else "Unknown",
-            "user_email": u["email"],
-            "rating_value": r["rating_value"]
-        })
-
-    user_email = payload.get("email")
-    
-    reports_raw = await db.report_article.find({"article_id": ObjectId(req.article_id)}).to_list(None)
-    reports = []
-    for rep in reports_raw:
-        reports.append({
-            "report_id": str(rep["_id"]),
-            "description": rep["description"],
-            "created_at": rep.get("created_at")
-        })
-    
-    return {
-        "confirmation": "successful",
-        "userclass": userclass,
-        "username": user["username"],
-        "user_email": user_email,
-        "article_title": article["article_title"],
-        "article_content": article["article_content"],
-        "article_tag": article["article_tag"],
-        "article_image": image_base64,
-        "comments": comments,
-        "ratings": ratings,
-        "reports": reports
-    }
-
+    parent, article = results
 
-@router.post("/edit/update")
-async def edit_comment(req: EditCommentRequest):
-
-    # ---- VERIFY TOKEN ----
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    user_email = payload.get("email")
-    user = await db.user.find_one({"email": user_email})
     owner_id = str(user["_id"])
-    user_email = payload.get("email")
     if req.parent_comment_id:
-        try:
-            parent_oid = ObjectId(req.parent_comment_id)
-        except:
-            return {"confirmation": "backend error"}
-
-        parent_exists = await db.comment.find_one({
-            "_id": parent_oid,
-            "article_id": req.article_id
-        })
-        if not parent_exists:
+        if not parent or parent.get("article_id") != req.article_id:
             return {"confirmation": "backend error"}
     
     # ---- EDIT COMMENT ----
@@ -189,107 +104,15 @@ async def edit_comment(req: EditCommentRequest):
     if not edit_ok:
         return {"confirmation": "backend error"}
 
-    # ---- FETCH ULANG ARTICLE ----
-    article = await ArticleService.fetch_article(req.article_id)
     if not article:
         return {"confirmation": "backend error"}
 
-    # ---- USERCLASS ----
-    is_admin = await AuthService.is_admin(payload)
-    userclass = "admin" if is_admin else "user"
-
-    # ---- IMAGE ----
-    try:
-        image_base64 = bytes_to_base64(bytes(article.get("article_image"))) if article.get("article_image") else None
-    except:
-        image_base64 = None
-
-    try:
-        comments_raw = await db.comment.find({"article_id": ObjectId(req.article_id)}).to_list(None)
-    except:
-        return {"confirmation": "backend error"}
-
-    # fetch comments
-    comments_raw = await CommentService.get_comments(req.article_id)
-    if comments_raw is None:
-        return {"confirmation": "backend error"}
-
-    comments = []
-    for c in comments_raw:
-        try:
-            u = await db.user.find_one({"_id": ObjectId(c["owner_id"])})
-        except:
-            u = None
-
-        comments.append({
-            "comment_id": str(c["_id"]),
-            "parent_comment_id": c.get("parent_comment_id"),
-            "owner": u["username"] if u else "Unknown",
-            "user_email": u["email"],
-            "comment_content": c["comment_content"]
-        })
-
-    # ---- FETCH RATINGS ----
-    ratings_raw = await RatingService.get_ratings(req.article_id)
-    if ratings_raw is None:
-        return {"confirmation": "backend error"}
-
-    ratings = []
-    for r in ratings_raw:
-        try:
-            u = await db.user.find_one({"_id": ObjectId(r["owner_id"])})
-        except:
-            u = None
-
-        ratings.append({
-            "rating_id": str(r["_id"]),
-            "owner": u["username"] if u else "Unknown",
-            "user_email": u["email"],
-            "rating_value": r["rating_value"]
-        })
-
-    reports_raw = await db.report_article.find({"article_id": ObjectId(req.article_id)}).to_list(None)
-    reports = []
-    for rep in reports_raw:
-        reports.append({
-            "report_id": str(rep["_id"]),
-            "description": rep["description"],
-            "created_at": rep.get("created_at")
-        })
-
-    return {
-        "confirmation": "successful",
-        "userclass": userclass,
-        "username": user["username"],
-        "user_email": user_email,
-        "article_title": article["article_title"],
-        "article_content": article["article_content"],
-        "article_tag": article["article_tag"],
-        "article_image": image_base64,
-        "comments": comments,
-        "ratings": ratings,
-        "reports": reports
-    }
+    return await ArticleDetailService.article_detail_response(req.article_id, article, user, req.image_format)
 
 @router.post("/edit/get")
-async def edit_get_comment(req: EditCommentGetRequest):
-
-    # ===== VERIFY TOKEN =====
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    user_email = payload.get("email")
-
-    # dapatkan user untuk ambil owner_id + username
-    try:
-        user = await db.user.find_one({"email": user_email})
-    except:
-        return {"confirmation": "backend error"}
-
-    if not user:
-        return {"confirmation": "token invalid"}
+async def edit_get_comment(req: EditCommentGetRequest, user: dict = Depends(get_current_user)):
 
+    user_email = user["email"]
     owner_id = str(user["_id"])
     username = user.get("username", "")
 
@@ -317,7 +140,7 @@ async def edit_get_comment(req: EditCommentGetRequest):
     }
     
 @router.post("/delete")
-async def delete_comment(req: DeleteCommentRequest):
+async def delete_comment(req: DeleteCommentRequest, user: dict = Depends(get_current_user)):
 
     # =====================================================
     # 0) DB ACCESS CHECK
@@ -334,22 +157,9 @@ async def delete_comment(req: DeleteCommentRequest):
     article_id = str(comment["article_id"])
 
     # =====================================================
-    # 1) VERIFY TOKEN
+    # 1) USER dari token (get_current_user) → 2) GET ARTICLE
     # =====================================================
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    # =====================================================
-    # 2) GET USER
-    # =====================================================
-    try:
-        user = await db.user.find_one({"email": payload.get("email")})
-    except:
-        return {"confirmation": "backend error"}
-
-    if not user:
-        return {"confirmation": "token invalid"}
+    article = await ArticleService.fetch_article(article_id)
 
     # Only owner can delete
     if str(user["_id"]) != str(comment["owner_id"]):
@@ -358,90 +168,91 @@ async def delete_comment(req: DeleteCommentRequest):
     # =====================================================
     # 3) DELETE COMMENT + CHILDREN
     # =====================================================
-    deleted = await CommentService.delete_comment_and_children(req.comment_id)
+    deleted = await CommentService.delete_comment_and_children(req.comment_id, article_id)
     if not deleted:
         return {"confirmation": "backend error"}
 
     # =====================================================
-    # 4) RE-FETCH ARTICLE + COMMENTS + RATINGS
+    # 4) RE-FETCH COMMENTS + RATINGS + REPORTS
     # =====================================================
-    article = await ArticleService.fetch_article(article_id)
     if article is None:
         return {"confirmation": "backend error"}
 
-    userclass = "admin" if user.get("role") == "admin" else "user"
+    return await ArticleDetailService.article_detail_response(article_id, article, user, req.image_format)
 
-    # Convert image
-    image_base64 = None
-    if article.get("article_image"):
+
+@router.post("/thread")
+async def comment_thread(req: CommentThreadRequest, user: dict = Depends(get_current_user)):
+    """
+    Top-level comments of an article a page at a time (oldest first), each
+    with reply_count and the first REPLY_PREVIEW_SIZE replies. Replies keep
+    parent_comment_id so the client can nest them; replies_cursor goes to
+    /comment/replies. Pass next_cursor back as `cursor` for the next page.
+    """
+    after = None
+    if req.cursor:
         try:
-            image_base64 = bytes_to_base64(bytes(article["article_image"]))
-        except:
-            image_base64 = None
+            after = decode_cursor(req.cursor)
+        except ValueError:
+            return {"confirmation": "invalid cursor"}
 
-    # ---- FETCH COMMENTS ----
-    comments_raw = await CommentService.get_comments(article_id)
-    if comments_raw is None:
-        return {"confirmation": "backend error"}
+    page_size = clamp_page_size(req.page_size, COMMENT_PAGE_SIZE, COMMENT_MAX_PAGE_SIZE)
 
-    comments = []
-    for c in comments_raw:
-        try:
-            u = await db.user.find_one({"_id": ObjectId(c["owner_id"])})
-        except:
-            u = None
-
-        comments.append({
-            "comment_id": str(c["_id"]),
-            "parent_comment_id": c.get("parent_comment_id"),
-            "owner": u["username"] if u else "Unknown",
-            "user_email": u["email"] if u else None,
-            "comment_content": c["comment_content"]
-        })
+    results = await gather_safe(
+        ArticleService.fetch_article(req.article_id),
+        CommentService.get_thread(req.article_id, after, page_size, REPLY_PREVIEW_SIZE),
+    )
+    if results is None or results[1] is None:
+        return {"confirmation": "backend error"}
 
-    # ---- FETCH RATINGS ----
-    ratings_raw = await RatingService.get_ratings(article_id)
-    if ratings_raw is None:
+    article, (top, next_cursor) = results
+    if article is None:
         return {"confirmation": "backend error"}
 
-    ratings = []
-    for r in ratings_raw:
-        try:
-            u = await db.user.find_one({"_id": ObjectId(r["owner_id"])})
-        except:
-            u = None
-
-        ratings.append({
-            "rating_id": str(r["_id"]),
-            "owner": u["username"] if u else "Unknown",
-            "user_email": u["email"] if u else None,
-            "rating_value": r["rating_value"]
-        })
+    owner_ids = [c["owner_id"] for c in top] + [r["owner_id"] for c in top for r in c["replies"]]
+    users = await ArticleDetailService.resolve_users(owner_ids)
+    if users is None:
+        return {"confirmation": "backend error"}
 
-    # ---- FETCH REPORTS ----
-    reports_raw = await db.report_article.find({
-        "article_id": ObjectId(article_id)
-    }).to_list(None)
-
-    reports = []
-    for rep in reports_raw:
-        reports.append({
-            "report_id": str(rep["_id"]),
-            "description": rep["description"],
-            "created_at": rep.get("created_at")
-        })
+    comments = []
+    for c in top:
+        item = ArticleDetailService.shape_comment(c, users)
+        item["reply_count"] = c["reply_count"]
+        item["replies"] = [ArticleDetailService.shape_comment(r, users) for r in c["replies"]]
+        item["replies_cursor"] = c["replies_cursor"]
+        comments.append(item)
 
     return {
         "confirmation": "successful",
-        "userclass": userclass,
-        "username": user["username"],
-        "user_email": user["email"],
-        "article_title": article["article_title"],
-        "article_content": article["article_content"],
-        "article_tag": article["article_tag"],
-        "article_image": image_base64,
+        "comment_count": article.get("comment_count", 0),
         "comments": comments,
-        "ratings": ratings,
-        "reports": reports
+        "next_cursor": next_cursor
     }
 
+
+@router.post("/replies")
+async def comment_replies(req: CommentRepliesRequest, user: dict = Depends(get_current_user)):
+    """Load more replies below a comment (any depth, oldest first)."""
+    after = None
+    if req.cursor:
+        try:
+            after = decode_cursor(req.cursor)
+        except ValueError:
+            return {"confirmation": "invalid cursor"}
+
+    page_size = clamp_page_size(req.page_size, REPLY_PAGE_SIZE, COMMENT_MAX_PAGE_SIZE)
+
+    page = await CommentService.get_replies(req.comment_id, after, page_size)
+    if page is None:
+        return {"confirmation": "backend error"}
+
+    replies, next_cursor = page
+    users = await ArticleDetailService.resolve_users([r["owner_id"] for r in replies])
+    if users is None:
+        return {"confirmation": "backend error"}
+
+    return {
+        "confirmation": "successful",
+        "replies": [ArticleDetailService.shape_comment(r, users) for r in replies],
+        "next_cursor": next_cursor
+    }
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from core.health import mongo_health
+from db.connection import pool_metrics
+
+router = APIRouter()
+
+@router.get("/health")
+async def health():
+    # 503 saat circuit Mongo terbuka → Docker menandai container unhealthy
+    status_code = 200 if mongo_health.available else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "status": "ok" if mongo_health.available else "degraded",
+            "mongo": mongo_health.stats(),
+            "pool": pool_metrics.stats()
+        }
+    )
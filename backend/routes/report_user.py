@@ -1,10 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from schemas.get_user_profile_schema import GetUserProfileRequest
 from schemas.report_user_schema import ReportUserRequest
 from services.report_user_service import ReportUserService
-from services.auth_service import AuthService
-from db.connection import db
 from bson import ObjectId
+from core.dependencies import RequestUsers, get_request_users, get_current_user
 
 router = APIRouter()
 
@@ -13,23 +12,12 @@ router = APIRouter()
 #   GET USER PROFILE
 # ============================
 @router.post("/get_user_profile")
-async def get_user_profile(req: GetUserProfileRequest):
+async def get_user_profile(req: GetUserProfileRequest, current: dict = Depends(get_current_user),
+                           users: RequestUsers = Depends(get_request_users)):
 
-    # --- Cek koneksi DB ---
+    # --- Ambil user target (token sudah diverifikasi get_current_user) ---
     try:
-        await db.command("ping")
-    except Exception as e:
-        print("GET_USER_PROFILE DB ERROR:", e)
-        return {"confirmation": "backend error"}
-
-    # --- Verifikasi token ---
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    # --- Ambil user target ---
-    try:
-        user = await db.user.find_one({"email": req.user_email})
+        user = await users.get(req.user_email)
     except Exception as e:
         print("GET_USER_PROFILE FIND USER ERROR:", e)
         return {"confirmation": "backend error"}
@@ -60,23 +48,10 @@ async def get_user_profile(req: GetUserProfileRequest):
 #         REPORT USER
 # ============================
 @router.post("/report_user")
-async def report_user(req: ReportUserRequest):
-
-    # --- Cek koneksi DB ---
-    try:
-        await db.command("ping")
-    except Exception as e:
-        print("REPORT_USER DB ERROR:", e)
-        return {"confirmation": "backend error"}
-
-    # --- Verifikasi token ---
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
+async def report_user(req: ReportUserRequest, current: dict = Depends(get_current_user),
+                      users: RequestUsers = Depends(get_request_users)):
 
-    reporter_email = payload.get("email")
-    if reporter_email is None:
-        return {"confirmation": "token invalid"}
+    reporter_email = current["email"]
 
     # --- Tidak boleh report diri sendiri ---
     if reporter_email == req.reported_user_email:
@@ -84,7 +59,7 @@ async def report_user(req: ReportUserRequest):
 
     # --- Ambil user yang dilaporkan ---
     try:
-        reported_user = await db.user.find_one({"email": req.reported_user_email})
+        reported_user = await users.get(req.reported_user_email)
     except Exception as e:
         print("REPORT_USER FIND USER ERROR:", e)
         return {"confirmation": "backend error"}
@@ -1,34 +1,25 @@
-from fastapi import APIRouter
-from schemas.get_all_users_schema import GetAllUsersRequest
+from fastapi import APIRouter, Depends
 from schemas.get_user_details_schema import GetUserDetailsRequest
 from schemas.make_admin_schema import MakeAdminRequest
 from schemas.delete_user_schema import DeleteUserRequest
 from services.user_service import UserService
-from services.auth_service import AuthService
 from bson import ObjectId
+from core.dependencies import get_current_user, get_current_admin
 
 router = APIRouter()
 
 @router.post("/get_all")
-async def get_all_users(req: GetAllUsersRequest):
+async def get_all_users(admin: dict = Depends(get_current_admin)):
 
-    # 1) Verify token
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    # 2) Check if admin
-    if not await AuthService.is_admin(payload):
-        return {"confirmation": "not admin"}
-
-    # 3) Fetch all users
+    # 1) Token + admin dicek oleh get_current_admin
+    # 2) Fetch all users
     users_raw = await UserService.get_all_users()
     if users_raw is None:
         return {"confirmation": "backend error"}
 
-    users = []
+    user_list = []
     for u in users_raw:
-        users.append({
+        user_list.append({
             "user_id": str(u["_id"]),
             "username": u.get("username"),
             "email": u.get("email"),
@@ -40,19 +31,15 @@ async def get_all_users(req: GetAllUsersRequest):
 
     return {
         "confirmation": "successful",
-        "users": users
+        "users": user_list
     }
 
 @router.post("/get_details")
-async def get_user_details(req: GetUserDetailsRequest):
+async def get_user_details(req: GetUserDetailsRequest, current: dict = Depends(get_current_user)):
 
-    # 1) Verify token
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    is_admin = await AuthService.is_admin(payload)
-    token_user_email = payload.get("email")  # ⬅️ email dari token
+    # 1) User dari token
+    is_admin = current.get("role") == "admin"
+    token_user_email = current["email"]  # ⬅️ email dari token
 
     # 2) Role-based access control
     if is_admin:
@@ -111,17 +98,9 @@ async def get_user_details(req: GetUserDetailsRequest):
 
     
 @router.post("/delete")
-async def delete_user(req: DeleteUserRequest):
-
-    # 1) Verify token
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    # 2) Check if admin
-    if not await AuthService.is_admin(payload):
-        return {"confirmation": "not admin"}
+async def delete_user(req: DeleteUserRequest, admin: dict = Depends(get_current_admin)):
 
+    # 1) Token + 2) admin dicek oleh get_current_admin
     # 3) Fetch user
     user = await UserService.get_user_by_id(req.user_id)
     if user is None:
@@ -132,25 +111,17 @@ async def delete_user(req: DeleteUserRequest):
         return {"confirmation": "cannot delete admin"}
 
     # 5) Delete user and related data
-    success = await UserService.delete_user(req.user_id)
-    if not success:
+    removed = await UserService.delete_user(req.user_id)
+    if removed is None:
         return {"confirmation": "backend error"}
 
-    return {"confirmation": "successful: user deleted"}
+    return {"confirmation": "successful: user deleted", "removed": removed}
 
 
 @router.post("/make_admin")
-async def make_admin(req: MakeAdminRequest):
-
-    # 1) Verify token
-    payload = await AuthService.verify_token(req.token)
-    if payload is None:
-        return {"confirmation": "token invalid"}
-
-    # 2) Check admin privilege
-    if not await AuthService.is_admin(payload):
-        return {"confirmation": "not admin"}
+async def make_admin(req: MakeAdminRequest, admin: dict = Depends(get_current_admin)):
 
+    # 1) Token + 2) admin privilege dicek oleh get_current_admin
     # 3) Fetch user to update
     user = await UserService.get_user_by_id(req.user_id)
     if user is None:
@@ -2,7 +2,6 @@ from pydantic import BaseModel
 from typing import Literal
 
 class AddArticle(BaseModel):
-    token: str
     article_title: str
     article_preview: str
     article_content: str
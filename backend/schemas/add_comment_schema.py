@@ -1,8 +1,8 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Literal
 
 class AddCommentRequest(BaseModel):
-    token: str
     article_id: str
     parent_comment_id: Optional[str] = None
-    comment_content: str
\ No newline at end of file
+    comment_content: str
+    image_format: Literal["base64", "url"] = "base64"
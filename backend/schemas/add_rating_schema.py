@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
+from typing import Literal
 
 class AddRatingSchema(BaseModel):
-    token: str
     article_id: str
     rating_value: int = Field(..., ge=1, le=5)
+    image_format: Literal["base64", "url"] = "base64"
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
+from typing import Literal
 
 class DeleteCommentRequest(BaseModel):
-    token: str
     comment_id: str
+    image_format: Literal["base64", "url"] = "base64"
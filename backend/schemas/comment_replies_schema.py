@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class CommentRepliesRequest(BaseModel):
+    comment_id: str
+    cursor: Optional[str] = None     # replies_cursor / next_cursor sebelumnya
+    page_size: Optional[int] = None
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class CommentThreadRequest(BaseModel):
+    article_id: str
+    cursor: Optional[str] = None     # next_cursor dari halaman sebelumnya
+    page_size: Optional[int] = None
@@ -1,5 +1,4 @@
 from pydantic import BaseModel
 
 class DeleteUserRequest(BaseModel):
-    token: str
     user_id: str
\ No newline at end of file
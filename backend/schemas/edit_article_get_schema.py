@@ -2,5 +2,4 @@
 from pydantic import BaseModel
 
 class EditArticleGetRequest(BaseModel):
-    token: str
     article_id: str
@@ -2,7 +2,6 @@ from pydantic import BaseModel
 from typing import Optional, Literal
 
 class EditArticleUpdateRequest(BaseModel):
-    token: str
     article_id: str
 
     article_title: Optional[str] = None
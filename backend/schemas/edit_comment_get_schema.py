@@ -1,5 +1,4 @@
 from pydantic import BaseModel
 
 class EditCommentGetRequest(BaseModel):
-    token: str
     comment_id: str
@@ -1,8 +1,9 @@
 from pydantic import BaseModel
+from typing import Literal
 
 class EditCommentRequest(BaseModel):
-    token: str
     article_id: str
     comment_id: str
     parent_comment_id: str | None = None
     comment_content: str
+    image_format: Literal["base64", "url"] = "base64"
@@ -1,6 +1,5 @@
 from pydantic import BaseModel
 
 class EditRatingGetRequest(BaseModel):
-    token: str
     article_id: str
     rating_id: str
@@ -1,7 +1,8 @@
 from pydantic import BaseModel
+from typing import Literal
 
 class EditRatingUpdateRequest(BaseModel):
-    token: str
     article_id: str
     rating_id: str
     rating_value: int
+    image_format: Literal["base64", "url"] = "base64"
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from typing import Optional, Literal
+
+class FeedRequest(BaseModel):
+    cursor: Optional[str] = None     # next_cursor dari halaman sebelumnya
+    page_size: Optional[int] = None
+    tag: Optional[Literal["office", "budget", "gaming", "flagship"]] = None
+    sort: Literal["newest", "highest_rated", "most_commented"] = "newest"
@@ -1,4 +0,0 @@
-from pydantic import BaseModel
-
-class GetAllUsersRequest(BaseModel):
-    token: str
\ No newline at end of file
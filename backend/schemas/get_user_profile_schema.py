@@ -1,5 +1,4 @@
 from pydantic import BaseModel, EmailStr
 
 class GetUserProfileRequest(BaseModel):
-    token: str
     user_email: EmailStr
\ No newline at end of file
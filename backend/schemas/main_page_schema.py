@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Literal
 
 class MainPageRequest(BaseModel):
-    token: str
\ No newline at end of file
+    image_format: Literal["base64", "url"] = "base64"
@@ -1,6 +1,5 @@
 from pydantic import BaseModel, EmailStr
 
 class ReportUserRequest(BaseModel):
-    token: str
     reported_user_email: EmailStr
     description: str
\ No newline at end of file
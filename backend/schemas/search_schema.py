@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class SearchRequest(BaseModel):
+    query: str = Field(min_length=1, max_length=256)
+    page: int = Field(default=1, ge=1)
+    page_size: Optional[int] = None
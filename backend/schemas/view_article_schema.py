@@ -1,5 +1,6 @@
 from pydantic import BaseModel
+from typing import Literal
 
 class ViewArticleRequest(BaseModel):
-    token: str
     article_id: str
+    image_format: Literal["base64", "url"] = "base64"  # "url" → article_image_url tanpa blob
@@ -0,0 +1,255 @@
+import os
+from db.connection import db
+from core.cache import article_detail_cache
+from bson import ObjectId
+from services.comment_service import CommentService
+from services.rating_service import RatingService
+from services.report_article_service import ReportArticleService
+from utils.base64_utils import bytes_to_base64
+from utils.image_validator import image_hash
+from services.article_service import ArticleService
+from utils.concurrency import gather_safe
+from services.image_storage_service import ImageStorageService
+
+# "multi" = batched multi-query path, "aggregate" = single $lookup aggregation
+ARTICLE_DETAIL_MODE = os.getenv("ARTICLE_DETAIL_MODE", "multi")
+# batas comment / rating / report per $lookup di jalur aggregate (hasil tetap < 16 MB)
+ARTICLE_DETAIL_LOOKUP_LIMIT = int(os.getenv("ARTICLE_DETAIL_LOOKUP_LIMIT", "2000"))
+
+class ArticleDetailService:
+
+    @staticmethod
+    async def resolve_users(owner_ids):
+        """
+        Resolve all owner_id strings with a single $in query.
+        Returns {owner_id: user_document} or None on DB error.
+        """
+        oids = []
+        for oid in set(owner_ids):
+            try:
+                oids.append(ObjectId(oid))
+            except:
+                continue
+
+        if not oids:
+            return {}
+
+        try:
+            users = await db.user.find(
+                {"_id": {"$in": oids}},
+                {"username": 1, "email": 1}
+            ).to_list(None)
+        except Exception as e:
+            print("RESOLVE USERS ERROR:", e)
+            return None
+
+        return {str(u["_id"]): u for u in users}
+
+    @staticmethod
+    async def get_article_detail(article_id: str, article: dict):
+        """
+        Build the viewer-independent part of the article detail payload:
+        article fields, base64 image, comments, ratings and reports.
+        The number of queries is constant regardless of comment / rating count.
+        Returns None on backend error.
+        """
+        # comments, ratings, reports dan image independen → jalankan bersamaan
+        results = await gather_safe(
+            CommentService.get_comments(article_id),
+            RatingService.get_ratings(article_id),
+            ReportArticleService.get_reports(article_id),
+            ImageStorageService.load_article_image(article),
+        )
+        if results is None or any(r is None for r in results[:3]):
+            return None
+
+        comments_raw, ratings_raw, reports_raw, image_bytes = results
+
+        owner_ids = [c["owner_id"] for c in comments_raw] + [r["owner_id"] for r in ratings_raw]
+        users = await ArticleDetailService.resolve_users(owner_ids)
+        if users is None:
+            return None
+
+        return ArticleDetailService.shape_detail(article, comments_raw, ratings_raw, reports_raw, users, image_bytes)
+
+    @staticmethod
+    async def get_article_detail_aggregated(article_id: str):
+        """
+        Single round-trip read path: one aggregation on db.article returns the
+        article together with its comments, ratings, owner usernames/emails
+        and reports. Lookups are projected to the fields shape_detail uses and
+        capped at ARTICLE_DETAIL_LOOKUP_LIMIT so the result stays far below
+        the 16 MB document limit; a busier article falls back to the
+        multi-query path. Returns the detail or None on backend error /
+        article not found.
+        """
+        try:
+            article_oid = ObjectId(article_id)
+        except:
+            return None
+
+        def lookup(collection, local_field, foreign_field, fields, with_owner):
+            # batas sebelum lookup owner: artikel ramai tidak me-lookup user per item dulu;
+            # satu lebih dari batas → tahu bahwa hasilnya terpotong
+            pipeline = [{"$project": fields}, {"$limit": ARTICLE_DETAIL_LOOKUP_LIMIT + 1}]
+            if with_owner:
+                pipeline += [
+                    {"$addFields": {"owner_oid": {"$convert": {
+                        "input": "$owner_id", "to": "objectId", "onError": None, "onNull": None
+                    }}}},
+                    {"$lookup": {
+                        "from": "user",
+                        "localField": "owner_oid",
+                        "foreignField": "_id",
+                        "pipeline": [{"$project": {"username": 1, "email": 1}}],
+                        "as": "owner"
+                    }},
+                ]
+            return {"$lookup": {
+                "from": collection,
+                "localField": local_field,
+                "foreignField": foreign_field,
+                "pipeline": pipeline,
+                "as": collection + "s"
+            }}
+
+        pipeline = [
+            {"$match": {"_id": article_oid, "is_deleted": False}},
+            {"$addFields": {"article_id_str": {"$toString": "$_id"}}},
+            lookup("comment", "article_id_str", "article_id",
+                   {"owner_id": 1, "parent_comment_id": 1, "comment_content": 1}, True),
+            lookup("rating", "article_id_str", "article_id", {"owner_id": 1, "rating_value": 1}, True),
+            lookup("report_article", "_id", "article_id", {"description": 1, "created_at": 1}, False),
+        ]
+
+        try:
+            docs = await db.article.aggregate(pipeline).to_list(1)
+        except Exception as e:
+            print("ARTICLE DETAIL AGGREGATE ERROR:", e)
+            return None
+
+        if not docs:
+            return None
+
+        article = docs[0]
+        comments, ratings, reports = article.pop("comments"), article.pop("ratings"), article.pop("report_articles")
+        if max(len(comments), len(ratings), len(reports)) > ARTICLE_DETAIL_LOOKUP_LIMIT:
+            # artikel ramai: ambil ulang lewat jalur multi-query (tanpa batas ukuran dokumen)
+            article = await ArticleService.fetch_article(article_id)
+            if article is None:
+                return None
+            return await ArticleDetailService.get_article_detail(article_id, article)
+
+        users = {}
+        for item in comments + ratings:
+            if item.get("owner"):
+                users[str(item["owner_id"])] = item["owner"][0]
+
+        # image di GridFS tidak bisa di-$lookup → satu read tambahan bila ada
+        image_bytes = await ImageStorageService.load_article_image(article)
+        return ArticleDetailService.shape_detail(article, comments, ratings, reports, users, image_bytes)
+
+    @staticmethod
+    def get_cached_detail(article_id: str):
+        return article_detail_cache.get(article_id)
+
+    @staticmethod
+    async def fetch_detail(article_id: str, article: dict, mode: str = None):
+        """
+        Cached detail, or build it via the read path selected by
+        ARTICLE_DETAIL_MODE (or `mode`) and store it under the current version.
+        The aggregate path reads the article itself, `article` may be None.
+        """
+        cached = article_detail_cache.get(article_id)
+        if cached is not None:
+            return cached
+
+        version = article_detail_cache.version(article_id)
+        if (mode or ARTICLE_DETAIL_MODE) == "aggregate":
+            detail = await ArticleDetailService.get_article_detail_aggregated(article_id)
+        else:
+            detail = await ArticleDetailService.get_article_detail(article_id, article)
+
+        if detail is not None:
+            article_detail_cache.set(article_id, version, detail)
+        return detail
+
+    @staticmethod
+    def shape_detail(article, comments_raw, ratings_raw, reports_raw, users, image_bytes):
+        image_base64 = None
+        image_digest = article.get("article_image_hash")
+        if image_bytes:
+            try:
+                image_base64 = bytes_to_base64(image_bytes)
+                image_digest = image_digest or image_hash(image_bytes)
+            except:
+                image_base64 = None
+
+        comments = [ArticleDetailService.shape_comment(c, users) for c in comments_raw]
+
+        ratings = []
+        for r in ratings_raw:
+            u = users.get(str(r["owner_id"]))
+            ratings.append({
+                "rating_id": str(r["_id"]),
+                "owner": u["username"] if u else "Unknown",
+                "user_email": u["email"] if u else None,
+                "rating_value": r["rating_value"]
+            })
+
+        reports = []
+        for rep in reports_raw:
+            reports.append({
+                "report_id": str(rep["_id"]),
+                "description": rep["description"],
+                "created_at": rep.get("created_at")
+            })
+
+        return {
+            "article_title": article["article_title"],
+            "article_content": article["article_content"],
+            "article_tag": article["article_tag"],
+            "article_image": image_base64,
+            "article_image_hash": image_digest,
+            "article_image_url": ArticleService.image_url(str(article["_id"]), image_digest) if image_digest else None,
+            "article_thumbnail_urls": ArticleService.thumbnail_urls(article),
+            "comments": comments,
+            "ratings": ratings,
+            "rating_summary": RatingService.summary(article),
+            "reports": reports
+        }
+
+    @staticmethod
+    def shape_comment(c: dict, users: dict):
+        u = users.get(str(c["owner_id"]))
+        return {
+            "comment_id": str(c["_id"]),
+            "parent_comment_id": c.get("parent_comment_id"),
+            "owner": u["username"] if u else "Unknown",
+            "user_email": u["email"] if u else None,
+            "comment_content": c["comment_content"]
+        }
+
+    @staticmethod
+    def build_response(user: dict, detail: dict, image_format: str = "base64"):
+        """
+        Merge viewer data (userclass, username, email) into the article detail.
+        image_format="url" drops the base64 blob; clients load article_image_url.
+        """
+        response = {
+            "confirmation": "successful",
+            "userclass": "admin" if user.get("role") == "admin" else "user",
+            "username": user["username"],
+            "user_email": user["email"],
+            **detail
+        }
+        if image_format == "url":
+            response["article_image"] = None
+        return response
+
+    @staticmethod
+    async def article_detail_response(article_id: str, article: dict, user: dict, image_format: str = "base64"):
+        detail = await ArticleDetailService.fetch_detail(article_id, article)
+        if detail is None:
+            return {"confirmation": "backend error"}
+        return ArticleDetailService.build_response(user, detail, image_format)
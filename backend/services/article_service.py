@@ -1,10 +1,60 @@
 from db.connection import db
-from bson import ObjectId, Binary
-from utils.image_validator import validate_image_bytes
+from core.cache import article_detail_cache
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from services.image_storage_service import ImageStorageService
+from services.thumbnail_service import ThumbnailService
 from datetime import datetime
+from utils.pagination import encode_cursor, keyset_filter
+
+# field yang dibutuhkan card (tanpa content / blob image)
+CARD_PROJECTION = {
+    "article_title": 1,
+    "article_preview": 1,
+    "article_tag": 1,
+    "article_image_hash": 1,
+    "article_thumbnails": 1,
+    "created_at": 1,
+    "rating_avg": 1,
+    "rating_count": 1,
+    "rating_sum": 1,
+    "rating_histogram": 1,
+    "comment_count": 1,
+}
+
+# sort listing → field denormalized di db.article (urutan kedua selalu _id)
+FEED_SORTS = {
+    "newest": "created_at",
+    "highest_rated": "rating_avg",
+    "most_commented": "comment_count",
+}
+
 
 class ArticleService:
-    
+
+    @staticmethod
+    def image_url(article_id: str, digest: str = None, size: str = None):
+        # hash di query string → URL berubah saat image berubah (aman di-cache lama)
+        params = []
+        if size:
+            params.append(f"size={size}")
+        if digest:
+            params.append(f"v={digest[:16]}")
+        url = f"/article/{article_id}/image"
+        if params:
+            url += "?" + "&".join(params)
+        return url
+
+    @staticmethod
+    def thumbnail_urls(article: dict):
+        """URL per derivative yang masih sesuai dengan image artikel saat ini."""
+        urls = {}
+        for size in ThumbnailService.thumbnail_sizes(article):
+            thumb = ThumbnailService.current_thumbnail(article, size)
+            if thumb:
+                urls[size] = ArticleService.image_url(str(article["_id"]), thumb["hash"], size)
+        return urls
+
     @staticmethod
     async def fetch_article(article_id: str):
         try:
@@ -16,7 +66,85 @@ class ArticleService:
             return None
 
     @staticmethod
-    async def update_article(data, image_bytes: bytes):
+    async def get_feed(after: tuple, page_size: int, tag: str = None, sort: str = "newest"):
+        """
+        One page of the feed, keyset-paginated on (sort field, _id) descending.
+        after: decoded cursor (sort value, ObjectId) or None for the first page.
+        Each tag / sort combination has its own compound index (db/indexes.py).
+        Returns (articles, next_cursor) or None on DB error.
+        """
+        field = FEED_SORTS[sort]
+        query = {"is_deleted": False}
+        if tag is not None:
+            query["article_tag"] = tag
+        if after is not None:
+            query.update(keyset_filter(field, after[0], after[1]))
+
+        try:
+            articles = await db.article.find(query, CARD_PROJECTION) \
+                .sort([(field, -1), ("_id", -1)]) \
+                .limit(page_size + 1) \
+                .to_list(page_size + 1)
+        except Exception as e:
+            print("FEED ERROR:", e)
+            return None
+
+        next_cursor = None
+        if len(articles) > page_size:
+            articles = articles[:page_size]
+            last = articles[-1]
+            # field belum di-backfill → None, bukan 0 (null diurutkan paling rendah)
+            next_cursor = encode_cursor(last.get(field), last["_id"])
+
+        return articles, next_cursor
+
+    @staticmethod
+    async def search(query: str, page: int, page_size: int):
+        """
+        Full-text search over title / preview / content (text index
+        article_text), ranked by textScore. Content is projected only
+        for snippet building.
+        Returns (articles, has_more) or None on DB error.
+        """
+        projection = dict(CARD_PROJECTION)
+        projection["article_content"] = 1
+        projection["score"] = {"$meta": "textScore"}
+
+        try:
+            articles = await db.article.find(
+                {"is_deleted": False, "$text": {"$search": query}},
+                projection
+            ).sort([("score", {"$meta": "textScore"}), ("_id", -1)]) \
+                .skip((page - 1) * page_size) \
+                .limit(page_size + 1) \
+                .to_list(page_size + 1)
+        except Exception as e:
+            print("SEARCH ERROR:", e)
+            return None
+
+        has_more = len(articles) > page_size
+        return articles[:page_size], has_more
+
+    @staticmethod
+    async def fetch_article_image(article_id: str, include_bytes: bool = True):
+        """Fetch only the image fields of an article (no content / comments)."""
+        projection = {"article_image_id": 1, "article_image_hash": 1, "article_image_type": 1, "article_thumbnails": 1}
+        if include_bytes:
+            projection["article_image"] = 1
+        try:
+            return await db.article.find_one(
+                {"_id": ObjectId(article_id), "is_deleted": False},
+                projection
+            )
+        except:
+            return None
+
+    @staticmethod
+    async def update_article(data, image_bytes: bytes, image_ref: dict = None):
+        """
+        image_ref: GridFS reference from a streamed upload (ImageUpload.image_ref()).
+        image_bytes: decoded base64 image, stored to GridFS here.
+        """
         update_fields = {}
 
         if data.article_title is not None:
@@ -28,24 +156,70 @@ class ArticleService:
         if data.article_tag is not None:
             update_fields["article_tag"] = data.article_tag
 
-        if image_bytes is not None:
-            if not validate_image_bytes(image_bytes):
-                return "invalid_image"
-            update_fields["article_image"] = Binary(image_bytes)
+        if image_ref is None and image_bytes is not None:
+            image_ref = await ImageStorageService.save_bytes(image_bytes)
+            if image_ref in ("invalid_image", "too_large"):
+                return image_ref
+            if image_ref is None:
+                return False
+
+        update = {"$set": update_fields}
+        if image_ref is not None:
+            update_fields.update(image_ref)
+            update["$unset"] = {"article_image": ""}
 
         update_fields["updated_at"] = datetime.utcnow()
 
         try:
-            result = await db.article.update_one(
+            old = await db.article.find_one_and_update(
                 {"_id": ObjectId(data.article_id)},
-                {"$set": update_fields}
+                update,
+                projection={"article_image_id": 1},
+                return_document=ReturnDocument.BEFORE
             )
+            article_detail_cache.bump(data.article_id)
+        except:
+            old = None
+
+        if old is None:
+            if image_ref is not None:
+                await ImageStorageService.delete(image_ref["article_image_id"])
+            return False
+
+        # image lama di GridFS tidak dipakai lagi
+        if image_ref is not None and old.get("article_image_id"):
+            await ImageStorageService.delete(old["article_image_id"])
+
+        if image_ref is not None:
+            ThumbnailService.schedule(data.article_id)
+
+        return True
+
+    @staticmethod
+    async def soft_delete_article(article_oid: ObjectId):
+        try:
+            result = await db.article.update_one(
+                {"_id": article_oid},
+                {"$set": {"is_deleted": True}}
+            )
+            article_detail_cache.bump(str(article_oid))
             return result.modified_count > 0
         except:
             return False
         
     @staticmethod
-    async def add_article(title, preview, content, tag, image_bytes, author_id):
+    async def add_article(title, preview, content, tag, image_bytes, author_id, image_ref: dict = None):
+        """
+        Article document keeps only a GridFS reference to its image.
+        Returns the new article id, "invalid_image" / "too_large", or None.
+        """
+        if image_ref is None and image_bytes:
+            image_ref = await ImageStorageService.save_bytes(image_bytes)
+            if image_ref in ("invalid_image", "too_large"):
+                return image_ref
+            if image_ref is None:
+                return None
+
         try:
             now = datetime.utcnow()
 
@@ -54,25 +228,64 @@ class ArticleService:
                 "article_preview": preview,
                 "article_content": content,
                 "article_tag": tag,
-                "article_image": image_bytes,
                 "author_id": author_id,
                 "report_count": 0,
+                "comment_count": 0,
+                "rating_count": 0,
+                "rating_sum": 0,
+                "rating_histogram": {str(v): 0 for v in range(1, 6)},
+                "rating_avg": 0,
                 "created_at": now,
                 "updated_at": now,
                 "is_deleted": False
             }
+            if image_ref is not None:
+                doc.update(image_ref)
 
             result = await db.article.insert_one(doc)
 
             if result.inserted_id:
+                if image_ref is not None:
+                    ThumbnailService.schedule(str(result.inserted_id))
                 return str(result.inserted_id)
 
             return None
 
         except Exception as e:
             print("ADD ARTICLE ERROR:", e)
+            if image_ref is not None:
+                await ImageStorageService.delete(image_ref["article_image_id"])
             return None
 
+    @staticmethod
+    async def backfill_listing_counters(batch_size: int = 1000):
+        """
+        Recompute comment_count for every article from db.comment
+        (articles created before the counter existed), written with
+        unordered bulk_write batches; correct counters are skipped.
+        Rating aggregates are rebuilt by RatingService.reconcile_aggregates.
+        Returns the number of articles updated.
+        """
+        comment_counts = await db.comment.aggregate([
+            {"$group": {"_id": "$article_id", "n": {"$sum": 1}}}
+        ]).to_list(None)
+        comment_counts = {c["_id"]: c["n"] for c in comment_counts}
+
+        ops = []
+        updated = 0
+        async for article in db.article.find({}, {"comment_count": 1}):
+            count = comment_counts.get(str(article["_id"]), 0)
+            if article.get("comment_count") != count:
+                ops.append(UpdateOne({"_id": article["_id"]}, {"$set": {"comment_count": count}}))
+            if len(ops) >= batch_size:
+                await db.article.bulk_write(ops, ordered=False)
+                updated += len(ops)
+                ops = []
+        if ops:
+            await db.article.bulk_write(ops, ordered=False)
+            updated += len(ops)
+        return updated
+
     # ＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝
     # Tambahan: get_ratings → DIPAKAI DI add_comment
     # ＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝＝
@@ -1,7 +1,10 @@
 # services/auth_service.py
-from core.security import verify_password, hash_password, create_token, decode_token
+from core.security import create_token
+from core.password_hasher import password_hasher, HasherBusy
 from db.connection import db
+from core.cache import user_cache
 from datetime import datetime
+from pymongo.errors import DuplicateKeyError
 
 class AuthService:
     @staticmethod
@@ -10,7 +13,10 @@ class AuthService:
         if existing_email:
             return {"confirmation": "email already registered"}
 
-        hashed_pw = hash_password(data.password)
+        try:
+            hashed_pw = await password_hasher.hash(data.password)
+        except HasherBusy:
+            return {"confirmation": "server busy"}
         now = datetime.utcnow()
 
         new_user = {
@@ -20,11 +26,16 @@ class AuthService:
             "password": hashed_pw,
             "role": "user",
             "report_count": 0,
+            "token_version": 0,
             "created_at": now,
             "updated_at": now,
         }
 
-        await db.user.insert_one(new_user)
+        try:
+            await db.user.insert_one(new_user)
+        except DuplicateKeyError:
+            # register bersamaan dengan email yang sama (unique index user_email)
+            return {"confirmation": "email already registered"}
         return {"confirmation": "register successful"}
 
     @staticmethod
@@ -37,26 +48,41 @@ class AuthService:
         if not users:
             return {"confirmation": "email doesn't exist"}
 
-        if not verify_password(data.password, users["password"]):
+        try:
+            valid = await password_hasher.verify(data.password, users["password"])
+        except HasherBusy:
+            return {"confirmation": "server busy"}
+
+        if not valid:
             return {"confirmation": "password incorrect"}
 
-        token = create_token({"email": users["email"]})
+        token = create_token({
+            "email": users["email"],
+            "id": str(users["_id"]),
+            "role": users.get("role", "user"),
+            "token_version": users.get("token_version", 0),
+        })
         return {"confirmation": "login successful", "token": token}
 
     @staticmethod
-    async def verify_token(token: str):
-        try:
-            payload = decode_token(token)
-            return payload
-        except:
+    async def get_user_by_email(email: str):
+        """
+        User document by email through the process-wide user_cache.
+        Returns a copy (callers may modify it) or None if not found;
+        DB errors propagate to the caller.
+        """
+        if email is None:
             return None
 
+        user = user_cache.get(email)
+        if user is None:
+            user = await db.user.find_one({"email": email})
+            if user is None:
+                return None
+            user_cache.set(email, user)
+        return dict(user)
+
     @staticmethod
-    async def is_admin(payload):
-        try:
-            user = await db.user.find_one({"email": payload.get("email")})
-            if not user:
-                return False
-            return user.get("role") == "admin"
-        except:
-            return False
+    def invalidate_user(email: str):
+        if email:
+            user_cache.pop(email)
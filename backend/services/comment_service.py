@@ -1,24 +1,158 @@
 from db.connection import db
 from datetime import datetime
 from bson import ObjectId
+from core.cache import article_detail_cache
+from pymongo import UpdateOne
+from utils.pagination import encode_cursor, keyset_filter
 
 class CommentService:
 
     @staticmethod
-    async def add_comment(article_id, parent_comment_id, owner_id, comment_content):
+    async def add_comment(article_id, parent_comment_id, owner_id, comment_content, parent: dict = None):
+        """
+        parent: the parent comment document if the caller already fetched it.
+        ancestors = path of comment ids from the thread root down to the parent,
+        so a whole subtree is one indexed query on `ancestors`.
+        """
         try:
+            ancestors = []
+            if parent_comment_id in ("", "null"):
+                parent_comment_id = None            # top-level selalu disimpan sebagai null
+            if parent_comment_id is not None:
+                if parent is None:
+                    parent = await CommentService.get_comment(parent_comment_id)
+                ancestors = await CommentService.ancestors_of(parent) + [str(parent["_id"])]
+
             data = {
                 "article_id": article_id,
                 "owner_id": owner_id,
                 "parent_comment_id": parent_comment_id,
+                "ancestors": ancestors,
                 "comment_content": comment_content,
                 "created_at": datetime.utcnow(),
             }
             result = await db.comment.insert_one(data)
+            await db.article.update_one(
+                {"_id": ObjectId(article_id)},
+                {"$inc": {"comment_count": 1}}
+            )
+            article_detail_cache.bump(article_id)
             return str(result.inserted_id)
         except:
             return None
 
+    @staticmethod
+    async def get_comment(comment_id):
+        try:
+            return await db.comment.find_one({"_id": ObjectId(comment_id)})
+        except:
+            return None
+
+    @staticmethod
+    async def ancestors_of(comment: dict):
+        """Ancestor ids of a comment; walks up parent_comment_id if not migrated yet."""
+        if "ancestors" in comment:
+            return list(comment["ancestors"])
+
+        path = []
+        current = comment
+        while current and current.get("parent_comment_id") not in (None, "", "null"):
+            parent_id = current["parent_comment_id"]
+            if parent_id in path:
+                break
+            path.insert(0, parent_id)
+            current = await CommentService.get_comment(parent_id)
+        return path
+
+    @staticmethod
+    async def get_subtree(comment_id: str):
+        """A comment and all of its replies (any depth) in one query."""
+        try:
+            return await db.comment.find({
+                "$or": [{"_id": ObjectId(comment_id)}, {"ancestors": comment_id}]
+            }).to_list(None)
+        except:
+            return None
+
+    @staticmethod
+    async def get_thread(article_id: str, after: tuple, page_size: int, preview_size: int):
+        """
+        One page of top-level comments (created_at, _id ascending; index
+        comment_thread), each with reply_count and its first `preview_size`
+        replies (any depth, oldest first) from one $group aggregation.
+        after: decoded cursor or None. Returns (comments, next_cursor) or None.
+        """
+        query = {"article_id": article_id, "parent_comment_id": None}
+        if after is not None:
+            query.update(keyset_filter("created_at", after[0], after[1], descending=False))
+
+        try:
+            top = await db.comment.find(query) \
+                .sort([("created_at", 1), ("_id", 1)]) \
+                .limit(page_size + 1) \
+                .to_list(page_size + 1)
+
+            next_cursor = None
+            if len(top) > page_size:
+                top = top[:page_size]
+                next_cursor = encode_cursor(top[-1]["created_at"], top[-1]["_id"])
+
+            groups = {}
+            if top:
+                # reply ke-n: ancestors[0] = id komentar top-level
+                groups = await db.comment.aggregate([
+                    {"$match": {"ancestors": {"$in": [str(c["_id"]) for c in top]}}},
+                    {"$group": {
+                        "_id": {"$first": "$ancestors"},
+                        "count": {"$sum": 1},
+                        "preview": {"$topN": {
+                            "n": preview_size,
+                            "sortBy": {"created_at": 1, "_id": 1},
+                            "output": "$$ROOT"
+                        }},
+                    }},
+                ]).to_list(None)
+                groups = {g["_id"]: g for g in groups}
+        except Exception as e:
+            print("COMMENT THREAD ERROR:", e)
+            return None
+
+        for c in top:
+            group = groups.get(str(c["_id"]))
+            c["reply_count"] = group["count"] if group else 0
+            c["replies"] = group["preview"] if group else []
+            c["replies_cursor"] = None
+            if c["reply_count"] > len(c["replies"]):
+                last = c["replies"][-1]
+                c["replies_cursor"] = encode_cursor(last["created_at"], last["_id"])
+
+        return top, next_cursor
+
+    @staticmethod
+    async def get_replies(comment_id: str, after: tuple, page_size: int):
+        """
+        Load-more page of every reply below a comment (any depth, oldest
+        first; index comment_ancestors). Returns (replies, next_cursor) or None.
+        """
+        query = {"ancestors": comment_id}
+        if after is not None:
+            query.update(keyset_filter("created_at", after[0], after[1], descending=False))
+
+        try:
+            replies = await db.comment.find(query) \
+                .sort([("created_at", 1), ("_id", 1)]) \
+                .limit(page_size + 1) \
+                .to_list(page_size + 1)
+        except Exception as e:
+            print("COMMENT REPLIES ERROR:", e)
+            return None
+
+        next_cursor = None
+        if len(replies) > page_size:
+            replies = replies[:page_size]
+            next_cursor = encode_cursor(replies[-1]["created_at"], replies[-1]["_id"])
+        return replies, next_cursor
+
     @staticmethod
     async def get_comments(article_id):
         try:
@@ -52,6 +186,7 @@ class CommentService:
                 {"_id": ObjectId(comment_id)},
                 {"$set": {"comment_content": new_content}}
             )
+            article_detail_cache.bump(article_id)
 
             # MongoDB: modified_count mungkin 0 jika value sama → tetap dianggap sukses
             return res.acknowledged
@@ -60,32 +195,122 @@ class CommentService:
             return False
     
     @staticmethod
-    async def delete_comment_and_children(comment_id: str):
+    async def delete_comment_and_children(comment_id: str, article_id: str = None):
         try:
-            to_delete = [comment_id]   # queue awal
+            if article_id is None:
+                root = await db.comment.find_one({"_id": ObjectId(comment_id)}, {"article_id": 1})
+                if root:
+                    article_id = root["article_id"]
 
-            # BFS / DFS untuk mengambil semua keturunan
-            idx = 0
-            while idx < len(to_delete):
-                current = to_delete[idx]
-
-                # Ambil semua child dari current
-                children = await db.comment.find(
-                    {"parent_comment_id": current}
-                ).to_list(None)
-
-                # Masukkan ke daftar delete
-                for child in children:
-                    to_delete.append(str(child["_id"]))
-
-                idx += 1
+            # comment + semua keturunan (index comment_ancestors) dalam satu query
+            result = await db.comment.delete_many({
+                "$or": [{"_id": ObjectId(comment_id)}, {"ancestors": comment_id}]
+            })
 
-            # Setelah semua keturunan terkumpul → hapus semua sekaligus
-            oid_list = [ObjectId(cid) for cid in to_delete]
-            await db.comment.delete_many({"_id": {"$in": oid_list}})
+            if article_id is not None:
+                if result.deleted_count:
+                    await db.article.update_one(
+                        {"_id": ObjectId(article_id)},
+                        {"$inc": {"comment_count": -result.deleted_count}}
+                    )
+                article_detail_cache.bump(article_id)
+            else:
+                article_detail_cache.clear()
 
             return True
 
         except Exception as e:
             print("DELETE ERROR:", e)
             return False
+
+    @staticmethod
+    async def delete_subtrees(comment_ids: list):
+        """
+        Delete several comments with all of their replies: one find for the
+        affected set, one delete_many, one bulk_write of comment_count fixes.
+        Errors propagate. Returns the number of comments removed.
+        """
+        if not comment_ids:
+            return 0
+
+        affected = await db.comment.find(
+            {"$or": [
+                {"_id": {"$in": [ObjectId(cid) for cid in comment_ids]}},
+                {"ancestors": {"$in": list(comment_ids)}},
+            ]},
+            {"article_id": 1}
+        ).to_list(None)
+        if not affected:
+            return 0
+
+        result = await db.comment.delete_many({"_id": {"$in": [c["_id"] for c in affected]}})
+
+        per_article = {}
+        for c in affected:
+            per_article[c["article_id"]] = per_article.get(c["article_id"], 0) + 1
+        await db.article.bulk_write([
+            UpdateOne({"_id": ObjectId(article_id)}, {"$inc": {"comment_count": -n}})
+            for article_id, n in per_article.items()
+        ], ordered=False)
+
+        for article_id in per_article:
+            article_detail_cache.bump(article_id)
+        return result.deleted_count
+
+    @staticmethod
+    async def backfill_ancestors(batch_size: int = 1000):
+        """
+        Compute `ancestors` for every comment from parent_comment_id.
+        Only ids and parent ids are loaded; comments whose stored path is
+        already correct are skipped. Returns {"updated": n, "orphans": n}
+        (orphans: the chain hits a parent that no longer exists).
+        """
+        parents = {}
+        stored = {}
+        async for c in db.comment.find({}, {"parent_comment_id": 1, "ancestors": 1}):
+            cid = str(c["_id"])
+            parent_id = c.get("parent_comment_id")
+            parents[cid] = parent_id if parent_id not in (None, "", "null") else None
+            stored[cid] = c.get("ancestors")
+
+        paths = {}
+        orphans = 0
+
+        def resolve(cid):
+            # iteratif: thread yang dalam tidak kena batas rekursi
+            chain = []
+            current = cid
+            while current in parents and current not in paths and current not in chain:
+                chain.append(current)
+                current = parents[current]
+
+            if current is None or current in chain:
+                base = []                           # root, atau siklus → potong di sini
+            elif current in paths:
+                base = paths[current] + [current]
+            else:
+                base = [current]                    # parent sudah tidak ada (orphan)
+
+            for node in reversed(chain):
+                paths[node] = base
+                base = base + [node]
+            return paths[cid]
+
+        ops = []
+        updated = 0
+        for cid in parents:
+            path = resolve(cid)
+            if path and path[0] not in parents:
+                orphans += 1
+            if stored[cid] != path:
+                ops.append(UpdateOne({"_id": ObjectId(cid)}, {"$set": {"ancestors": path}}))
+            if len(ops) >= batch_size:
+                await db.comment.bulk_write(ops, ordered=False)
+                updated += len(ops)
+                ops = []
+        if ops:
+            await db.comment.bulk_write(ops, ordered=False)
+            updated += len(ops)
+
+        article_detail_cache.clear()
+        return {"updated": updated, "orphans": orphans}
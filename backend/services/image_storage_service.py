@@ -0,0 +1,207 @@
+import os
+import hashlib
+from bson import ObjectId
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from db.connection import db, get_db
+from utils.image_validator import detect_image_type, image_hash
+
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(5 * 1024 * 1024)))
+
+# GridFS: article_image.files + article_image.chunks (255 KB per chunk)
+_bucket = (None, None)
+
+
+def image_bucket():
+    """GridFS bucket on the current database (the client is built lazily)."""
+    global _bucket
+    database = get_db()
+    if _bucket[0] is not database:
+        _bucket = (database, AsyncIOMotorGridFSBucket(database, bucket_name="article_image"))
+    return _bucket[1]
+
+
+class ImageTooLarge(Exception):
+    pass
+
+
+class InvalidImage(Exception):
+    pass
+
+
+class ImageUpload:
+    """
+    Streaming sink for one image: every chunk goes straight into a GridFS
+    upload stream, so memory use is bounded by the GridFS chunk size.
+    The size limit and PNG/JPEG signature are enforced while streaming.
+    """
+
+    def __init__(self, max_bytes: int = MAX_IMAGE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.content_type = None
+        self.file_id = None
+        self._grid_in = None
+        self._head = b""
+        self._sha256 = hashlib.sha256()
+
+    async def begin(self, filename: str):
+        if self._grid_in is not None:
+            raise InvalidImage("only one image per upload")
+        self._grid_in = image_bucket().open_upload_stream(filename or "article_image")
+        self.file_id = self._grid_in._id
+
+    async def write(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise ImageTooLarge()
+
+        if self.content_type is None:
+            self._head += data[:8]
+            if len(self._head) >= 8:
+                self._check_signature()
+
+        self._sha256.update(data)
+        await self._grid_in.write(data)
+
+    async def end(self):
+        if self.content_type is None:
+            self._check_signature()
+        await self._grid_in.set("metadata", {"contentType": self.content_type})
+        await self._grid_in.close()
+
+    async def abort(self):
+        if self._grid_in is not None and not self._grid_in.closed:
+            await self._grid_in.abort()
+        elif self.file_id is not None:
+            await ImageStorageService.delete(self.file_id)
+
+    def _check_signature(self):
+        self.content_type = detect_image_type(self._head)
+        if self.content_type is None:
+            raise InvalidImage()
+
+    @property
+    def received(self):
+        return self._grid_in is not None
+
+    def image_ref(self):
+        return {
+            "article_image_id": self.file_id,
+            "article_image_hash": self._sha256.hexdigest(),
+            "article_image_type": self.content_type,
+            "article_image_size": self.size,
+        }
+
+
+class ImageStorageService:
+
+    @staticmethod
+    async def save_bytes(image_bytes: bytes):
+        """
+        Store an in-memory image (base64 JSON endpoints) in GridFS.
+        Returns the image_ref fields for the article document,
+        "invalid_image" / "too_large", or None on backend error.
+        """
+        content_type = detect_image_type(image_bytes)
+        if content_type is None:
+            return "invalid_image"
+        if len(image_bytes) > MAX_IMAGE_BYTES:
+            return "too_large"
+
+        try:
+            file_id = await image_bucket().upload_from_stream(
+                "article_image", image_bytes, metadata={"contentType": content_type}
+            )
+        except Exception as e:
+            print("SAVE IMAGE ERROR:", e)
+            return None
+
+        return {
+            "article_image_id": file_id,
+            "article_image_hash": image_hash(image_bytes),
+            "article_image_type": content_type,
+            "article_image_size": len(image_bytes),
+        }
+
+    @staticmethod
+    async def open_stream(file_id):
+        try:
+            return await image_bucket().open_download_stream(ObjectId(file_id))
+        except Exception as e:
+            print("OPEN IMAGE ERROR:", e)
+            return None
+
+    @staticmethod
+    async def read_bytes(file_id):
+        grid_out = await ImageStorageService.open_stream(file_id)
+        if grid_out is None:
+            return None
+        return await grid_out.read()
+
+    @staticmethod
+    async def load_article_image(article: dict):
+        """Image bytes of an article: GridFS reference or legacy inline blob."""
+        if article.get("article_image_id"):
+            return await ImageStorageService.read_bytes(article["article_image_id"])
+        if article.get("article_image"):
+            return bytes(article["article_image"])
+        return None
+
+    @staticmethod
+    async def delete(file_id):
+        try:
+            await image_bucket().delete(ObjectId(file_id))
+            return True
+        except NoFile:
+            return False
+        except Exception as e:
+            print("DELETE IMAGE ERROR:", e)
+            return False
+
+    @staticmethod
+    async def migrate_inline_images():
+        """
+        Move inline article_image blobs from db.article into GridFS,
+        leaving only the file reference on the article document.
+        Returns {"migrated": n, "emptied": n, "failed": n}.
+        """
+        counts = {"migrated": 0, "emptied": 0, "failed": 0}
+
+        # batch kecil: tiap dokumen bisa berukuran beberapa MB
+        cursor = db.article.find(
+            {"article_image": {"$exists": True}},
+            {"article_image": 1}
+        ).batch_size(8)
+
+        async for article in cursor:
+            image_bytes = bytes(article["article_image"]) if article.get("article_image") else b""
+
+            if not image_bytes:
+                await db.article.update_one({"_id": article["_id"]}, {"$unset": {"article_image": ""}})
+                counts["emptied"] += 1
+                continue
+
+            content_type = detect_image_type(image_bytes) or "application/octet-stream"
+            try:
+                file_id = await image_bucket().upload_from_stream(
+                    "article_image", image_bytes, metadata={"contentType": content_type}
+                )
+                await db.article.update_one(
+                    {"_id": article["_id"]},
+                    {
+                        "$set": {
+                            "article_image_id": file_id,
+                            "article_image_hash": image_hash(image_bytes),
+                            "article_image_type": content_type,
+                            "article_image_size": len(image_bytes),
+                        },
+                        "$unset": {"article_image": ""}
+                    }
+                )
+                counts["migrated"] += 1
+            except Exception as e:
+                print("MIGRATE IMAGE ERROR:", article["_id"], e)
+                counts["failed"] += 1
+
+        return counts
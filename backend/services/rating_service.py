@@ -1,11 +1,24 @@
 from db.connection import db
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from core.cache import article_detail_cache
+
+# rating_avg diturunkan dari total yang tersimpan (pipeline update)
+RATING_AVG_UPDATE = [{"$set": {"rating_avg": {"$cond": [
+    {"$gt": ["$rating_count", 0]},
+    {"$divide": ["$rating_sum", "$rating_count"]},
+    0
+]}}}]
 
 class RatingService:
 
     @staticmethod
     async def add_rating(article_id, owner_id, rating_value):
+        """
+        Insert the rating and move the article aggregates. Returns the article
+        document as it is after the write (fresh rating_summary), or None.
+        """
         try:
             data = {
                 "article_id": article_id,
@@ -13,14 +26,122 @@ class RatingService:
                 "rating_value": rating_value,
                 "created_at": datetime.utcnow()
             }
-            result = await db.rating.insert_one(data)
-            return str(result.inserted_id)
+            await db.rating.insert_one(data)
+            article = await RatingService.apply_rating_delta(article_id, {rating_value: 1})
+            # bump setelah aggregate berubah: detail yang di-cache sebelum ini tidak terpakai lagi
+            article_detail_cache.bump(article_id)
+            return article or await RatingService.fetch_article(article_id)
         except Exception as e:
             print("ADD RATING ERROR:", e)
             return None
 
 
 
+    @staticmethod
+    async def apply_rating_delta(article_id, value_deltas: dict):
+        """
+        Update the rating aggregates on the article document.
+        value_deltas: {rating_value: +n / -n}, e.g. {3: -1, 5: 1} for an edit 3 → 5.
+        Count, sum, histogram and rating_avg change in one pipeline update, so
+        no reader sees a new count with the old average. Returns the updated
+        article, or None on error.
+        """
+        try:
+            return await db.article.find_one_and_update(
+                {"_id": ObjectId(article_id)},
+                RatingService.aggregate_update(value_deltas),
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            print("RATING AGGREGATE ERROR:", e)
+            return None
+
+    @staticmethod
+    def aggregate_inc(value_deltas: dict):
+        inc = {"rating_count": 0, "rating_sum": 0}
+        for value, n in value_deltas.items():
+            inc["rating_count"] += n
+            inc["rating_sum"] += value * n
+            inc[f"rating_histogram.{value}"] = n
+        return inc
+
+    @staticmethod
+    def aggregate_update(value_deltas: dict):
+        """aggregate_inc as a pipeline update ($add instead of $inc) followed by RATING_AVG_UPDATE."""
+        inc = RatingService.aggregate_inc(value_deltas)
+        return [
+            {"$set": {field: {"$add": [{"$ifNull": [f"${field}", 0]}, n]} for field, n in inc.items()}},
+            *RATING_AVG_UPDATE,
+        ]
+
+    @staticmethod
+    async def apply_rating_deltas(deltas: dict):
+        """
+        apply_rating_delta for many articles at once: one bulk_write of
+        pipeline updates. deltas: {article_id: value_deltas}.
+        Errors propagate to the caller.
+        """
+        if not deltas:
+            return
+        await db.article.bulk_write([
+            UpdateOne({"_id": ObjectId(article_id)}, RatingService.aggregate_update(value_deltas))
+            for article_id, value_deltas in deltas.items()
+        ], ordered=False)
+
+    @staticmethod
+    def summary(article: dict):
+        """Stored rating aggregates of an article, zero-filled for old documents."""
+        histogram = {str(v): 0 for v in range(1, 6)}
+        histogram.update(article.get("rating_histogram") or {})
+        return {
+            "rating_count": article.get("rating_count", 0),
+            "rating_sum": article.get("rating_sum", 0),
+            "rating_avg": article.get("rating_avg", 0),
+            "rating_histogram": histogram,
+        }
+
+    @staticmethod
+    async def reconcile_aggregates(batch_size: int = 1000):
+        """
+        Rebuild rating_count / rating_sum / rating_histogram / rating_avg of
+        every article from db.rating, fixes written in bulk_write batches.
+        Returns the number of articles whose stored aggregates were wrong.
+        """
+        grouped = await db.rating.aggregate([
+            {"$group": {
+                "_id": {"article_id": "$article_id", "value": "$rating_value"},
+                "n": {"$sum": 1}
+            }}
+        ]).to_list(None)
+
+        histograms = {}
+        for g in grouped:
+            article_id = str(g["_id"]["article_id"])
+            histograms.setdefault(article_id, {})[str(g["_id"]["value"])] = g["n"]
+
+        fixed = 0
+        ops = []
+        async for article in db.article.find({}, {"rating_count": 1, "rating_sum": 1, "rating_histogram": 1, "rating_avg": 1}):
+            histogram = {str(v): 0 for v in range(1, 6)}
+            histogram.update(histograms.get(str(article["_id"]), {}))
+            count = sum(histogram.values())
+            total = sum(int(v) * n for v, n in histogram.items())
+            expected = {
+                "rating_count": count,
+                "rating_sum": total,
+                "rating_histogram": histogram,
+                "rating_avg": total / count if count else 0,
+            }
+            if any(article.get(k) != v for k, v in expected.items()):
+                ops.append(UpdateOne({"_id": article["_id"]}, {"$set": expected}))
+                fixed += 1
+            if len(ops) >= batch_size:
+                await db.article.bulk_write(ops, ordered=False)
+                ops = []
+        if ops:
+            await db.article.bulk_write(ops, ordered=False)
+        return fixed
+
     @staticmethod
     async def get_rating_by_user(article_id, owner_id):
         try:
@@ -64,14 +185,25 @@ class RatingService:
         
     @staticmethod
     async def update_rating(rating_id, new_value):
+        """
+        Change a rating's value and move the article aggregates. Returns the
+        article document after the write, or None (rating not found / error).
+        """
         try:
-            from bson import ObjectId
-            result = await db.rating.update_one(
+            old = await db.rating.find_one_and_update(
                 {"_id": ObjectId(rating_id)},
-                {"$set": {"rating_value": new_value}}
+                {"$set": {"rating_value": new_value}},
+                return_document=ReturnDocument.BEFORE
             )
-            return result.modified_count == 1
-        except:
-            return False
-
-
+            if old is None:
+                return None
+            article = None
+            if old["rating_value"] != new_value:
+                article = await RatingService.apply_rating_delta(
+                    old["article_id"], {old["rating_value"]: -1, new_value: 1}
+                )
+            article_detail_cache.bump(old["article_id"])
+            return article or await RatingService.fetch_article(old["article_id"])
+        except Exception as e:
+            print("UPDATE RATING ERROR:", e)
+            return None
@@ -1,6 +1,7 @@
 from db.connection import db
 from bson import ObjectId
 from datetime import datetime
+from core.cache import article_detail_cache
 
 class ReportArticleService:
 
@@ -21,7 +22,18 @@ class ReportArticleService:
                 {"_id": ObjectId(article_id)},
                 {"$inc": {"report_count": 1}}
             )
+            article_detail_cache.bump(article_id)
 
             return str(result.inserted_id)
         except:
             return None
+
+
+    @staticmethod
+    async def get_reports(article_id: str):
+        try:
+            return await db.report_article.find(
+                {"article_id": ObjectId(article_id)}
+            ).to_list(None)
+        except:
+            return None
@@ -1,6 +1,7 @@
 from db.connection import db
 from bson import ObjectId
 from datetime import datetime
+from services.auth_service import AuthService
 
 class ReportUserService:
 
@@ -56,11 +57,15 @@ class ReportUserService:
         Returns True on success, False on failure.
         """
         try:
-            result = await db.user.update_one(
+            user = await db.user.find_one_and_update(
                 {"_id": ObjectId(user_oid_str)},
-                {"$inc": {"report_count": 1}}
+                {"$inc": {"report_count": 1}},
+                projection={"email": 1}
             )
-            return result.modified_count > 0 or result.matched_count > 0
+            if user is None:
+                return False
+            AuthService.invalidate_user(user.get("email"))
+            return True
         except Exception as e:
             print("INCREMENT REPORT COUNT ERROR:", e)
             return False
\ No newline at end of file
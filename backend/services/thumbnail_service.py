@@ -0,0 +1,149 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from bson import ObjectId
+from db.connection import db
+from core.cache import article_detail_cache
+from services.image_storage_service import ImageStorageService, image_bucket
+from utils.image_validator import image_hash
+from utils.thumbnail import make_thumbnails
+
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+
+_executor = None
+_background_tasks = set()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # spawn: jangan fork proses yang sedang menjalankan event loop + thread Motor
+        _executor = ProcessPoolExecutor(
+            max_workers=THUMBNAIL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+class ThumbnailService:
+
+    @staticmethod
+    async def generate_for_article(article_id: str):
+        """
+        Resize the article's current image in the process pool (event loop
+        stays free), store each derivative in GridFS and reference it from
+        article_thumbnails. The result is only installed if the article still
+        has the image it was generated from. Returns True on success.
+        """
+        try:
+            article = await db.article.find_one(
+                {"_id": ObjectId(article_id)},
+                {"article_image": 1, "article_image_id": 1, "article_image_hash": 1}
+            )
+        except Exception as e:
+            print("THUMBNAIL FETCH ERROR:", article_id, e)
+            return False
+
+        if article is None:
+            return False
+
+        image_bytes = await ImageStorageService.load_article_image(article)
+        if not image_bytes:
+            return False
+
+        loop = asyncio.get_running_loop()
+        try:
+            derivatives = await loop.run_in_executor(get_executor(), make_thumbnails, image_bytes)
+        except Exception as e:
+            print("THUMBNAIL ERROR:", article_id, e)
+            return False
+
+        sizes = {}
+        try:
+            for name, data in derivatives.items():
+                file_id = await image_bucket().upload_from_stream(
+                    f"article_thumbnail_{name}", data,
+                    metadata={"contentType": "image/jpeg", "article_id": article_id, "size": name}
+                )
+                sizes[name] = {
+                    "id": file_id,
+                    "hash": image_hash(data),
+                    "type": "image/jpeg",
+                }
+
+            # source_hash: thumbnail hanya valid untuk image yang menjadi sumbernya.
+            # Filter pada image sumber: bila edit yang lebih baru sudah mengganti image,
+            # job lama ini tidak boleh menimpa (lalu menghapus) thumbnail yang baru.
+            old = await db.article.find_one_and_update(
+                {"_id": article["_id"],
+                 "article_image_hash": article.get("article_image_hash"),
+                 "article_image_id": article.get("article_image_id")},
+                {"$set": {"article_thumbnails": {
+                    "source_hash": article.get("article_image_hash") or image_hash(image_bytes),
+                    "sizes": sizes,
+                }}},
+                projection={"article_thumbnails": 1}
+            )
+        except Exception as e:
+            print("SAVE THUMBNAIL ERROR:", article_id, e)
+            old = None
+
+        if old is None:
+            # image sudah berganti (atau artikel dihapus) → hasil job ini dibuang
+            for thumb in sizes.values():
+                await ImageStorageService.delete(thumb["id"])
+            return False
+
+        for thumb in ThumbnailService.thumbnail_sizes(old).values():
+            await ImageStorageService.delete(thumb["id"])
+
+        article_detail_cache.bump(article_id)
+        return True
+
+    @staticmethod
+    def thumbnail_sizes(article: dict):
+        return (article.get("article_thumbnails") or {}).get("sizes") or {}
+
+    @staticmethod
+    def current_thumbnail(article: dict, size: str):
+        """Derivative for `size`, or None if missing / generated from an older image."""
+        thumbnails = article.get("article_thumbnails") or {}
+        if article.get("article_image_hash") and thumbnails.get("source_hash") != article["article_image_hash"]:
+            return None
+        return (thumbnails.get("sizes") or {}).get(size)
+
+    @staticmethod
+    def schedule(article_id: str):
+        """Fire-and-forget generation after add / edit; the response does not wait."""
+        task = asyncio.create_task(ThumbnailService.generate_for_article(article_id))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    @staticmethod
+    async def backfill(force: bool = False):
+        """
+        Generate derivatives for existing articles that have an image but no
+        thumbnails (or all of them with force=True).
+        Returns {"generated": n, "failed": n}.
+        """
+        query = {"$or": [{"article_image_id": {"$exists": True}}, {"article_image": {"$exists": True}}]}
+        if not force:
+            query["article_thumbnails"] = {"$exists": False}
+
+        counts = {"generated": 0, "failed": 0}
+        cursor = db.article.find(query, {"_id": 1})
+        async for article in cursor:
+            if await ThumbnailService.generate_for_article(str(article["_id"])):
+                counts["generated"] += 1
+            else:
+                counts["failed"] += 1
+
+        return counts
+
+    @staticmethod
+    def shutdown():
+        global _executor
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -1,6 +1,10 @@
 from db.connection import db
 from bson import ObjectId
 from services.comment_service import CommentService
+from services.rating_service import RatingService
+from core.cache import article_detail_cache
+from services.auth_service import AuthService
+from pymongo import ReturnDocument
 
 class UserService:
 
@@ -38,37 +42,73 @@ class UserService:
         - All ratings by user
         - All report_user where reported_user_id = user_id
         - The user itself
+        Bulk cascade: a fixed number of queries regardless of how active the
+        user was; comment_count and rating aggregates are fixed up per article.
+        Returns {"comments", "ratings", "reports", "user"} removed counts, or None.
         """
         try:
             user_oid = ObjectId(user_id)
+            # cabut token dulu: request yang masuk selama cascade sudah ditolak
+            user = await db.user.find_one_and_update(
+                {"_id": user_oid},
+                {"$inc": {"token_version": 1}},
+                projection={"email": 1}
+            )
+            if user:
+                AuthService.invalidate_user(user.get("email"))
 
-            # --- Delete comments including children ---
-            user_comments = await db.comment.find({"owner_id": user_id}).to_list(None)
-            for c in user_comments:
-                await CommentService.delete_comment_and_children(str(c["_id"]))
+            # --- Delete comments including children (lihat ancestors) ---
+            user_comments = await db.comment.find({"owner_id": user_id}, {"_id": 1}).to_list(None)
+            comments_removed = await CommentService.delete_subtrees([str(c["_id"]) for c in user_comments])
 
             # --- Delete ratings ---
-            await db.rating.delete_many({"owner_id": user_id})
+            user_ratings = await db.rating.find(
+                {"owner_id": user_id}, {"article_id": 1, "rating_value": 1}
+            ).to_list(None)
+            ratings_result = await db.rating.delete_many({"owner_id": user_id})
+
+            # kurangi aggregate rating per artikel yang terdampak
+            deltas = {}
+            for r in user_ratings:
+                per_value = deltas.setdefault(r["article_id"], {})
+                per_value[r["rating_value"]] = per_value.get(r["rating_value"], 0) - 1
+            await RatingService.apply_rating_deltas(deltas)
 
             # --- Delete report_user where this user is reported ---
-            await db.report_user.delete_many({"reported_user_id": user_oid})
+            reports_result = await db.report_user.delete_many({"reported_user_id": user_oid})
 
             # --- Delete user ---
             result = await db.user.delete_one({"_id": user_oid})
-            return result.deleted_count == 1
+
+            # ratings di banyak artikel ikut terhapus → buang semua detail cache
+            article_detail_cache.clear()
+            if user:
+                AuthService.invalidate_user(user.get("email"))
+            return {
+                "comments": comments_removed,
+                "ratings": ratings_result.deleted_count,
+                "reports": reports_result.deleted_count,
+                "user": result.deleted_count,
+            }
 
         except Exception as e:
             print("DELETE USER ERROR:", e)
-            return False
+            return None
         
     @staticmethod
     async def make_admin(user_id: str):
         try:
-            result = await db.user.update_one(
+            old = await db.user.find_one_and_update(
                 {"_id": ObjectId(user_id)},
-                {"$set": {"role": "admin"}}
+                # token lama (role user) tidak berlaku lagi
+                {"$set": {"role": "admin"}, "$inc": {"token_version": 1}},
+                projection={"email": 1, "role": 1},
+                return_document=ReturnDocument.BEFORE
             )
-            return result.modified_count == 1
+            if old is None:
+                return False
+            AuthService.invalidate_user(old.get("email"))
+            return old.get("role") != "admin"
         except:
             return False
 
@@ -0,0 +1,61 @@
+import pytest
+import db.connection as connection
+from benchmarks.e2e import use_in_memory_mongo
+from core.cache import user_cache, article_detail_cache
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def mongo():
+    """Fresh mongomock-motor database per test; caches start empty."""
+    use_in_memory_mongo()
+    user_cache.clear()
+    article_detail_cache.clear()
+    yield connection.db
+    connection.close_client()
+
+
+@pytest.fixture
+async def api(mongo):
+    """httpx client on main.app (lifespan not entered: no warm-up / index build)."""
+    import httpx
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def make_user(mongo):
+    """Insert a user and return (document, Authorization headers)."""
+    from datetime import datetime
+    from core.security import create_token
+
+    async def make(email, role="user", token_version=0):
+        user = {"username": email.split("@")[0], "fullname": "Test User", "email": email, "password": "x",
+                "role": role, "token_version": token_version, "report_count": 0, "created_at": datetime.utcnow()}
+        user["_id"] = (await mongo.user.insert_one(user)).inserted_id
+        token = create_token({"email": email, "id": str(user["_id"]), "role": role, "token_version": token_version})
+        return user, {"Authorization": f"Bearer {token}"}
+
+    return make
+
+
+@pytest.fixture
+def make_article(mongo):
+    from datetime import datetime, timedelta
+
+    async def make(n=0, **fields):
+        created = datetime(2025, 1, 1) + timedelta(minutes=n)
+        article = {"article_title": f"Article {n}", "article_preview": "preview", "article_content": "content",
+                   "article_tag": "tech", "author_id": "", "report_count": 0, "comment_count": 0,
+                   "created_at": created, "updated_at": created, "is_deleted": False, **fields}
+        article["_id"] = (await mongo.article.insert_one(article)).inserted_id
+        return article
+
+    return make
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+import pytest
+import db.connection as connection
+import services.article_detail_service as detail_service
+from services.article_detail_service import ArticleDetailService
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeAggregate:
+    """db.article.aggregate stand-in: mongomock has no $lookup with localField + pipeline."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.pipelines = []
+
+    def __call__(self, pipeline):
+        self.pipelines.append(pipeline)
+        docs = self.docs
+
+        class Cursor:
+            async def to_list(self, n):
+                return [dict(doc) for doc in docs]
+
+        return Cursor()
+
+
+class AggregateOnlyDb:
+    """db with article.aggregate replaced; every other collection is the test database."""
+
+    def __init__(self, aggregate):
+        self.article = SimpleNamespace(aggregate=aggregate)
+
+    def __getattr__(self, name):
+        return getattr(connection.db, name)
+
+
+async def seed_article(mongo, make_article, make_user, comments=3):
+    owner, _ = await make_user("owner@example.com")
+    article = await make_article()
+    article_id = str(article["_id"])
+    await mongo.comment.insert_many([
+        {"article_id": article_id, "owner_id": str(owner["_id"]), "parent_comment_id": None,
+         "comment_content": f"c{i}", "ancestors": []} for i in range(comments)
+    ])
+    return article, owner
+
+
+def aggregated_doc(article, owner, comments):
+    owner_doc = [{"_id": owner["_id"], "username": owner["username"], "email": owner["email"]}]
+    return {**article, "comments": [
+        {"_id": i, "owner_id": str(owner["_id"]), "parent_comment_id": None, "comment_content": f"c{i}",
+         "owner": owner_doc} for i in range(comments)
+    ], "ratings": [], "report_articles": []}
+
+
+async def test_lookups_are_projected_and_capped_without_viewer_stage(mongo, make_article, make_user, monkeypatch):
+    article, owner = await seed_article(mongo, make_article, make_user)
+    fake = FakeAggregate([aggregated_doc(article, owner, 3)])
+    monkeypatch.setattr(detail_service, "db", AggregateOnlyDb(fake))
+    monkeypatch.setattr(detail_service, "ARTICLE_DETAIL_LOOKUP_LIMIT", 10)
+
+    detail = await ArticleDetailService.get_article_detail_aggregated(str(article["_id"]))
+
+    lookups = [stage["$lookup"] for stage in fake.pipelines[0] if "$lookup" in stage]
+    assert [lookup["from"] for lookup in lookups] == ["comment", "rating", "report_article"]
+    for lookup in lookups:
+        # dipotong sebelum lookup owner, bukan setelahnya
+        assert "$project" in lookup["pipeline"][0]
+        assert lookup["pipeline"][1] == {"$limit": 11}
+        assert {"$limit": 11} not in lookup["pipeline"][2:]
+    assert [c["comment_content"] for c in detail["comments"]] == ["c0", "c1", "c2"]
+    assert detail["comments"][0]["user_email"] == "owner@example.com"
+
+
+async def test_busy_article_falls_back_to_the_multi_query_path(mongo, make_article, make_user, monkeypatch):
+    article, owner = await seed_article(mongo, make_article, make_user, comments=4)
+    monkeypatch.setattr(detail_service, "db", AggregateOnlyDb(FakeAggregate([aggregated_doc(article, owner, 4)])))
+    monkeypatch.setattr(detail_service, "ARTICLE_DETAIL_LOOKUP_LIMIT", 3)
+
+    detail = await ArticleDetailService.get_article_detail_aggregated(str(article["_id"]))
+
+    assert len(detail["comments"]) == 4
+    assert detail == await ArticleDetailService.get_article_detail(str(article["_id"]), article)
+
+
+async def test_view_in_aggregate_mode_uses_the_shared_cache_protocol(api, mongo, make_article, make_user, monkeypatch):
+    import routes.article
+    from core.cache import article_detail_cache
+
+    article, owner = await seed_article(mongo, make_article, make_user)
+    article_id = str(article["_id"])
+    fake = FakeAggregate([aggregated_doc(article, owner, 3)])
+    monkeypatch.setattr(detail_service, "db", AggregateOnlyDb(fake))
+    monkeypatch.setattr(routes.article, "ARTICLE_DETAIL_MODE", "aggregate")
+    _, headers = await make_user("reader@example.com")
+    view = {"article_id": article_id, "image_format": "url"}
+
+    # writer mendarat selagi aggregate berjalan → hasil lama tidak disimpan
+    aggregate = fake.__call__
+    fake_with_bump = lambda pipeline: (article_detail_cache.bump(article_id), aggregate(pipeline))[1]
+    monkeypatch.setattr(detail_service, "db", AggregateOnlyDb(fake_with_bump))
+    assert (await api.post("/article/view", json=view, headers=headers)).json()["confirmation"] == "successful"
+    assert article_detail_cache.get(article_id) is None
+
+    monkeypatch.setattr(detail_service, "db", AggregateOnlyDb(fake))
+    first = (await api.post("/article/view", json=view, headers=headers)).json()
+    second = (await api.post("/article/view", json=view, headers=headers)).json()
+    assert first == second and len(first["comments"]) == 3
+    assert len(fake.pipelines) == 2
@@ -0,0 +1,20 @@
+import pytest
+from services.article_service import ArticleService
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_backfill_listing_counters_writes_only_wrong_counts(mongo, make_article):
+    articles = [await make_article(i, comment_count=0) for i in range(5)]
+    await mongo.article.update_one({"_id": articles[4]["_id"]}, {"$unset": {"comment_count": ""}})
+    await mongo.comment.insert_many([
+        {"article_id": str(articles[0]["_id"])},
+        {"article_id": str(articles[0]["_id"])},
+        {"article_id": str(articles[2]["_id"])},
+    ])
+
+    assert await ArticleService.backfill_listing_counters(batch_size=2) == 3
+    counts = {a["_id"]: a["comment_count"] async for a in mongo.article.find({}, {"comment_count": 1})}
+    assert [counts[a["_id"]] for a in articles] == [2, 0, 1, 0, 0]
+    assert await ArticleService.backfill_listing_counters() == 0
@@ -0,0 +1,71 @@
+import pytest
+from core.security import create_token
+
+
+pytestmark = pytest.mark.anyio
+
+
+def bearer(user, **claims):
+    payload = {"email": user["email"], "id": str(user["_id"]), "role": user["role"],
+               "token_version": user["token_version"], **claims}
+    return {"Authorization": f"Bearer {create_token(payload)}"}
+
+
+async def test_missing_or_garbage_token_is_rejected(api, mongo):
+    assert (await api.post("/article/feed", json={})).json()["confirmation"] == "token invalid"
+    response = await api.post("/article/feed", json={}, headers={"Authorization": "Bearer nope"})
+    assert response.json()["confirmation"] == "token invalid"
+
+
+async def test_token_from_cookie_and_json_body(api, make_user):
+    user, headers = await make_user("reader@example.com")
+    token = headers["Authorization"][7:]
+
+    api.cookies.set("token", token)
+    assert (await api.post("/article/feed", json={})).json()["confirmation"] == "fetch data successful"
+    api.cookies.clear()
+    assert (await api.post("/article/feed", json={"token": token})).json()["confirmation"] == "fetch data successful"
+
+
+async def test_bumped_token_version_revokes_old_tokens(api, make_user, mongo):
+    from services.auth_service import AuthService
+
+    user, headers = await make_user("reader@example.com")
+    assert (await api.post("/article/feed", json={}, headers=headers)).json()["confirmation"] == "fetch data successful"
+
+    await mongo.user.update_one({"_id": user["_id"]}, {"$inc": {"token_version": 1}})
+    AuthService.invalidate_user(user["email"])
+
+    assert (await api.post("/article/feed", json={}, headers=headers)).json()["confirmation"] == "token invalid"
+    fresh = bearer({**user, "token_version": 1})
+    assert (await api.post("/article/feed", json={}, headers=fresh)).json()["confirmation"] == "fetch data successful"
+
+
+async def test_token_for_another_user_id_is_rejected(api, make_user):
+    user, _ = await make_user("reader@example.com")
+    other, _ = await make_user("other@example.com")
+    forged = bearer(user, id=str(other["_id"]))
+    assert (await api.post("/article/feed", json={}, headers=forged)).json()["confirmation"] == "token invalid"
+
+
+async def test_admin_routes_authorize_on_the_verified_role_claim(api, make_user):
+    admin, admin_headers = await make_user("admin@example.com", role="admin")
+    _, user_headers = await make_user("reader@example.com")
+
+    assert (await api.post("/user/get_all", json={}, headers=admin_headers)).json()["confirmation"] == "successful"
+    assert (await api.post("/user/get_all", json={}, headers=user_headers)).json()["confirmation"] == "not admin"
+    # token role "user" untuk dokumen admin: claim yang menentukan
+    demoted = bearer(admin, role="user")
+    assert (await api.post("/user/get_all", json={}, headers=demoted)).json()["confirmation"] == "not admin"
+
+
+async def test_make_admin_revokes_tokens_issued_with_the_old_role(api, make_user):
+    _, admin_headers = await make_user("admin@example.com", role="admin")
+    user, user_headers = await make_user("reader@example.com")
+
+    response = await api.post("/user/make_admin", json={"user_id": str(user["_id"])}, headers=admin_headers)
+    assert response.json()["confirmation"] == "successful: role updated to admin"
+
+    assert (await api.post("/user/get_all", json={}, headers=user_headers)).json()["confirmation"] == "token invalid"
+    promoted = bearer({**user, "role": "admin", "token_version": 1})
+    assert (await api.post("/user/get_all", json={}, headers=promoted)).json()["confirmation"] == "successful"
@@ -0,0 +1,123 @@
+import pytest
+from core.cache import TTLCache, VersionedCache, article_detail_cache
+from services.article_detail_service import ArticleDetailService
+
+
+def test_ttl_cache_lru_eviction_and_expiry(monkeypatch):
+    import core.cache as cache_module
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1          # a jadi yang terbaru
+    cache.set("c", 3)                   # b dikeluarkan (LRU)
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_versioned_cache_ignores_sets_from_before_a_bump():
+    cache = VersionedCache(maxsize=10, ttl=60)
+    version = cache.version("x")
+    cache.bump("x")
+    cache.set("x", version, "stale")
+    assert cache.get("x") is None
+
+    cache.set("x", cache.version("x"), "fresh")
+    assert cache.get("x") == "fresh"
+    cache.clear()
+    assert cache.get("x") is None
+
+
+
+def test_versioned_cache_keeps_a_bounded_version_map():
+    cache = VersionedCache(maxsize=4, ttl=60)
+    cache.set("kept", cache.version("kept"), "kept")
+    stale = cache.version("a")
+    cache.bump("a")
+    for i in range(1000):
+        cache.bump(f"article-{i}")
+    assert len(cache._versions) == 4
+
+    # versi "a" sudah dilupakan, tetapi read dari sebelum bump tetap ditolak
+    cache.set("a", stale, "stale")
+    assert cache.get("a") is None
+    cache.set("a", cache.version("a"), "fresh")
+    assert cache.get("a") == "fresh"
+    # entry yang tidak di-bump tidak ikut hilang
+    assert cache.get("kept") == "kept"
+
+
+def test_versioned_cache_clear_rejects_reads_started_before_it():
+    cache = VersionedCache(maxsize=4, ttl=60)
+    version = cache.version("x")
+    cache.clear()
+    cache.set("x", version, "stale")
+    assert cache.get("x") is None
+
+
+async def seed_article(mongo, make_article, make_user):
+    owner, _ = await make_user("owner@example.com")
+    article = await make_article()
+    await mongo.comment.insert_one({"article_id": str(article["_id"]), "owner_id": str(owner["_id"]),
+                                    "parent_comment_id": None, "comment_content": "c0", "ancestors": []})
+    return article, owner
+
+
+@pytest.mark.anyio
+async def test_fetch_detail_caches_under_the_version_read_before_the_build(mongo, make_article, make_user):
+    article, _ = await seed_article(mongo, make_article, make_user)
+    article_id = str(article["_id"])
+
+    detail = await ArticleDetailService.fetch_detail(article_id, article)
+    assert article_detail_cache.get(article_id) == detail
+
+    article_detail_cache.bump(article_id)
+    assert article_detail_cache.get(article_id) is None
+
+
+@pytest.mark.anyio
+async def test_stale_build_is_not_stored_after_a_concurrent_bump(mongo, make_article, make_user, monkeypatch):
+    article, _ = await seed_article(mongo, make_article, make_user)
+    article_id = str(article["_id"])
+    build = ArticleDetailService.get_article_detail
+
+    async def build_then_write(*args):
+        detail = await build(*args)
+        article_detail_cache.bump(article_id)       # writer mendarat selagi read berjalan
+        return detail
+
+    monkeypatch.setattr(ArticleDetailService, "get_article_detail", staticmethod(build_then_write))
+    await ArticleDetailService.fetch_detail(article_id, article)
+    assert article_detail_cache.get(article_id) is None
+
+
+@pytest.mark.anyio
+async def test_comment_write_invalidates_cached_detail(api, make_user, make_article, mongo):
+    _, headers = await make_user("reader@example.com")
+    article_id = str((await make_article())["_id"])
+    view = {"article_id": article_id, "image_format": "url"}
+
+    assert (await api.post("/article/view", json=view, headers=headers)).json()["comments"] == []
+    added = await api.post("/comment/add", json={**view, "comment_content": "first!"}, headers=headers)
+    assert [c["comment_content"] for c in added.json()["comments"]] == ["first!"]
+    assert [c["comment_content"] for c in (await api.post("/article/view", json=view, headers=headers)).json()["comments"]] == ["first!"]
+
+
+@pytest.mark.anyio
+async def test_cache_stats_endpoint_is_admin_only(api, make_user, make_article):
+    _, admin_headers = await make_user("admin@example.com", role="admin")
+    _, user_headers = await make_user("reader@example.com")
+    view = {"article_id": str((await make_article())["_id"]), "image_format": "url"}
+    await api.post("/article/view", json=view, headers=user_headers)
+    await api.post("/article/view", json=view, headers=user_headers)
+
+    assert (await api.post("/article/cache_stats", headers=user_headers)).json()["confirmation"] == "not admin"
+    response = (await api.post("/article/cache_stats", headers=admin_headers)).json()
+    assert response["confirmation"] == "successful"
+    assert response["article_detail_cache"]["hits"] >= 1 and response["article_detail_cache"]["misses"] >= 1
@@ -0,0 +1,62 @@
+import pytest
+from services.comment_service import CommentService
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def add(article, parent=None, owner="u1", text="c"):
+    return await CommentService.add_comment(str(article["_id"]), parent, owner, text)
+
+
+async def test_replies_store_the_path_from_the_thread_root(mongo, make_article):
+    article = await make_article()
+    root = await add(article, "null")
+    child = await add(article, root)
+    grandchild = await add(article, child)
+
+    assert (await CommentService.get_comment(root))["parent_comment_id"] is None
+    assert (await CommentService.get_comment(grandchild))["ancestors"] == [root, child]
+    assert {str(c["_id"]) for c in await CommentService.get_subtree(child)} == {child, grandchild}
+    assert (await mongo.article.find_one({}))["comment_count"] == 3
+
+
+async def test_delete_removes_the_subtree_and_fixes_comment_count(mongo, make_article):
+    article = await make_article()
+    root = await add(article)
+    child = await add(article, root)
+    await add(article, child)
+    sibling = await add(article)
+
+    assert await CommentService.delete_comment_and_children(root, str(article["_id"]))
+    assert [str(c["_id"]) async for c in mongo.comment.find({})] == [sibling]
+    assert (await mongo.article.find_one({}))["comment_count"] == 1
+
+
+async def test_backfill_ancestors_handles_legacy_orphans_and_cycles(mongo):
+    from bson import ObjectId
+    ids = [ObjectId() for _ in range(5)]
+    a, b, c, d, e = (str(i) for i in ids)
+    await mongo.comment.insert_many([
+        {"_id": ids[0], "parent_comment_id": None},
+        {"_id": ids[1], "parent_comment_id": a},
+        {"_id": ids[2], "parent_comment_id": b},
+        {"_id": ids[3], "parent_comment_id": str(ObjectId())},    # parent sudah dihapus
+        {"_id": ids[4], "parent_comment_id": e},                  # siklus ke diri sendiri
+    ])
+
+    assert await CommentService.backfill_ancestors(batch_size=2) == {"updated": 5, "orphans": 1}
+    paths = {str(doc["_id"]): doc["ancestors"] async for doc in mongo.comment.find({})}
+    assert paths[a] == [] and paths[b] == [a] and paths[c] == [a, b]
+    assert len(paths[d]) == 1 and paths[e] == []
+    assert (await CommentService.backfill_ancestors())["updated"] == 0
+
+
+async def test_ancestors_of_walks_up_unmigrated_comments(mongo, make_article):
+    article = await make_article()
+    root = await add(article)
+    child = await add(article, root)
+    await mongo.comment.update_many({}, {"$unset": {"ancestors": ""}})
+
+    grandchild = await add(article, child)
+    assert (await CommentService.get_comment(grandchild))["ancestors"] == [root, child]
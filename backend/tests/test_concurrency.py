@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from utils.concurrency import gather_bounded, gather_safe
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_gather_bounded_limits_in_flight_and_keeps_order():
+    in_flight = 0
+    peak = 0
+
+    async def read(i):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return i
+
+    assert await gather_bounded([read(i) for i in range(20)], 3) == list(range(20))
+    assert peak == 3
+
+
+async def test_gather_helpers_map_failures_to_none():
+    async def boom():
+        raise RuntimeError("db down")
+
+    async def value(v):
+        return v
+
+    assert await gather_bounded([value(1), boom()], 2) is None
+    assert await gather_safe(value(1), boom()) is None
+    assert await gather_safe(value(1), value(2)) == [1, 2]
+
+
+async def test_main_page_base64_reads_images_with_bounded_fan_out(api, make_user, make_article, monkeypatch):
+    import routes.article
+    from services.image_storage_service import ImageStorageService
+
+    _, headers = await make_user("reader@example.com")
+    for i in range(6):
+        await make_article(i, article_image_id="x")
+
+    in_flight = 0
+    peak = 0
+
+    async def read_image(article):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return b"img"
+
+    monkeypatch.setattr(routes.article, "MAIN_PAGE_IMAGE_CONCURRENCY", 2)
+    monkeypatch.setattr(ImageStorageService, "load_article_image", staticmethod(read_image))
+
+    response = await api.post("/article/main_page", json={}, headers=headers)
+    assert response.json()["confirmation"] == "fetch data successful"
+    assert [a["article_image"] for a in response.json()["list_article"]] == ["img"] * 6
+    assert peak == 2
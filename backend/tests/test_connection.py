@@ -0,0 +1,27 @@
+import pytest
+import db.connection as connection
+
+
+def test_client_is_not_built_at_import():
+    import main  # noqa: F401
+    connection.close_client()
+    assert connection.client is None
+
+
+@pytest.mark.anyio
+async def test_configure_swaps_the_database_behind_db(mongo):
+    from services.rating_service import RatingService
+
+    await connection.db.article.insert_one({"article_title": "x"})
+    article = await connection.get_db().article.find_one({})
+    assert (await RatingService.fetch_article(str(article["_id"])))["article_title"] == "x"
+
+
+def test_compressors_and_write_concern_come_from_settings(monkeypatch):
+    monkeypatch.setattr(connection, "MONGO_COMPRESSORS", "")
+    client = connection.create_client(connect=False)
+    try:
+        assert client.options.pool_options._compression_settings.compressors == []
+        assert client.write_concern.document == {"w": "majority"}
+    finally:
+        client.close()
@@ -0,0 +1,55 @@
+import time
+import pytest
+import db.connection as connection
+from db import indexes
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_startup_check_gives_up_on_unreachable_mongo():
+    connection.configure(connection.create_client("mongodb://127.0.0.1:1", serverSelectionTimeoutMS=30000))
+    try:
+        start = time.perf_counter()
+        assert await indexes.check_indexes(timeout=0.2) is None
+        assert time.perf_counter() - start < 2
+    finally:
+        connection.close_client()
+
+
+async def test_startup_builds_the_registry_in_the_background(mongo):
+    await indexes.start_index_build()
+
+    info = await mongo.user.index_information()
+    assert info["user_email"].get("unique") is True
+    assert (await mongo.rating.index_information())["rating_article_owner"].get("unique") is True
+
+
+async def test_startup_reports_drift_even_when_a_build_fails(mongo, monkeypatch, capsys):
+    async def failing():
+        raise RuntimeError("boom")
+
+    async def drift():
+        return [{"collection": "comment", "name": "comment_owner", "status": "missing"}]
+
+    monkeypatch.setattr(indexes, "ensure_indexes", failing)
+    monkeypatch.setattr(indexes, "index_drift", drift)
+    assert await indexes.apply_indexes() == [{"collection": "comment", "name": "comment_owner", "status": "missing"}]
+    assert "ENSURE INDEXES ERROR: boom" in capsys.readouterr().out
+
+
+def test_registry_names_are_unique_and_parent_index_is_gone():
+    names = [options["name"] for _, _, options in indexes.INDEXES]
+    assert len(names) == len(set(names))
+    assert "comment_parent" not in names
+
+
+async def test_drop_extra_indexes_only_drops_extras(mongo):
+    await mongo.comment.create_index("parent_comment_id", name="comment_parent")
+    await mongo.comment.create_index("owner_id", name="comment_owner")
+    drift = [
+        {"collection": "comment", "name": "comment_parent", "status": "extra"},
+        {"collection": "comment", "name": "comment_thread", "status": "missing"},
+    ]
+    assert await indexes.drop_extra_indexes(drift) == ["comment.comment_parent"]
+    assert set(await mongo.comment.index_information()) == {"_id_", "comment_owner"}
@@ -0,0 +1,74 @@
+import re
+import pytest
+from core.metrics import render_metrics, Histogram
+
+
+def families(text):
+    """{name: {"type": ..., "help": bool, "samples": [(name, labels, value)]}} from the exposition text."""
+    result = {}
+    for line in text.strip().split("\n"):
+        if line.startswith("# HELP "):
+            result.setdefault(line.split()[2], {"samples": []})["help"] = True
+        elif line.startswith("# TYPE "):
+            _, _, name, kind = line.split()
+            result.setdefault(name, {"samples": []})["type"] = kind
+        else:
+            match = re.match(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})? (\S+)$", line)
+            assert match, line
+            name = match.group(1)
+            family = name if name in result else re.sub(r"_(bucket|sum|count)$", "", name)
+            assert family in result, f"sample {name} without HELP/TYPE"
+            result[family]["samples"].append((name, match.group(2) or "", float(match.group(3))))
+    return result
+
+
+@pytest.mark.anyio
+async def test_every_family_is_typed_and_counters_end_in_total(api):
+    await api.get("/")
+    parsed = families(render_metrics())
+
+    for name, family in parsed.items():
+        assert family.get("help") and family.get("type"), name
+        if family["type"] == "counter":
+            assert name.endswith("_total"), name
+
+    for name in ("retogen_cache_hits_total", "retogen_cache_evictions_total", "retogen_mongo_commands_total",
+                 "retogen_mongo_command_failures_total", "retogen_password_hasher_completed_total",
+                 "retogen_password_hasher_rejected_total", "retogen_mongo_health_checks_total"):
+        assert parsed[name]["type"] == "counter", name
+    assert parsed["retogen_mongo_circuit_open"]["type"] == "gauge"
+    assert parsed["retogen_process_start_time_seconds"]["type"] == "gauge"
+    assert parsed["retogen_http_requests_total"]["samples"]
+
+
+def test_pool_checkout_wait_is_a_cumulative_histogram(monkeypatch):
+    import db.connection as connection
+    from types import SimpleNamespace
+
+    pool = connection.PoolMetrics()
+    pool.connection_checked_out(SimpleNamespace(duration=0.003))
+    pool.connection_checked_out(SimpleNamespace(duration=2.0))
+    monkeypatch.setattr(connection, "pool_metrics", pool)
+
+    family = families(render_metrics())["retogen_mongo_pool_checkout_wait_seconds"]
+    buckets = [(labels, v) for name, labels, v in family["samples"] if name.endswith("_bucket")]
+
+    assert family["type"] == "histogram"
+    assert [v for _, v in buckets] == sorted(v for _, v in buckets)
+    assert buckets[0] == ('{le="0.001"}', 0) and buckets[1] == ('{le="0.005"}', 1)
+    assert buckets[-1] == ('{le="+Inf"}', 2)
+    assert family["samples"][-2][0].endswith("_sum") and family["samples"][-2][2] == pytest.approx(2.003)
+    assert family["samples"][-1] == ("retogen_mongo_pool_checkout_wait_seconds_count", "", 2)
+
+
+def test_histogram_render_is_cumulative_with_sum_and_count():
+    h = Histogram((1, 5))
+    for value in (0.5, 3, 3, 10):
+        h.observe(("GET",), value)
+    assert h.render("x", ("method",)) == [
+        'x_bucket{method="GET",le="1"} 1',
+        'x_bucket{method="GET",le="5"} 3',
+        'x_bucket{method="GET",le="+Inf"} 4',
+        'x_sum{method="GET"} 16.5',
+        'x_count{method="GET"} 4',
+    ]
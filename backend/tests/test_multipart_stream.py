@@ -0,0 +1,115 @@
+import pytest
+from utils.multipart_stream import parse_multipart, MultipartError, BodyTooLarge
+
+
+pytestmark = pytest.mark.anyio
+
+BOUNDARY = "testboundary"
+
+
+class FakeRequest:
+    def __init__(self, body: bytes, chunk_size: int = 7):
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def stream(self):
+        for i in range(0, len(self.body), self.chunk_size):
+            yield self.body[i:i + self.chunk_size]
+
+
+class RecordingSink:
+    def __init__(self):
+        self.calls = []
+        self.data = b""
+
+    async def begin(self, filename):
+        self.calls.append(("begin", filename))
+
+    async def write(self, data):
+        self.data += data
+
+    async def end(self):
+        self.calls.append(("end", None))
+
+
+def form(*parts):
+    body = b""
+    for name, value, filename in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename is not None else "")
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + value + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def test_fields_and_file_are_streamed():
+    sink = RecordingSink()
+    fields = await parse_multipart(FakeRequest(form(
+        ("article_title", b"Hello", None),
+        ("article_image", b"\x89PNG" * 20, "a.png"),
+    )), sink)
+
+    assert fields == {"article_title": "Hello"}
+    assert sink.calls == [("begin", "a.png"), ("end", None)]
+    assert sink.data == b"\x89PNG" * 20
+
+
+async def test_empty_file_part_without_filename_is_skipped():
+    sink = RecordingSink()
+    fields = await parse_multipart(FakeRequest(form(
+        ("article_id", b"abc", None),
+        ("article_image", b"", ""),
+    )), sink)
+
+    assert fields == {"article_id": "abc"}
+    assert sink.calls == []
+
+
+async def test_named_empty_file_still_reaches_sink():
+    sink = RecordingSink()
+    await parse_multipart(FakeRequest(form(("article_image", b"", "empty.png"))), sink)
+    assert sink.calls == [("begin", "empty.png"), ("end", None)]
+
+
+async def test_body_cap_applies_while_streaming():
+    body = form(("article_image", b"x" * 500, "a.png"))
+    with pytest.raises(BodyTooLarge):
+        await parse_multipart(FakeRequest(body), RecordingSink(), max_body_bytes=200)
+
+
+async def test_field_cap_and_content_type_are_enforced():
+    with pytest.raises(MultipartError):
+        await parse_multipart(FakeRequest(form(("article_content", b"x" * 50, None))), RecordingSink(),
+                              max_field_bytes=10)
+
+    request = FakeRequest(b"")
+    request.headers = {"content-type": "application/json"}
+    with pytest.raises(MultipartError):
+        await parse_multipart(request, RecordingSink())
+
+
+async def test_edit_upload_accepts_form_without_a_chosen_file(api, make_user, make_article, mongo):
+    _, headers = await make_user("admin@example.com", role="admin")
+    article_id = str((await make_article())["_id"])
+    body = form(("article_id", article_id.encode(), None), ("article_title", b"Renamed", None),
+                ("article_preview", b"preview", None), ("article_content", b"content", None),
+                ("article_tag", b"gaming", None), ("article_image", b"", ""))
+
+    response = await api.post("/article/edit/upload", content=body,
+                              headers={**headers, "content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+
+    assert response.json()["confirmation"] == "successful: article edited"
+    assert (await mongo.article.find_one({}))["article_title"] == "Renamed"
+    assert await mongo["article_image.files"].count_documents({}) == 0
+
+
+async def test_chunked_upload_over_the_cap_is_rejected(api, make_user, monkeypatch):
+    import routes.article
+    monkeypatch.setattr(routes.article, "MAX_UPLOAD_BYTES", 1024)
+    _, headers = await make_user("admin@example.com", role="admin")
+
+    async def chunks():
+        yield form(("article_image", b"\x89PNG\r\n\x1a\n" + b"x" * 4096, "a.png"))
+
+    response = await api.post("/article/add/upload", content=chunks(),
+                              headers={**headers, "content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+    assert response.json()["confirmation"] == "image too large"
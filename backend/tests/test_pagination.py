@@ -0,0 +1,96 @@
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from services.article_service import ArticleService
+from utils.pagination import encode_cursor, decode_cursor, keyset_filter, clamp_page_size
+
+
+@pytest.mark.parametrize("value", [datetime(2025, 3, 4, 5, 6, 7), 4.5, 12, None])
+def test_cursor_round_trip(value):
+    oid = ObjectId()
+    assert decode_cursor(encode_cursor(value, oid)) == (value, oid)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(1, ObjectId())[:-4]])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def raw_cursor(payload):
+    import base64, json
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("value", [{"$ne": None}, {"$gt": ""}, [1, 2], True])
+def test_cursor_value_must_be_scalar(value):
+    with pytest.raises(ValueError):
+        decode_cursor(raw_cursor({"v": value, "i": str(ObjectId())}))
+
+
+def test_cursor_with_date_or_id_of_the_wrong_type_is_invalid():
+    with pytest.raises(ValueError):
+        decode_cursor(raw_cursor({"d": {"$ne": None}, "i": str(ObjectId())}))
+    with pytest.raises(ValueError):
+        decode_cursor(raw_cursor({"v": 1, "i": {"$ne": None}}))
+
+
+@pytest.mark.anyio
+async def test_feed_rejects_operator_cursor(api, make_user, make_article):
+    _, headers = await make_user("reader@example.com")
+    await make_article()
+    cursor = raw_cursor({"v": {"$ne": None}, "i": str(ObjectId())})
+    response = await api.post("/article/feed", json={"cursor": cursor, "sort": "highest_rated"}, headers=headers)
+    assert response.json() == {"confirmation": "invalid cursor"}
+
+
+def test_clamp_page_size():
+    assert clamp_page_size(None, 20, 100) == 20
+    assert clamp_page_size(0, 20, 100) == 20
+    assert clamp_page_size(500, 20, 100) == 100
+    assert clamp_page_size(7, 20, 100) == 7
+
+
+def test_keyset_filter_includes_the_null_bracket():
+    oid = ObjectId()
+    assert {"rating_avg": None} in keyset_filter("rating_avg", 3.0, oid)["$or"]
+    assert keyset_filter("rating_avg", None, oid) == {"$or": [{"rating_avg": None, "_id": {"$lt": oid}}]}
+    assert {"created_at": {"$ne": None}} in keyset_filter("created_at", None, oid, descending=False)["$or"]
+
+
+async def collect_feed(sort, page_size, tag=None):
+    seen = []
+    after = None
+    while True:
+        articles, cursor = await ArticleService.get_feed(after, page_size, tag, sort)
+        seen += articles
+        if cursor is None:
+            return seen
+        after = decode_cursor(cursor)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("sort,field", [("highest_rated", "rating_avg"), ("most_commented", "comment_count")])
+async def test_feed_pages_over_documents_without_the_sort_field(mongo, make_article, sort, field):
+    # sebagian artikel belum di-backfill: field tidak ada / null
+    for i in range(9):
+        fields = {field: [5, 3, None, 3, 0, None, 1, None, 3][i]} if i % 4 else {}
+        article = await make_article(i, **fields)
+        if not fields:
+            await mongo.article.update_one({"_id": article["_id"]}, {"$unset": {field: ""}})
+
+    for page_size in (1, 2, 4):
+        seen = await collect_feed(sort, page_size)
+        ids = [a["_id"] for a in seen]
+        assert len(ids) == len(set(ids)) == 9
+        keys = [(a.get(field) if a.get(field) is not None else float("-inf"), a["_id"]) for a in seen]
+        assert keys == sorted(keys, reverse=True)
+
+
+@pytest.mark.anyio
+async def test_feed_filters_deleted_and_tag(mongo, make_article):
+    for i in range(6):
+        await make_article(i, article_tag="gaming" if i % 2 else "office", is_deleted=i == 5)
+
+    gaming = await collect_feed("newest", 1, "gaming")
+    assert [a["article_title"] for a in gaming] == ["Article 3", "Article 1"]
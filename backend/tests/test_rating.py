@@ -0,0 +1,62 @@
+import pytest
+from core.cache import article_detail_cache
+from services.rating_service import RatingService
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_add_rating_response_and_cache_see_new_aggregates(api, make_user, make_article, mongo):
+    _, headers = await make_user("rater@example.com")
+    article = await make_article()
+    article_id = str(article["_id"])
+
+    # detail di-cache sebelum rating masuk
+    before = await api.post("/article/view", json={"article_id": article_id, "image_format": "url"}, headers=headers)
+    assert before.json()["rating_summary"]["rating_count"] == 0
+
+    added = await api.post("/rating/add", json={"article_id": article_id, "rating_value": 5, "image_format": "url"},
+                           headers=headers)
+    assert added.json()["confirmation"] == "successful"
+    assert added.json()["rating_summary"]["rating_count"] == 1
+    assert added.json()["rating_summary"]["rating_avg"] == 5
+
+    view = await api.post("/article/view", json={"article_id": article_id, "image_format": "url"}, headers=headers)
+    assert view.json()["rating_summary"]["rating_count"] == 1
+    assert view.json()["rating_summary"]["rating_histogram"]["5"] == 1
+
+
+async def test_edit_rating_refreshes_cached_summary(api, make_user, make_article, mongo):
+    _, headers = await make_user("rater@example.com")
+    article_id = str((await make_article())["_id"])
+    await api.post("/rating/add", json={"article_id": article_id, "rating_value": 2, "image_format": "url"},
+                   headers=headers)
+    rating = await mongo.rating.find_one({"article_id": article_id})
+
+    edited = await api.post("/rating/edit/update", json={"article_id": article_id, "rating_id": str(rating["_id"]),
+                                                          "rating_value": 4, "image_format": "url"}, headers=headers)
+    assert edited.json()["rating_summary"]["rating_avg"] == 4
+
+    cached = article_detail_cache.get(article_id)
+    assert cached["rating_summary"]["rating_histogram"] == {"1": 0, "2": 0, "3": 0, "4": 1, "5": 0}
+
+
+async def test_apply_rating_delta_sets_average_in_same_write(mongo, make_article):
+    article_id = str((await make_article())["_id"])
+
+    after = await RatingService.apply_rating_delta(article_id, {4: 1, 2: 1})
+    assert (after["rating_count"], after["rating_sum"], after["rating_avg"]) == (2, 6, 3)
+
+    after = await RatingService.apply_rating_delta(article_id, {2: -1})
+    assert (after["rating_count"], after["rating_avg"]) == (1, 4)
+    assert after["rating_histogram"] == {"4": 1, "2": 0}
+
+
+async def test_reconcile_aggregates_fixes_drift_in_batches(mongo, make_article):
+    articles = [str((await make_article(i, rating_count=9, rating_sum=9))["_id"]) for i in range(5)]
+    await mongo.rating.insert_many([{"article_id": articles[0], "owner_id": "u", "rating_value": 3}])
+
+    assert await RatingService.reconcile_aggregates(batch_size=2) == 5
+    first = await mongo.article.find_one({"rating_count": 1})
+    assert (first["rating_sum"], first["rating_avg"]) == (3, 3)
+    assert await RatingService.reconcile_aggregates() == 0
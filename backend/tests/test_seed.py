@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+import pytest
+from bson import ObjectId
+from db.seed import collection_for, iter_json_array, import_file, import_seed
+
+SEED_DIR = Path(__file__).resolve().parents[2] / "db"
+
+
+@pytest.mark.parametrize("name,collection", [
+    ("Retogen.article.json", "article"),
+    ("Retogen.article_report.json", "report_article"),
+    ("Retogen.user_report.ndjson", "report_user"),
+    ("Retogen.something.json", "something"),
+])
+def test_collection_for(name, collection):
+    assert collection_for(Path(name)) == collection
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 65536])
+def test_iter_json_array_streams_extended_json(tmp_path, chunk_size):
+    oid = ObjectId()
+    docs = [{"_id": {"$oid": str(oid)}, "text": "a, ] [ tricky } string"}, {"n": 2, "nested": {"x": [1, 2]}}]
+    array = tmp_path / "Retogen.x.json"
+    array.write_text(json.dumps(docs, indent=2))
+    ndjson = tmp_path / "Retogen.x.ndjson"
+    ndjson.write_text("\n".join(json.dumps(d) for d in docs) + "\n")
+
+    for path in (array, ndjson):
+        parsed = list(iter_json_array(path, chunk_size=chunk_size))
+        assert parsed[0]["_id"] == oid and parsed[0]["text"] == "a, ] [ tricky } string"
+        assert parsed[1] == {"n": 2, "nested": {"x": [1, 2]}}
+
+
+def test_iter_json_array_edge_cases(tmp_path):
+    empty = tmp_path / "empty.json"
+    empty.write_text("[ ]")
+    assert list(iter_json_array(empty)) == []
+
+    broken = tmp_path / "broken.json"
+    broken.write_text('[{"a": 1}, {"b": 2}')
+    with pytest.raises(ValueError):
+        list(iter_json_array(broken, chunk_size=4))
+
+
+@pytest.mark.anyio
+async def test_import_file_counts_duplicates_without_failing(mongo, tmp_path):
+    path = tmp_path / "Retogen.user.ndjson"
+    path.write_text("\n".join(json.dumps({"_id": i}) for i in range(5)))
+
+    first = await import_file(path, "user", batch_size=2)
+    again = await import_file(path, "user", drop=False, batch_size=2)
+
+    assert (first["docs"], first["inserted"], first["errors"]) == (5, 5, 0)
+    assert (again["inserted"], again["errors"]) == (0, 5)
+    assert await mongo.user.count_documents({}) == 5
+
+
+@pytest.mark.anyio
+async def test_import_seed_loads_the_repo_seed_and_derives_fields(mongo):
+    result = await import_seed(SEED_DIR, batch_size=100)
+
+    loaded = {f["collection"]: f for f in result["files"]}
+    assert set(loaded) == {"article", "comment", "rating", "user", "report_article", "report_user"}
+    assert all(f["inserted"] == f["docs"] and f["errors"] == 0 for f in loaded.values())
+
+    article = await mongo.article.find_one({"rating_count": {"$gt": 0}})
+    ratings = await mongo.rating.find({"article_id": str(article["_id"])}).to_list(None)
+    assert article["rating_count"] == len(ratings)
+    assert article["rating_sum"] == sum(r["rating_value"] for r in ratings)
+    comments = await mongo.comment.count_documents({"article_id": str(article["_id"])})
+    assert article["comment_count"] == comments
+    assert await mongo.comment.count_documents({"ancestors": {"$exists": False}}) == 0
@@ -0,0 +1,78 @@
+import random
+from collections import Counter
+from pathlib import Path
+import pytest
+from db.seed import iter_json_array
+from db.synthetic import EPOCH, MAX_REPLY_DEPTH, MongoSink, NdjsonSink, generate, skewed_counts, synthetic_oid
+from services.rating_service import RatingService
+
+SEED_DIR = Path(__file__).resolve().parents[2] / "db"
+SIZES = dict(articles=40, comments=300, ratings=200, users=25, reports=10)
+
+
+def test_skewed_counts_sum_and_cap():
+    counts = skewed_counts(random.Random(1), 1000, 50)
+    assert len(counts) == 50 and sum(counts) == 1000
+    assert max(counts) > 1000 / 50                      # ekor panjang
+    assert max(skewed_counts(random.Random(1), 1000, 50, cap=7)) <= 7
+    assert skewed_counts(random.Random(1), 10, 0) == []
+
+
+def test_synthetic_oid_is_deterministic_and_distinct_per_kind():
+    assert synthetic_oid("article", 3, EPOCH) == synthetic_oid("article", 3, EPOCH)
+    assert synthetic_oid("article", 3, EPOCH) != synthetic_oid("comment", 3, EPOCH)
+    assert synthetic_oid("user", 0, EPOCH).generation_time.replace(tzinfo=None) == EPOCH
+
+
+@pytest.mark.anyio
+async def test_same_seed_gives_identical_output(tmp_path):
+    first = await generate(NdjsonSink(tmp_path / "a"), SEED_DIR, **SIZES, seed=7)
+    second = await generate(NdjsonSink(tmp_path / "b"), SEED_DIR, **SIZES, seed=7)
+    other = await generate(NdjsonSink(tmp_path / "c"), SEED_DIR, **SIZES, seed=8)
+
+    assert first == second
+    assert first["article"] == 40 and first["user"] == 25 and first["comment"] == 300
+    for path in (tmp_path / "a").iterdir():
+        assert path.read_bytes() == (tmp_path / "b" / path.name).read_bytes()
+    assert (tmp_path / "a" / "Retogen.comment.ndjson").read_bytes() != (tmp_path / "c" / "Retogen.comment.ndjson").read_bytes()
+
+
+@pytest.mark.anyio
+async def test_article_counters_match_generated_children(tmp_path):
+    await generate(NdjsonSink(tmp_path), SEED_DIR, **SIZES)
+    load = lambda name: list(iter_json_array(tmp_path / f"Retogen.{name}.ndjson"))
+    articles, comments, ratings = load("article"), load("comment"), load("rating")
+    reports = load("report_article")
+
+    comment_counts = Counter(c["article_id"] for c in comments)
+    report_counts = Counter(r["article_id"] for r in reports)
+    by_id = {str(c["_id"]): c for c in comments}
+    for article in articles:
+        article_id = str(article["_id"])
+        mine = [r["rating_value"] for r in ratings if r["article_id"] == article_id]
+        assert article["comment_count"] == comment_counts[article_id]
+        assert article["report_count"] == report_counts[article["_id"]]
+        assert (article["rating_count"], article["rating_sum"]) == (len(mine), sum(mine))
+        assert article["rating_histogram"] == {str(v): mine.count(v) for v in range(1, 6)}
+
+    for comment in comments:
+        ancestors = comment["ancestors"]
+        assert len(ancestors) <= MAX_REPLY_DEPTH
+        if comment["parent_comment_id"] is None:
+            assert ancestors == []
+        else:
+            parent = by_id[comment["parent_comment_id"]]
+            assert ancestors == parent["ancestors"] + [comment["parent_comment_id"]]
+            assert parent["article_id"] == comment["article_id"]
+
+    # index unik article_id + owner_id pada rating
+    assert len({(r["article_id"], r["owner_id"]) for r in ratings}) == len(ratings)
+
+
+@pytest.mark.anyio
+async def test_mongo_sink_writes_consistent_aggregates(mongo):
+    counts = await generate(MongoSink(mongo, batch_size=16), SEED_DIR, **SIZES)
+
+    for collection, n in counts.items():
+        assert await mongo[collection].count_documents({}) == n
+    assert await RatingService.reconcile_aggregates() == 0
@@ -0,0 +1,57 @@
+import pytest
+import services.thumbnail_service as thumbnail_service
+from services.image_storage_service import ImageStorageService
+from services.thumbnail_service import ThumbnailService
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def fake_resize(monkeypatch):
+    # thread executor default + resize palsu: tanpa process pool / Pillow
+    monkeypatch.setattr(thumbnail_service, "get_executor", lambda: None)
+    monkeypatch.setattr(thumbnail_service, "make_thumbnails", lambda data: {"card": b"card:" + data})
+
+
+async def thumbnail_files(mongo):
+    return await mongo["article_image.files"].count_documents({"metadata.size": "card"})
+
+
+async def test_thumbnails_installed_for_current_image(mongo, make_article, fake_resize, monkeypatch):
+    article = await make_article(article_image_id="img1", article_image_hash="h1")
+
+    async def load(a):
+        return b"one"
+
+    monkeypatch.setattr(ImageStorageService, "load_article_image", staticmethod(load))
+    assert await ThumbnailService.generate_for_article(str(article["_id"]))
+
+    stored = await mongo.article.find_one({})
+    assert stored["article_thumbnails"]["source_hash"] == "h1"
+    assert ThumbnailService.current_thumbnail(stored, "card") is not None
+    assert await thumbnail_files(mongo) == 1
+
+
+async def test_slow_job_for_an_older_image_is_discarded(mongo, make_article, fake_resize, monkeypatch):
+    article = await make_article(article_image_id="img1", article_image_hash="h1")
+    newer = {"sizes": {"card": {"id": "newer-thumb", "hash": "t2", "type": "image/jpeg"}}, "source_hash": "h2"}
+
+    async def load_then_edit(a):
+        # edit yang lebih baru mendarat selagi job untuk h1 masih berjalan
+        await mongo.article.update_one({"_id": article["_id"]}, {"$set": {
+            "article_image_id": "img2", "article_image_hash": "h2", "article_thumbnails": newer}})
+        return b"one"
+
+    monkeypatch.setattr(ImageStorageService, "load_article_image", staticmethod(load_then_edit))
+    deleted = []
+
+    async def delete(file_id):
+        deleted.append(file_id)
+        return True
+
+    monkeypatch.setattr(ImageStorageService, "delete", staticmethod(delete))
+
+    assert not await ThumbnailService.generate_for_article(str(article["_id"]))
+    assert (await mongo.article.find_one({}))["article_thumbnails"] == newer
+    assert "newer-thumb" not in deleted and len(deleted) == 1
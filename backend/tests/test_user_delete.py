@@ -0,0 +1,55 @@
+import pytest
+from bson import ObjectId
+from services.comment_service import CommentService
+from services.rating_service import RatingService
+from services.user_service import UserService
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_delete_user_cascades_in_bulk(api, mongo, make_user, make_article):
+    _, admin_headers = await make_user("admin@example.com", role="admin")
+    victim, victim_headers = await make_user("victim@example.com")
+    other, _ = await make_user("other@example.com")
+    victim_id, other_id = str(victim["_id"]), str(other["_id"])
+    first, second = await make_article(0), await make_article(1)
+
+    # komentar victim + reply orang lain di bawahnya; komentar lain tetap
+    root = await CommentService.add_comment(str(first["_id"]), None, victim_id, "mine")
+    await CommentService.add_comment(str(first["_id"]), root, other_id, "reply to victim")
+    kept = await CommentService.add_comment(str(first["_id"]), None, other_id, "unrelated")
+    await CommentService.add_comment(str(second["_id"]), None, victim_id, "mine too")
+
+    for article in (first, second):
+        await RatingService.add_rating(str(article["_id"]), victim_id, 1)
+    await RatingService.add_rating(str(first["_id"]), other_id, 5)
+    await mongo.report_user.insert_one({"reported_user_id": victim["_id"], "description": "spam"})
+
+    response = await api.post("/user/delete", json={"user_id": victim_id}, headers=admin_headers)
+    assert response.json() == {"confirmation": "successful: user deleted",
+                               "removed": {"comments": 3, "ratings": 2, "reports": 1, "user": 1}}
+
+    assert [str(c["_id"]) async for c in mongo.comment.find({})] == [kept]
+    first_doc = await mongo.article.find_one({"_id": first["_id"]})
+    second_doc = await mongo.article.find_one({"_id": second["_id"]})
+    assert first_doc["comment_count"] == 1 and second_doc["comment_count"] == 0
+    assert (first_doc["rating_count"], first_doc["rating_avg"], first_doc["rating_histogram"]["1"]) == (1, 5, 0)
+    assert (second_doc["rating_count"], second_doc["rating_avg"]) == (0, 0)
+    assert await mongo.report_user.count_documents({}) == 0
+
+    # token lama langsung ditolak
+    response = await api.post("/article/feed", json={}, headers=victim_headers)
+    assert response.json()["confirmation"] == "token invalid"
+
+
+async def test_delete_user_refuses_admins(api, make_user):
+    _, admin_headers = await make_user("admin@example.com", role="admin")
+    other_admin, _ = await make_user("admin2@example.com", role="admin")
+    response = await api.post("/user/delete", json={"user_id": str(other_admin["_id"])}, headers=admin_headers)
+    assert response.json()["confirmation"] == "cannot delete admin"
+
+
+async def test_delete_with_nothing_to_remove(mongo):
+    assert await CommentService.delete_subtrees([]) == 0
+    assert await UserService.delete_user(str(ObjectId())) == {"comments": 0, "ratings": 0, "reports": 0, "user": 0}
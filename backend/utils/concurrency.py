@@ -0,0 +1,31 @@
+import asyncio
+
+async def gather_safe(*aws):
+    """
+    Run independent awaitables concurrently (latency ~ slowest, not the sum).
+    Returns the list of results, or None if any of them raised,
+    so callers can map it to {"confirmation": "backend error"}.
+    """
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            print("CONCURRENT FETCH ERROR:", result)
+            return None
+    return results
+
+async def gather_bounded(aws, limit: int):
+    """
+    gather_safe with at most `limit` awaitables in flight at once, for
+    fan-outs whose size depends on the data (one read per listed article).
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(aw):
+        async with semaphore:
+            return await aw
+
+    return await gather_safe(*(run(aw) for aw in aws))
+
+async def none_async():
+    """Placeholder awaitable for a fetch that is skipped."""
+    return None
@@ -1,13 +1,22 @@
-def validate_image_bytes(img_bytes: bytes) -> bool:
+import hashlib
+
+def detect_image_type(img_bytes: bytes):
     if not img_bytes:
-        return False
+        return None
 
     # PNG signature
     if img_bytes.startswith(b"\x89PNG\r\n\x1a\n"):
-        return True
+        return "image/png"
 
     # JPEG / JPG signature
     if img_bytes.startswith(b"\xff\xd8"):
-        return True
+        return "image/jpeg"
+
+    return None
+
+def validate_image_bytes(img_bytes: bytes) -> bool:
+    return detect_image_type(img_bytes) is not None
 
-    return False
+def image_hash(img_bytes: bytes) -> str:
+    # dipakai sebagai strong ETag + cache-buster di image URL
+    return hashlib.sha256(img_bytes).hexdigest()
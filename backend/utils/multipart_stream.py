@@ -0,0 +1,143 @@
+import python_multipart
+from python_multipart.multipart import parse_options_header
+
+MAX_FIELD_BYTES = 70 * 1024  # article_content maksimal 65536 karakter
+
+
+class MultipartError(Exception):
+    pass
+
+
+class BodyTooLarge(MultipartError):
+    pass
+
+
+class _StreamingParser:
+    """
+    multipart/form-data parser over request.stream().
+    Text fields are collected in memory (bounded by max_field_bytes);
+    file parts are handed to `sink` chunk by chunk and never spooled.
+    A file part with an empty filename and no bytes (browser form with no
+    file chosen) never reaches the sink.
+    """
+
+    def __init__(self, sink, max_field_bytes: int):
+        self.sink = sink
+        self.max_field_bytes = max_field_bytes
+        self.fields = {}
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._name = None
+        self._is_file = False
+        self._filename = None
+        self._file_started = False
+        self._data = bytearray()
+        # callbacks python_multipart sinkron → aksi async dikumpulkan lalu dijalankan
+        self._pending = []
+
+    def on_part_begin(self):
+        self._disposition = b""
+        self._name = None
+        self._is_file = False
+        self._filename = None
+        self._file_started = False
+        self._data = bytearray()
+
+    def on_header_field(self, data, start, end):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise MultipartError("part without name")
+        self._name = options[b"name"].decode("utf-8", "replace")
+        if b"filename" in options:
+            # begin ditunda sampai byte pertama: part file kosong bisa dilewati
+            self._is_file = True
+            self._filename = options[b"filename"].decode("utf-8", "replace")
+
+    def on_part_data(self, data, start, end):
+        chunk = data[start:end]
+        if self._is_file:
+            if chunk:
+                self._start_file()
+                self._pending.append(("write", bytes(chunk)))
+            return
+        if len(self._data) + len(chunk) > self.max_field_bytes:
+            raise MultipartError(f"field {self._name} too large")
+        self._data.extend(chunk)
+
+    def on_part_end(self):
+        if self._is_file:
+            if self._filename:
+                # file bernama tapi kosong tetap diteruskan → sink yang menolak
+                self._start_file()
+            if self._file_started:
+                self._pending.append(("end", None))
+        else:
+            self.fields[self._name] = self._data.decode("utf-8", "replace")
+
+    def _start_file(self):
+        if not self._file_started:
+            self._file_started = True
+            self._pending.append(("begin", self._filename))
+
+    async def flush(self):
+        pending, self._pending = self._pending, []
+        for action, arg in pending:
+            if action == "begin":
+                await self.sink.begin(arg)
+            elif action == "write":
+                await self.sink.write(arg)
+            else:
+                await self.sink.end()
+
+
+async def parse_multipart(request, sink, max_field_bytes: int = MAX_FIELD_BYTES, max_body_bytes: int = None):
+    """
+    Stream a multipart/form-data request body. File parts go to
+    `sink.begin(filename)` / `sink.write(chunk)` / `sink.end()` as they arrive;
+    returns a dict of the text fields. Raises MultipartError on malformed input
+    and BodyTooLarge once more than max_body_bytes arrived (also for chunked
+    requests without Content-Length); exceptions raised by the sink propagate
+    so the caller can abort it.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise MultipartError("expected multipart/form-data")
+
+    state = _StreamingParser(sink, max_field_bytes)
+    parser = python_multipart.MultipartParser(params[b"boundary"], {
+        "on_part_begin": state.on_part_begin,
+        "on_part_data": state.on_part_data,
+        "on_part_end": state.on_part_end,
+        "on_header_field": state.on_header_field,
+        "on_header_value": state.on_header_value,
+        "on_header_end": state.on_header_end,
+        "on_headers_finished": state.on_headers_finished,
+    })
+
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if max_body_bytes is not None and received > max_body_bytes:
+                raise BodyTooLarge(f"body larger than {max_body_bytes} bytes")
+            parser.write(chunk)
+            await state.flush()
+        parser.finalize()
+        await state.flush()
+    except python_multipart.exceptions.MultipartParseError as e:
+        raise MultipartError(str(e))
+
+    return state.fields
@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+
+def encode_cursor(value, oid: ObjectId) -> str:
+    """Opaque keyset cursor for the last item of a page: (sort value, _id); value may be None."""
+    if isinstance(value, datetime):
+        payload = {"d": value.isoformat(), "i": str(oid)}
+    else:
+        payload = {"v": value, "i": str(oid)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    """
+    Returns (sort value, ObjectId); the value is a scalar, datetime or None.
+    Raises ValueError on a malformed cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = datetime.fromisoformat(payload["d"]) if "d" in payload else payload["v"]
+        oid = ObjectId(payload["i"])
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+    # cursor datang dari client: nilai langsung masuk ke filter Mongo, jadi
+    # dict / list (operator seperti {"$ne": null}) ditolak
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (str, int, float, datetime))):
+        raise ValueError("invalid cursor")
+    return value, oid
+
+def keyset_filter(field: str, value, oid: ObjectId, descending: bool = True):
+    """
+    Items strictly after (value, oid) in the order (field, _id) — both
+    descending or both ascending. Uses the matching compound index, so
+    page N costs the same as page 1 (no skip()).
+    Missing / null sort values (documents not backfilled yet) sort lowest,
+    like Mongo's own sort; $lt / $gt never match null, so that bracket is
+    handled with explicit {field: None} branches.
+    """
+    op = "$lt" if descending else "$gt"
+    if value is None:
+        branches = [{field: None, "_id": {op: oid}}]
+        if not descending:
+            branches.append({field: {"$ne": None}})
+        return {"$or": branches}
+
+    branches = [
+        {field: {op: value}},
+        {field: value, "_id": {op: oid}},
+    ]
+    if descending:
+        branches.append({field: None})
+    return {"$or": branches}
+
+def clamp_page_size(page_size, default: int, maximum: int) -> int:
+    if not page_size or page_size < 1:
+        return default
+    return min(page_size, maximum)
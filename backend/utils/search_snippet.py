@@ -0,0 +1,77 @@
+import html
+import re
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# suffix yang di-stem oleh text index (english) → highlight "laptops" saat query "laptop"
+_SUFFIXES = ("ing", "es", "ed", "s")
+
+
+def query_terms(query: str):
+    """
+    Terms to highlight from a $text query string: lowercased, reduced to a
+    crude stem. Negated terms (-word) are skipped; quoted phrases contribute
+    their words.
+    """
+    terms = []
+    for raw in query.split():
+        if raw.startswith("-"):
+            continue
+        for word in WORD_RE.findall(raw.lower()):
+            for suffix in _SUFFIXES:
+                if len(word) > len(suffix) + 2 and word.endswith(suffix):
+                    word = word[: -len(suffix)]
+                    break
+            if word not in terms:
+                terms.append(word)
+    return terms
+
+
+def _is_match(word: str, terms):
+    word = word.lower()
+    return any(word.startswith(t) for t in terms)
+
+
+def highlight_snippet(text: str, terms, width: int = 200):
+    """
+    HTML-escaped excerpt of `text` (about `width` characters) centred on the
+    first matching word, with every match wrapped in <mark></mark>.
+    Falls back to the start of the text when nothing matches.
+    """
+    if not text:
+        return ""
+
+    matches = [m for m in WORD_RE.finditer(text) if _is_match(m.group(), terms)]
+
+    start = 0
+    if matches:
+        start = max(0, matches[0].start() - width // 3)
+        # jangan potong di tengah kata
+        if start > 0:
+            space = text.find(" ", start)
+            if space != -1 and space < matches[0].start():
+                start = space + 1
+    end = min(len(text), start + width)
+    if end < len(text):
+        space = text.rfind(" ", start, end)
+        if space > start:
+            end = space
+
+    parts = []
+    pos = start
+    for m in matches:
+        if m.start() < start:
+            continue
+        if m.end() > end:
+            break
+        parts.append(html.escape(text[pos:m.start()]))
+        parts.append("<mark>" + html.escape(m.group()) + "</mark>")
+        pos = m.end()
+    parts.append(html.escape(text[pos:end]))
+
+    snippet = "".join(parts)
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(text):
+        snippet += "…"
+    return snippet
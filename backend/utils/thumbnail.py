@@ -0,0 +1,34 @@
+import io
+from PIL import Image
+
+# nama derivative → (lebar maks, tinggi maks)
+THUMBNAIL_SIZES = {
+    "card": (480, 320),
+    "hero": (1280, 720),
+}
+
+JPEG_QUALITY = 82
+
+def make_thumbnails(image_bytes: bytes) -> dict:
+    """
+    CPU-bound; runs inside the thumbnail process pool.
+    Returns {size_name: jpeg_bytes}. Images are only ever scaled down.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img.load()
+        if img.mode in ("RGBA", "LA", "P"):
+            rgba = img.convert("RGBA")
+            base = Image.new("RGB", rgba.size, (255, 255, 255))
+            base.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            base = img.convert("RGB")
+
+    derivatives = {}
+    for name, size in THUMBNAIL_SIZES.items():
+        thumb = base.copy()
+        thumb.thumbnail(size, Image.LANCZOS)
+        out = io.BytesIO()
+        thumb.save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        derivatives[name] = out.getvalue()
+
+    return derivatives